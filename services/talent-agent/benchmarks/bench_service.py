@@ -0,0 +1,344 @@
+"""
+Offline benchmarks for resume parsing and skill scoring.
+
+Runs against a synthetic resume corpus with a deterministic fake chat model in
+place of llm_utils.llm (see fake_llm.py) and a local stub of the GitHub GraphQL
+API (see stub_github.py), so results are reproducible and need no network access
+or API keys. Every scenario reports throughput, p50/p95/p99 latency, the fake
+LLM calls and GitHub requests it made and the peak RSS of the process so far.
+
+With --llm-backend server the fake model is served over HTTP by a local
+OpenAI-compatible stub (see stub_openai.py) instead, so the calls go through the
+LLM gateway's connection pool, rate limiter and retries; --llm-rate-limit-every
+makes the stub answer every Nth request with a 429.
+
+    python benchmarks/bench_service.py --resumes 40 --concurrency 8 \
+        --llm-latency 0.05 --output bench.json
+    python benchmarks/bench_service.py --baseline bench.json
+
+Response, score and GitHub caches are disabled or cleared before each scenario,
+so every run measures uncached work. Scanned resumes need tesseract;
+without it their extraction is reported as errors. Every resume goes to the LLM
+extraction, as in the service by default; pass --layout-parser to parse
+text-layer resumes with layout_parser when it is confident.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus  # noqa: E402
+import fake_llm  # noqa: E402
+from stub_github import StubGitHubServer  # noqa: E402
+from stub_openai import StubOpenAIServer  # noqa: E402
+
+SCENARIOS = [
+    "extract_text",
+    "extract_text_scanned",
+    "layout_parse",
+    "format_candidate_data",
+    "evaluate_candidate",
+    "parse_endpoint",
+    "similarity_endpoint",
+]
+DEFAULT_SKILLS = ["Python", "Kubernetes", "React", "SQL", "AWS", "Machine Learning"]
+
+
+def configure_environment(github_url, openai_url=None, layout_parser=False):
+    """Point the service at the stubs and switch off its caches before it is imported"""
+    os.environ["GITHUB_API_URL"] = github_url
+    os.environ["LAYOUT_PARSER"] = str(layout_parser).lower()
+    if openai_url:
+        os.environ["OPENAI_BASE_URL"] = openai_url
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("WARM_UP_CHAINS", "false")
+    for backend in ("LLM_CACHE_BACKEND", "SCORE_STORE_BACKEND", "RESUME_CACHE_BACKEND"):
+        os.environ.setdefault(backend, "none")
+    os.environ.setdefault(
+        "BATCH_JOBS_PATH", os.path.join(tempfile.mkdtemp(), "batch_jobs.sqlite3")
+    )
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies, errors, wall_seconds):
+    latencies = sorted(latencies)
+    ms = lambda seconds: None if seconds is None else round(seconds * 1000, 2)  # noqa: E731
+    return {
+        "requests": len(latencies) + len(errors),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:3],
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_s": (
+            round(len(latencies) / wall_seconds, 2) if wall_seconds else None
+        ),
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max": ms(latencies[-1]) if latencies else None,
+        },
+    }
+
+
+def run_sync(func, items, concurrency):
+    """Call func on every item from `concurrency` threads, timing each call"""
+    latencies, errors = [], []
+
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            func(item)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {str(e)[:120]}")
+            return
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        list(pool.map(timed, items))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_async(func, items, concurrency):
+    """Await func on every item with at most `concurrency` calls in flight"""
+    latencies, errors = [], []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def timed(item):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await func(item)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {str(e)[:120]}")
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(item) for item in items))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def check_response(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:120]}")
+    return response
+
+
+class Benchmark:
+    """Scenarios over one corpus, sharing the imported service and the stubs"""
+
+    def __init__(self, args, resumes, github):
+        # Imported here, after the fake LLM and the environment are in place
+        import httpx
+        import layout_parser
+        import pdf_utils
+        import score
+        import service
+        import validation
+
+        self.args = args
+        self.resumes = resumes
+        self.github = github
+        self.layout_parser = layout_parser
+        self.pdf_utils = pdf_utils
+        self.score = score
+        self.validation = validation
+        # One event loop for every scenario, as in the service: pooled async
+        # connections cannot outlive the loop they were opened on
+        self.loop = asyncio.new_event_loop()
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=service.app),
+            base_url="http://benchmark",
+            timeout=None,
+        )
+
+    def reset_caches(self):
+        self.score.github_cache.clear()
+
+    def measure(self, name):
+        self.reset_caches()
+        llm_before, characters_before = fake_llm.call_counts()
+        github_before = self.github.counts()
+
+        result = getattr(self, name)()
+        if asyncio.iscoroutine(result):
+            result = self.loop.run_until_complete(result)
+
+        llm_after, characters = fake_llm.call_counts()
+        github_after = self.github.counts()
+        result["llm_calls"] = {
+            task: llm_after[task] - llm_before.get(task, 0)
+            for task in llm_after
+            if llm_after[task] != llm_before.get(task, 0)
+        }
+        result["llm_prompt_characters"] = sum(characters.values()) - sum(
+            characters_before.values()
+        )
+        result["github"] = {k: github_after[k] - github_before[k] for k in github_after}
+        result["peak_rss_mb"] = peak_rss_mb()
+        return result
+
+    def extract_text(self):
+        pdfs = [r["pdf"] for r in self.resumes if not r["scanned"]]
+        return run_sync(self.pdf_utils.extract_text, pdfs, self.args.concurrency)
+
+    def extract_text_scanned(self):
+        pdfs = [r["pdf"] for r in self.resumes if r["scanned"]]
+        return run_sync(self.pdf_utils.extract_text, pdfs, self.args.concurrency)
+
+    def layout_parse(self):
+        pdfs = [r["pdf"] for r in self.resumes if not r["scanned"]]
+        return run_sync(self.layout_parser.parse_layout, pdfs, self.args.concurrency)
+
+    def format_candidate_data(self):
+        outputs = [copy.deepcopy(r["candidate"]) for r in self.resumes]
+        return run_sync(self.validation.format_candidate_data, outputs, 1)
+
+    async def evaluate_candidate(self):
+        candidates = [corpus.scoring_input(r["candidate"]) for r in self.resumes]
+        return await run_async(
+            lambda c: self.score.aevaluate_candidate(c, self.args.skills),
+            candidates,
+            self.args.concurrency,
+        )
+
+    async def parse_endpoint(self):
+        # Text-layer resumes only, so the scenario does not depend on OCR tooling
+        pdfs = [r["pdf"] for r in self.resumes if not r["scanned"]]
+
+        async def parse(pdf):
+            check_response(await self.client.post("/resumes/parse", content=pdf))
+
+        return await run_async(parse, pdfs, self.args.concurrency)
+
+    async def similarity_endpoint(self):
+        bodies = [
+            {
+                "structuredObject": corpus.scoring_input(r["candidate"]),
+                "requiredSkills": self.args.skills,
+                "mode": "llm",
+            }
+            for r in self.resumes
+        ]
+
+        async def similarity(body):
+            check_response(await self.client.post("/resumes/similarity", json=body))
+
+        return await run_async(similarity, bodies, self.args.concurrency)
+
+
+def print_report(results, baseline=None):
+    print(
+        f"{'scenario':22s} {'req':>5s} {'err':>4s} {'req/s':>8s} {'p50 ms':>9s} "
+        f"{'p95 ms':>9s} {'p99 ms':>9s} {'llm':>5s} {'gh':>4s} {'rss MB':>7s}"
+    )
+    fmt = lambda v: "-" if v is None else f"{v:.1f}"  # noqa: E731
+    for name, r in results.items():
+        latency = r["latency_ms"]
+        print(
+            f"{name:22s} {r['requests']:5d} {r['errors']:4d} "
+            f"{fmt(r['throughput_per_s']):>8s} {fmt(latency['p50']):>9s} "
+            f"{fmt(latency['p95']):>9s} {fmt(latency['p99']):>9s} "
+            f"{sum(r['llm_calls'].values()):5d} {r['github']['requests']:4d} "
+            f"{r['peak_rss_mb']:7.1f}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous["latency_ms"]["p50"] and latency["p50"]:
+            change = latency["p50"] / previous["latency_ms"]["p50"] - 1
+            print(f"{'':22s} p50 {change:+.1%} vs baseline")
+        for sample in r["error_samples"]:
+            print(f"{'':22s} error: {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--scanned-ratio", type=float, default=0.25)
+    parser.add_argument("--linkedin-ratio", type=float, default=0.0)
+    parser.add_argument(
+        "--layout-parser",
+        action="store_true",
+        help="Parse confidently detected text-layer resumes without the LLM",
+    )
+    parser.add_argument("--skills", nargs="+", default=DEFAULT_SKILLS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-backend", choices=["fake", "server"], default="fake")
+    parser.add_argument("--llm-rate-limit-every", type=int, default=0)
+    parser.add_argument("--github-latency", type=float, default=0.02)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results in this JSON file")
+    args = parser.parse_args()
+
+    github = StubGitHubServer(latency=args.github_latency).start()
+    openai_stub = None
+    if args.llm_backend == "server":
+        openai_stub = StubOpenAIServer(
+            latency=args.llm_latency, rate_limit_every=args.llm_rate_limit_every
+        ).start()
+        configure_environment(github.url, openai_stub.url, args.layout_parser)
+    else:
+        configure_environment(github.url, layout_parser=args.layout_parser)
+        fake_llm.install(latency=args.llm_latency)
+
+    resumes = corpus.make_corpus(
+        args.resumes, args.seed, args.scanned_ratio, args.linkedin_ratio
+    )
+    benchmark = Benchmark(args, resumes, github)
+    results = {name: benchmark.measure(name) for name in args.scenarios}
+    github.stop()
+    if openai_stub is not None:
+        print(f"OpenAI stub: {openai_stub.counts()}")
+        openai_stub.stop()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["scenarios"]
+    print_report(results, baseline)
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "options": {
+                k: v for k, v in vars(args).items() if k not in ("output", "baseline")
+            },
+            "scenarios": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Microbenchmark for format_candidate_data.
+
+Compares validation.py in the working tree with the same file at a git revision,
+by default the one before the table-driven rewrite, on synthetic kor extraction
+output, and checks that both produce the same result.
+
+    python benchmarks/bench_validation.py --candidates 2000 --repeat 11
+
+The baseline module is loaded from `git show` and imports the working tree's
+versions of the modules it depends on.
+"""
+
+import argparse
+import copy
+import os
+import random
+import subprocess
+import sys
+import time
+import types
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+# validation imports the chat model, which is never called here
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import validation  # noqa: E402
+from corpus import make_candidate  # noqa: E402
+
+# validation.py before format_candidate_data became table-driven
+REWRITE_BASELINE = "ef7c7d0~1"
+
+
+def load_revision(revision, module="validation"):
+    """Import a service module as it was at a git revision"""
+    source = subprocess.run(
+        ["git", "show", f"{revision}:./{module}.py"],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    baseline = types.ModuleType(f"{module}_{revision}")
+    baseline.__file__ = os.path.join(SERVICE_DIR, f"{module}.py")
+    exec(compile(source, f"{revision}:{module}.py", "exec"), baseline.__dict__)
+    return baseline
+
+
+def run(scenarios, candidates, repeat):
+    """
+    Time each scenario on fresh copies of the candidates. Scenarios are run in
+    turn within each round, so they see the same machine noise.
+
+    Returns:
+        Dictionary mapping scenario names to (sorted seconds, last result)
+    """
+    timings = {name: [] for name, _ in scenarios}
+    results = {}
+    for _ in range(repeat):
+        for name, format_fn in scenarios:
+            inputs = copy.deepcopy(candidates)
+            start = time.perf_counter()
+            results[name] = format_fn(inputs)
+            timings[name].append(time.perf_counter() - start)
+    return {name: (sorted(timings[name]), results[name]) for name in timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--baseline", default=REWRITE_BASELINE, help="git revision to compare with"
+    )
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=11)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    baseline = load_revision(args.baseline)
+    # The phone fallback is disabled so neither side calls the LLM
+    baseline.PHONE_LLM_FALLBACK = False
+    validation.PHONE_LLM_FALLBACK = False
+
+    rng = random.Random(args.seed)
+    candidates = [make_candidate(rng) for _ in range(args.candidates)]
+
+    scenarios = [
+        (args.baseline, lambda items: [baseline.format_candidate_data(c) for c in items]),
+        ("working tree", lambda items: [validation.format_candidate_data(c) for c in items]),
+    ]
+
+    results = {}
+    print(f"{'scenario':14s} {'best':>9s}    {'median':>9s}    {'candidates/s':>12s}")
+    for name, (seconds, results[name]) in run(scenarios, candidates, args.repeat).items():
+        best, median = seconds[0], seconds[len(seconds) // 2]
+        print(
+            f"{name:14s} {best * 1000:9.2f} ms {median * 1000:9.2f} ms "
+            f"{args.candidates / best:12.0f}"
+        )
+
+    if results["working tree"] != results[args.baseline]:
+        print(f"WARNING: output differs from {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Synthetic resumes for the benchmarks.
+
+make_candidate builds kor extraction output in the shape of candidate_schema;
+resume_lines renders a candidate as resume text, which render_text_pdf and
+render_scanned_pdf turn into a PDF with a text layer or a page image only;
+render_linkedin_pdf lays a candidate out like a LinkedIn profile export.
+"""
+
+import io
+import random
+
+SKILLS = ["Python", "Java", "Go", "Kubernetes", "React", "SQL", "AWS", "Docker"]
+COUNTRIES = ["Sri Lanka", "India", "United Kingdom", "", "Germany"]
+PROJECT_DESCRIPTIONS = [
+    "A project.",
+    "Built a payment reconciliation service that matches bank statements against "
+    "ledger entries and flags mismatches for review.",
+    "Designed an event driven inventory platform handling stock updates from several "
+    "warehouses, with dashboards for the operations team and automated reorder "
+    "suggestions based on historical demand.",
+]
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINE_HEIGHT = 14
+MARGIN = 54
+
+
+def make_candidate(rng):
+    """Synthetic candidate in the shape returned by the candidate_schema chain"""
+    user = f"dev{rng.randint(0, 9999)}"
+    return {
+        "candidate": {
+            "personal_info": [
+                {
+                    "full_name": "Jane Doe",
+                    "email": rng.choice(["jane.doe@example.com", "not-an-email", ""]),
+                    "phone": rng.choice(
+                        ["+94 70 123 4567", "070 123 4567", "+44 20 7946 0958"]
+                    ),
+                    "address": "Colombo",
+                    "country": rng.choice(COUNTRIES),
+                }
+            ],
+            "professional_links": [
+                {
+                    "linkedin": "https://www.linkedin.com/in/janedoe",
+                    "github": rng.choice([f"https://github.com/{user}", user, ""]),
+                    "portfolio": rng.choice(["https://janedoe.dev", ""]),
+                    "gitlab": "",
+                    "bitbucket": "",
+                    "hackerrank": "",
+                    "leetcode": rng.choice(["https://leetcode.com/janedoe", ""]),
+                    "stackoverflow": "",
+                    "medium": rng.choice(["https://medium.com/@janedoe", "medium"]),
+                    "devto": "",
+                }
+            ],
+            "educations": [
+                {
+                    "degree": "B.Sc. Computer Science",
+                    "institution": "ABC University",
+                    "location": "Sri Lanka",
+                    "gpa_zscore": rng.choice(["3.6", "First class", ""]),
+                    "start_year": rng.choice(["2016", "16", ""]),
+                    "end_year": rng.choice(["2020", "Present"]),
+                }
+                for _ in range(rng.randint(1, 3))
+            ],
+            "experiences": [
+                {
+                    "job_title": rng.choice(
+                        ["Software Engineer", f"{rng.choice(SKILLS)} Developer"]
+                    ),
+                    "company": f"Company {i}",
+                    "location": "Colombo",
+                    "start_year": str(2015 + i),
+                    "end_year": rng.choice(["", str(2017 + i)]),
+                }
+                for i in range(rng.randint(1, 6))
+            ],
+            "skills": [{"skill": s} for s in rng.sample(SKILLS, 5)],
+            "certifications": [
+                {
+                    "name": "AWS Certified Developer",
+                    "issued_by": "Amazon",
+                    "year": "2021",
+                    "link": "",
+                }
+                for _ in range(rng.randint(0, 3))
+            ],
+            "projects": [
+                {
+                    "name": f"Project {i}",
+                    "description": rng.choice(PROJECT_DESCRIPTIONS),
+                    "technologies": [{"technology": t} for t in rng.sample(SKILLS, 3)],
+                    "github": rng.choice(
+                        [
+                            f"https://github.com/{user}/project-{i}",
+                            f"https://gitlab.com/{user}/project-{i}",
+                            "",
+                        ]
+                    ),
+                }
+                for i in range(rng.randint(0, 8))
+            ],
+            "languages": [{"language": "English", "proficiency": "Fluent"}],
+            "interests": [{"interest": "Reading"}, {"interest": "Chess"}],
+        }
+    }
+
+
+def make_candidates(count, seed=7):
+    rng = random.Random(seed)
+    return [make_candidate(rng) for _ in range(count)]
+
+
+def scoring_input(candidate):
+    """The candidate as /resumes/similarity receives it, with plain technology names"""
+    candidate = candidate["candidate"]
+    return {
+        **candidate,
+        "projects": [
+            {**p, "technologies": [t["technology"] for t in p["technologies"]]}
+            for p in candidate["projects"]
+        ],
+    }
+
+
+def resume_lines(candidate):
+    """
+    Render a candidate as the lines of a plain resume.
+
+    Returns:
+        Tuple of (lines, links) where links are the URLs to annotate
+    """
+    candidate = candidate["candidate"]
+    info = candidate["personal_info"][0]
+    links = [
+        link
+        for link in candidate["professional_links"][0].values()
+        if link.startswith("http")
+    ]
+    contact = [info["email"], info["phone"], info["address"]]
+    lines = [info["full_name"], " | ".join(filter(None, contact)), *links]
+
+    lines += ["", "EXPERIENCE"]
+    for exp in candidate["experiences"]:
+        years = "-".join(filter(None, [exp["start_year"], exp["end_year"] or "Present"]))
+        lines.append(f"{exp['job_title']}, {exp['company']}, {exp['location']} ({years})")
+
+    lines += ["", "EDUCATION"]
+    for edu in candidate["educations"]:
+        years = f"{edu['start_year']}-{edu['end_year']}"
+        lines.append(f"{edu['degree']}, {edu['institution']} ({years})")
+        if edu["gpa_zscore"]:
+            lines.append(f"GPA: {edu['gpa_zscore']}")
+
+    lines += ["", "PROJECTS"]
+    for project in candidate["projects"]:
+        technologies = ", ".join(t["technology"] for t in project["technologies"])
+        lines.append(f"{project['name']} ({technologies})")
+        lines.append(project["description"])
+        if project["github"]:
+            lines.append(project["github"])
+
+    lines += ["", "CERTIFICATIONS"]
+    lines.extend(
+        f"{c['name']} - {c['issued_by']} ({c['year']})"
+        for c in candidate["certifications"]
+    )
+    lines += ["", "SKILLS", ", ".join(s["skill"] for s in candidate["skills"])]
+    return lines, links
+
+
+def pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def paginate(lines):
+    per_page = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+    return [lines[i : i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+
+
+def render_text_pdf(lines, links=()):
+    """Minimal PDF with a Helvetica text layer and URI link annotations on page 1"""
+    pages = paginate(
+        [line.encode("latin-1", "replace").decode("latin-1") for line in lines]
+    )
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    page_ids = []
+    next_id = 4
+    for number, page in enumerate(pages):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        stream = f"BT /F1 10 Tf {LINE_HEIGHT} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td "
+        stream += " ".join(f"{pdf_string(line)} Tj T*" for line in page) + " ET"
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+
+        annots = []
+        if number == 0:
+            for i, link in enumerate(links):
+                annot_id = next_id
+                next_id += 1
+                y = PAGE_HEIGHT - MARGIN - (2 + i) * LINE_HEIGHT
+                objects[annot_id] = (
+                    f"<< /Type /Annot /Subtype /Link /Rect [{MARGIN} {y} 300 {y + 10}] "
+                    f"/Border [0 0 0] /A << /S /URI /URI {pdf_string(link)} >> >>"
+                )
+                annots.append(f"{annot_id} 0 R")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/CropBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R "
+            f"/Annots [{' '.join(annots)}] >>"
+        )
+        page_ids.append(page_id)
+    return write_pdf(objects, page_ids)
+
+
+def write_pdf(objects, page_ids):
+    """Serialize numbered PDF objects, adding the page tree as object 2"""
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[2] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = out.tell()
+        out.write(f"{object_id} 0 obj\n{objects[object_id]}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for object_id in sorted(objects):
+        out.write(f"{offsets[object_id]:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n".encode())
+    out.write(f"startxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def render_positioned_pdf(pages, links=()):
+    """
+    PDF with text placed at given positions in Helvetica or Helvetica-Bold.
+
+    Args:
+        pages: Lists of (x, y, size, bold, text), with y from the top of the page
+        links: URI link annotations for page 1
+    """
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        4: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    }
+    page_ids = []
+    next_id = 5
+    for number, page in enumerate(pages):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        stream = " ".join(
+            f"BT /{'F2' if bold else 'F1'} {size} Tf 1 0 0 1 {x} {PAGE_HEIGHT - y} Tm "
+            f"{pdf_string(text.encode('latin-1', 'replace').decode('latin-1'))} Tj ET"
+            for x, y, size, bold, text in page
+        )
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+
+        annots = []
+        if number == 0:
+            for link in links:
+                objects[next_id] = (
+                    f"<< /Type /Annot /Subtype /Link /Rect [0 0 1 1] /Border [0 0 0] "
+                    f"/A << /S /URI /URI {pdf_string(link)} >> >>"
+                )
+                annots.append(f"{next_id} 0 R")
+                next_id += 1
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/CropBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R "
+            f"/Annots [{' '.join(annots)}] >>"
+        )
+        page_ids.append(page_id)
+    return write_pdf(objects, page_ids)
+
+
+def linkedin_blocks(candidate):
+    """
+    Text of a LinkedIn profile export as (column, size, bold, text) lines, with
+    the sidebar column "side" and the main column "main"
+    """
+    candidate = candidate["candidate"]
+    info = candidate["personal_info"][0]
+    links = candidate["professional_links"][0]
+    side = [("side", 13, False, "Contact")]
+    if info["email"]:
+        side.append(("side", 10.5, False, info["email"]))
+    side.append(("side", 10.5, False, f"{info['phone']} (Mobile)"))
+    profile = links["linkedin"].replace("https://", "")
+    side += [("side", 10.5, False, profile[:26]), ("side", 10.5, False, f"{profile[26:]} (LinkedIn)")]
+    if links["github"].startswith("https://"):
+        side.append(("side", 10.5, False, f"{links['github'].replace('https://', '')} (Personal)"))
+    side.append(("side", 13, False, "Top Skills"))
+    side += [("side", 10.5, False, s["skill"]) for s in candidate["skills"][:3]]
+    side.append(("side", 13, False, "Languages"))
+    side += [
+        ("side", 10.5, False, f"{l['language']} ({l['proficiency']})")
+        for l in candidate["languages"]
+    ]
+    if candidate["certifications"]:
+        side.append(("side", 13, False, "Certifications"))
+        side += [("side", 10.5, False, c["name"]) for c in candidate["certifications"]]
+
+    location = ", ".join(filter(None, [info["address"], info["country"]]))
+    main = [
+        ("main", 26, False, info["full_name"]),
+        ("main", 12, False, f"Engineer at {candidate['experiences'][0]['company']}"),
+        ("main", 10.5, False, location),
+        ("main", 15.75, False, "Summary"),
+        ("main", 10.5, False, "Engineer building reliable services."),
+        ("main", 15.75, False, "Experience"),
+    ]
+    for exp in candidate["experiences"]:
+        end = exp["end_year"] or "Present"
+        main += [
+            ("main", 12, False, exp["company"]),
+            ("main", 11.5, False, exp["job_title"]),
+            ("main", 10.5, False, f"January {exp['start_year']} - {end} (2 years)"),
+            ("main", 10.5, False, exp["location"]),
+            ("main", 10.5, False, "Built and operated services used by the whole company."),
+        ]
+    main.append(("main", 15.75, False, "Education"))
+    for edu in candidate["educations"]:
+        years = f" · ({edu['start_year']} - {edu['end_year']})" if edu["start_year"] else ""
+        main += [
+            ("main", 12, False, edu["institution"]),
+            ("main", 10.5, False, f"{edu['degree']}{years}"),
+        ]
+    return side + main
+
+
+def render_linkedin_pdf(candidate):
+    """PDF laid out like a LinkedIn "Save to PDF" profile: a sidebar and a main column"""
+    pages = []
+    columns = {"side": (36, 0), "main": (225, 0)}
+    positions = dict(columns)
+    for column, size, bold, text in linkedin_blocks(candidate):
+        x, y = positions[column]
+        y += size * 1.5
+        if y > PAGE_HEIGHT - MARGIN:
+            pages.append([])
+            positions = {name: (cx, 0) for name, (cx, _) in columns.items()}
+            x, y = positions[column][0], size * 1.5
+        positions[column] = (x, y)
+        if not pages:
+            pages.append([])
+        pages[-1].append((x, y + MARGIN / 2, size, bold, text))
+    for number, page in enumerate(pages, start=1):
+        page.append((250, PAGE_HEIGHT - 20, 9, False, f"Page {number} of {len(pages)}"))
+    links = [candidate["candidate"]["professional_links"][0]["linkedin"]]
+    return render_positioned_pdf(pages, links)
+
+
+def render_scanned_pdf(lines, dpi=150):
+    """PDF of page images without a text layer, as produced by a scanner"""
+    from PIL import Image, ImageDraw
+
+    scale = dpi / 72
+    images = []
+    for page in paginate(lines):
+        image = Image.new("L", (int(PAGE_WIDTH * scale), int(PAGE_HEIGHT * scale)), 255)
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(page):
+            draw.text((MARGIN * scale, (MARGIN + i * LINE_HEIGHT) * scale), line, fill=0)
+        images.append(image)
+    out = io.BytesIO()
+    images[0].save(out, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+
+def make_corpus(count, seed=7, scanned_ratio=0.25, linkedin_ratio=0.0):
+    """
+    Synthetic resumes with their candidates.
+
+    Returns:
+        List of dicts with "candidate", "text" and "pdf" (bytes); about
+        `scanned_ratio` of them have "scanned" set and an image-only PDF, and
+        about `linkedin_ratio` of the others are LinkedIn profile exports
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        candidate = make_candidate(rng)
+        lines, links = resume_lines(candidate)
+        scanned = rng.random() < scanned_ratio
+        if scanned:
+            pdf = render_scanned_pdf(lines)
+        elif rng.random() < linkedin_ratio:
+            pdf = render_linkedin_pdf(candidate)
+        else:
+            pdf = render_text_pdf(lines, links)
+        corpus.append(
+            {
+                "candidate": candidate,
+                "text": "\n".join(lines),
+                "pdf": pdf,
+                "scanned": scanned,
+            }
+        )
+    return corpus
@@ -0,0 +1,145 @@
+"""
+Deterministic stand-in for the OpenAI chat model, for benchmarks without network
+access or API costs.
+
+install() must run before the service modules are imported, since they bind
+llm_utils.llm when their chains are registered.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from corpus import make_candidate
+
+SCHEMA_PATTERN = re.compile(r"```TypeScript\s+(\w+):")
+ATTRIBUTE_PATTERN = re.compile(r"^ (\w+): (\w+)", re.MULTILINE)
+BATCH_SKILLS_PATTERN = re.compile(r"each of the following skills: (.*)")
+SKILL_PATTERN = re.compile(r"proficiency in: (.*)")
+
+# Calls and prompt characters per schema id ("phone_format" for the phone prompt)
+llm_calls = Counter()
+prompt_characters = Counter()
+_lock = threading.Lock()
+
+
+def seed(*parts):
+    return zlib.crc32("\0".join(parts).encode())
+
+
+def score_table(fields, skills, text):
+    """kor CSV output with one row of deterministic scores per skill"""
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter="|", lineterminator="\n")
+    writer.writerow([name for name, _ in fields])
+    for skill in skills:
+        row = []
+        for name, kind in fields:
+            if name == "skill":
+                row.append(skill)
+            elif kind == "number":
+                row.append(seed(skill, name, text) % 11)
+            else:
+                row.append(f"Synthetic evaluation of {skill}.")
+        writer.writerow(row)
+    return out.getvalue()
+
+
+def extraction_json(schema_id, text):
+    """kor JSON output: a synthetic candidate seeded by the input text"""
+    candidate = make_candidate(random.Random(seed(text)))["candidate"]
+    value = candidate if schema_id == "candidate" else candidate.get(schema_id, [])
+    return f"<json>{json.dumps({schema_id: value})}</json>"
+
+
+def respond(messages):
+    """
+    Returns:
+        Tuple of (task, response text)
+    """
+    instructions = messages[0].content if len(messages) > 1 else ""
+    text = messages[-1].content
+    schema = SCHEMA_PATTERN.search(instructions)
+    if schema is None:
+        if "phone number" in text:
+            return "phone_format", "+94 701234567"
+        return "text", "OK"
+
+    schema_id = schema.group(1)
+    if "CSV format" in instructions:
+        block = instructions[schema.start() : instructions.index("```", schema.end())]
+        fields = ATTRIBUTE_PATTERN.findall(block)
+        skills = BATCH_SKILLS_PATTERN.search(text)
+        if skills is not None:
+            skills = skills.group(1).split(", ")
+        else:
+            skill = SKILL_PATTERN.search(text)
+            skills = [skill.group(1).strip()] if skill else []
+        return schema_id, score_table(fields, skills, text)
+    return schema_id, extraction_json(schema_id, text)
+
+
+def record_call(task, messages):
+    with _lock:
+        llm_calls[task] += 1
+        prompt_characters[task] += sum(len(m.content) for m in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers kor extraction and scoring prompts with synthetic,
+    deterministic output after a fixed latency, and counts its calls per task.
+
+    Scores depend only on the skill and the prompt, so repeated runs produce
+    the same results.
+    """
+
+    model_name: str = "gpt-4o"
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def _result(self, messages):
+        task, content = respond(messages)
+        record_call(task, messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+
+def install(latency=0.0):
+    """Replace llm_utils.llm with a FakeChatModel"""
+    import llm_utils
+
+    llm_utils.llm = FakeChatModel(latency=latency)
+    return llm_utils.llm
+
+
+def call_counts():
+    with _lock:
+        return dict(llm_calls), dict(prompt_characters)
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the GitHub GraphQL API, serving deterministic repository stats.
+
+    server = StubGitHubServer(latency=0.02).start()
+    os.environ["GITHUB_API_URL"] = server.url
+
+Responses queued with `queue_response` are served first, in order, to exercise
+the client's handling of rate limits and failed requests.
+"""
+
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def repository_node(owner, name):
+    seed = zlib.crc32(f"{owner}/{name}".encode())
+    return {
+        "name": name,
+        "stargazerCount": seed % 500,
+        "forkCount": seed % 60,
+        "updatedAt": "2024-05-01T00:00:00Z",
+        "defaultBranchRef": {"target": {"history": {"totalCount": seed % 1000}}},
+        "pullRequests": {"totalCount": seed % 40},
+        "readme": None,
+    }
+
+
+class StubGitHubServer:
+    """
+    Threaded HTTP server answering the aliased repository queries built by
+    github_client.build_repositories_query.
+    """
+
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.requests = 0
+        self.repositories = 0
+        self._queued = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                variables = json.loads(self.rfile.read(length)).get("variables") or {}
+                with stub._lock:
+                    queued = stub._queued.pop(0) if stub._queued else None
+                    if queued:
+                        stub.requests += 1
+                if queued:
+                    self.send_body(*queued)
+                    return
+
+                data = {}
+                i = 0
+                while f"owner{i}" in variables:
+                    data[f"repo{i}"] = repository_node(
+                        variables[f"owner{i}"], variables[f"name{i}"]
+                    )
+                    i += 1
+                with stub._lock:
+                    stub.requests += 1
+                    stub.repositories += i
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                self.send_body(200, json.dumps({"data": data}).encode(), {})
+
+            def send_body(self, status, body, headers):
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def queue_response(self, status=200, payload=None, body=None, headers=None):
+        """
+        Serve this response to the next request instead of the repository stats.
+
+        Args:
+            payload: JSON body of the response
+            body: Raw bytes of the response, for bodies that are not JSON
+        """
+        if body is None:
+            body = json.dumps(payload or {}).encode()
+        with self._lock:
+            self._queued.append((status, body, headers or {}))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def counts(self):
+        with self._lock:
+            return {"requests": self.requests, "repositories": self.repositories}
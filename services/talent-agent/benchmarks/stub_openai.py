@@ -0,0 +1,132 @@
+"""
+Local OpenAI-compatible chat completions server answering with the synthetic
+output of fake_llm.respond, for exercising the LLM gateway end to end.
+
+    server = StubOpenAIServer(latency=0.05, rate_limit_every=10).start()
+    os.environ["OPENAI_BASE_URL"] = server.url
+
+Every `rate_limit_every`-th request is answered with a 429 and a Retry-After
+header, so retries and rate-limit pauses can be observed without a real account.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from fake_llm import record_call, respond
+
+
+class StubOpenAIServer:
+    """Threaded HTTP server implementing POST /v1/chat/completions"""
+
+    def __init__(
+        self, latency=0.0, rate_limit_every=0, retry_after=0.1, host="127.0.0.1", port=0
+    ):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def send_json(self, status, payload, headers=()):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                request = json.loads(self.rfile.read(length))
+                with stub._lock:
+                    stub.requests += 1
+                    limited = (
+                        stub.rate_limit_every
+                        and stub.requests % stub.rate_limit_every == 0
+                    )
+                    if limited:
+                        stub.rate_limited += 1
+                if limited:
+                    self.send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "requests"}},
+                        [("retry-after", str(stub.retry_after))],
+                    )
+                    return
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                messages = [
+                    SimpleNamespace(content=m.get("content") or "")
+                    for m in request.get("messages", [])
+                ]
+                task, content = respond(messages)
+                record_call(task, messages)
+                prompt_tokens = sum(len(m.content) for m in messages) // 4
+                completion_tokens = len(content) // 4
+                with stub._lock:
+                    stub.tokens += prompt_tokens + completion_tokens
+                self.send_json(
+                    200,
+                    {
+                        "id": f"chatcmpl-stub-{stub.requests}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "gpt-4o"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                )
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def counts(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "tokens": self.tokens,
+            }
@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from cachetools import LRUCache, TTLCache
+
+
+class _EvictionCountingTTLCache(TTLCache):
+    def __init__(self, maxsize, ttl, on_evict):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict()
+        return key, value
+
+
+class _EvictionCountingLRUCache(LRUCache):
+    def __init__(self, maxsize, on_evict):
+        super().__init__(maxsize=maxsize)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict()
+        return key, value
+
+
+class _StatsCache:
+    def __init__(self, cache):
+        self._lock = threading.Lock()
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _count_eviction(self):
+        self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._cache[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": getattr(self._cache, "ttl", None),
+            }
+
+
+class TTLStatsCache(_StatsCache):
+    """
+    Thread-safe TTL cache that keeps hit, miss and eviction counters.
+
+    Entries expire `ttl` seconds after they are stored. When the cache holds
+    `maxsize` entries, the least recently used entry is evicted to make room.
+    """
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(None)
+        self._cache = _EvictionCountingTTLCache(maxsize, ttl, self._count_eviction)
+
+
+class LRUStatsCache(_StatsCache):
+    """Thread-safe in-memory LRU cache that keeps hit, miss and eviction counters."""
+
+    def __init__(self, maxsize):
+        super().__init__(None)
+        self._cache = _EvictionCountingLRUCache(maxsize, self._count_eviction)
+
+
+class SQLiteStatsCache:
+    """
+    Persistent cache stored in a SQLite table, with the same interface as the
+    in-memory caches.
+
+    Values must be JSON serializable. When `ttl` is set, entries older than `ttl`
+    seconds are treated as missing. When more than `maxsize` entries are stored,
+    the least recently used ones are deleted. Expired and excess entries are
+    deleted together once every `maxsize / 20` writes rather than on each write,
+    so the table can briefly hold up to 5% more than `maxsize` entries.
+    """
+
+    def __init__(self, path, maxsize=None, ttl=None, table="cache"):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL commits stay durable across crashes of the process without an fsync each
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)"
+        )
+        self._conn.commit()
+        self._eviction_interval = max(1, (maxsize or 0) // 20)
+        # Start with a sweep, in case maxsize or ttl were lowered since the last run
+        self._writes = self._eviction_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return default
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key, value):
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._writes += 1
+            if self._writes >= self._eviction_interval:
+                self._writes = 0
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        """Delete expired entries, then the least recently used ones above maxsize"""
+        if self.ttl is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl,)
+            )
+        if self.maxsize is not None:
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if size > self.maxsize:
+                deleted = self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} "
+                    "ORDER BY accessed_at LIMIT ?)",
+                    (size - self.maxsize,),
+                ).rowcount
+                self.evictions += max(0, deleted)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": size,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+def create_cache(backend, maxsize=1024, ttl=None, path=None, table="cache"):
+    """
+    Create a cache for the given backend name.
+
+    Args:
+        backend: "memory" or "sqlite"; "none" (or an empty value) disables caching
+        maxsize: Maximum number of entries
+        ttl: Seconds before an entry expires, None to keep entries until evicted
+        path: SQLite database file, required for the sqlite backend
+        table: SQLite table name, so several caches can share one database
+
+    Returns:
+        A cache with get/set/clear/stats, or None when caching is disabled
+    """
+    backend = (backend or "none").lower()
+    if backend == "none":
+        return None
+    if backend == "memory":
+        if ttl is None:
+            return LRUStatsCache(maxsize=maxsize)
+        return TTLStatsCache(maxsize=maxsize, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteStatsCache(path, maxsize=maxsize, ttl=ttl, table=table)
+    raise ValueError(f"Unsupported cache backend: {backend}")
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from kor.extraction import create_extraction_chain
+from kor.prompts import ExtractionPromptTemplate
+from langchain_core.runnables import RunnableSequence
+from pydantic import PrivateAttr
+
+from llm_cache import cached_llm, get_llm_cache
+from llm_utils import count_tokens
+from metrics import instrumented_llm
+
+
+class CachedExtractionPromptTemplate(ExtractionPromptTemplate):
+    """
+    ExtractionPromptTemplate that renders the schema instructions and encoded
+    examples once instead of on every call.
+
+    kor re-renders both (twice: for the string and the chat message form) each time
+    a chain is invoked; for candidate_schema that is several thousand tokens of
+    text rebuilt per request.
+    """
+
+    _instruction_segment = PrivateAttr(default=None)
+    _encoded_examples = PrivateAttr(default=None)
+    _lock = PrivateAttr(default_factory=threading.Lock)
+
+    def format_instruction_segment(self, node):
+        if node is not self.node:
+            return super().format_instruction_segment(node)
+        with self._lock:
+            if self._instruction_segment is None:
+                self._instruction_segment = super().format_instruction_segment(node)
+            return self._instruction_segment
+
+    def generate_encoded_examples(self, node):
+        if node is not self.node:
+            return super().generate_encoded_examples(node)
+        with self._lock:
+            if self._encoded_examples is None:
+                self._encoded_examples = super().generate_encoded_examples(node)
+            return self._encoded_examples
+
+
+def create_cached_extraction_chain(llm, node, **kwargs):
+    """create_extraction_chain with the prompt swapped for a CachedExtractionPromptTemplate"""
+    chain = create_extraction_chain(llm, node, **kwargs)
+    prompt = CachedExtractionPromptTemplate(
+        **{
+            name: getattr(chain.first, name)
+            for name in ExtractionPromptTemplate.model_fields
+        }
+    )
+    return RunnableSequence(prompt, *chain.middle, chain.last)
+
+
+_chains = {}
+_chain_stats = {}
+_lock = threading.Lock()
+
+
+def register_chain(name, llm, node, **kwargs):
+    """
+    Build a named extraction chain once and keep it for reuse.
+
+    The chain's LLM responses are cached and its LLM calls are recorded under its
+    name (see llm_cache and metrics).
+    Registering the same name again returns the existing chain.
+    """
+    with _lock:
+        if name not in _chains:
+            start = time.perf_counter()
+            _chains[name] = create_cached_extraction_chain(
+                cached_llm(instrumented_llm(llm, name), name), node, **kwargs
+            )
+            _chain_stats[name] = {"build_seconds": time.perf_counter() - start}
+        return _chains[name]
+
+
+def get_chain(name):
+    return _chains[name]
+
+
+def warm_up_chain(name):
+    """Render the static part of a chain's prompt and record its size"""
+    prompt = _chains[name].first
+    start = time.perf_counter()
+    rendered = prompt.format_prompt(text="").to_string()
+    render_seconds = time.perf_counter() - start
+
+    with _lock:
+        stats = _chain_stats[name]
+        stats["render_seconds"] = render_seconds
+        stats["prompt_characters"] = len(rendered)
+        stats["prompt_tokens"] = count_tokens(rendered)
+        stats["warmed_up"] = True
+
+
+def warm_up_chains():
+    """Pre-render the prompts of every registered chain, e.g. at startup"""
+    for name in list(_chains):
+        if not _chain_stats[name].get("warmed_up"):
+            warm_up_chain(name)
+
+
+def chain_stats():
+    with _lock:
+        stats = {name: dict(stats) for name, stats in _chain_stats.items()}
+    for name in stats:
+        cache = get_llm_cache(name)
+        stats[name]["llm_cache"] = cache.stats() if cache is not None else None
+    return stats
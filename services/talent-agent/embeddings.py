@@ -0,0 +1,302 @@
+import asyncio
+import os
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+from dotenv import load_dotenv
+
+from cache_utils import LRUStatsCache
+from relevance import candidate_section, tokenize
+
+load_dotenv()
+
+# "hashing" (offline, no model), "openai" or "local" (sentence-transformers on CPU)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1024"))
+EMBEDDING_CACHE_MAX_SIZE = int(os.getenv("EMBEDDING_CACHE_MAX_SIZE", "8192"))
+# Cosine similarity at or below which a snippet counts as no evidence; similarity
+# above it is rescaled to the 0-10 score range
+EMBEDDING_SIMILARITY_FLOOR = float(os.getenv("EMBEDDING_SIMILARITY_FLOOR", "0.2"))
+
+embedding_cache = LRUStatsCache(maxsize=EMBEDDING_CACHE_MAX_SIZE)
+
+
+class Embedder(ABC):
+    """
+    Turns texts into L2-normalized vectors, so the cosine similarity of two texts
+    is the dot product of their vectors.
+    """
+
+    name = "embedder"
+
+    @abstractmethod
+    def embed(self, texts):
+        """
+        Returns:
+            Array of shape (len(texts), dimensions)
+        """
+
+    async def aembed(self, texts):
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Model-free embedder that hashes word tokens and character trigrams into a
+    fixed number of dimensions.
+
+    It only captures lexical overlap, but is deterministic, needs no network or
+    model download and is fast enough to embed thousands of snippets, which makes
+    it the default for offline use and tests. Whole words weigh more than
+    trigrams, so "Java" stays apart from "JavaScript" while "PostgreSQL" is
+    still close to "Postgres".
+    """
+
+    word_weight = 3.0
+
+    def __init__(self, dimensions=EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def features(self, text):
+        """Yield (feature, weight) pairs for the text"""
+        for token in tokenize(text):
+            yield f"w:{token}", self.word_weight
+            padded = f"<{token}>"
+            for i in range(len(padded) - 2):
+                yield padded[i : i + 3], 1.0
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self.features(text):
+                digest = zlib.crc32(feature.encode())
+                # The top bit decides the sign, so colliding features tend to cancel
+                sign = weight if digest & 0x80000000 else -weight
+                vectors[row, digest % self.dimensions] += sign
+        return normalize_rows(vectors)
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeds texts with the OpenAI embeddings API"""
+
+    def __init__(self, model=None):
+        from langchain_openai import OpenAIEmbeddings
+
+        model = model or "text-embedding-3-small"
+        self.name = f"openai-{model}"
+        self._embeddings = OpenAIEmbeddings(
+            model=model, openai_api_key=os.getenv("OPENAI_API_KEY")
+        )
+
+    def embed(self, texts):
+        return normalize_rows(
+            np.asarray(self._embeddings.embed_documents(list(texts)), dtype=np.float32)
+        )
+
+    async def aembed(self, texts):
+        vectors = await self._embeddings.aembed_documents(list(texts))
+        return normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Embeds texts with a local sentence-transformers model on the CPU"""
+
+    def __init__(self, model=None):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=local requires the sentence-transformers package"
+            ) from e
+
+        model = model or "all-MiniLM-L6-v2"
+        self.name = f"local-{model}"
+        self._model = SentenceTransformer(model, device="cpu")
+
+    def embed(self, texts):
+        vectors = self._model.encode(list(texts), convert_to_numpy=True)
+        return normalize_rows(vectors.astype(np.float32))
+
+
+EMBEDDERS = {
+    "hashing": lambda model: HashingEmbedder(),
+    "openai": OpenAIEmbedder,
+    "local": SentenceTransformerEmbedder,
+}
+
+_embedder = None
+
+
+def get_embedder():
+    """Return the process-wide embedder for EMBEDDING_BACKEND"""
+    global _embedder
+    if _embedder is None:
+        if EMBEDDING_BACKEND not in EMBEDDERS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+        _embedder = EMBEDDERS[EMBEDDING_BACKEND](EMBEDDING_MODEL or None)
+    return _embedder
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def cosine_similarity(queries, documents):
+    """
+    Cosine similarity of every query to every document, for L2-normalized rows.
+
+    Returns:
+        Array of shape (len(queries), len(documents))
+    """
+    if len(queries) == 0 or len(documents) == 0:
+        return np.zeros((len(queries), len(documents)), dtype=np.float32)
+    return queries @ documents.T
+
+
+async def aembed_texts(texts, embedder=None):
+    """
+    Embed texts, reusing cached vectors and embedding the rest in one call.
+
+    Returns:
+        Array of shape (len(texts), dimensions)
+    """
+    embedder = embedder or get_embedder()
+    vectors = [embedding_cache.get((embedder.name, text)) for text in texts]
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        embedded = dict(zip(missing, await embedder.aembed(missing)))
+        for text, vector in embedded.items():
+            embedding_cache.set((embedder.name, text), vector)
+        vectors = [v if v is not None else embedded[t] for t, v in zip(texts, vectors)]
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack(vectors)
+
+
+def candidate_snippets(candidate):
+    """
+    Short texts that can show evidence of a skill, by the score they count towards.
+
+    Listed skills count towards experience, as the extracted experiences only
+    carry the job title and company. Project technologies are separate snippets,
+    so a listed technology is not diluted by a long description.
+
+    Returns:
+        List of (criterion, text) pairs
+    """
+    snippets = []
+    for exp in candidate_section(candidate, "experiences"):
+        role = " at ".join(filter(None, [exp.get("job_title"), exp.get("company")]))
+        snippets.append(("experience", role))
+    for entry in candidate_section(candidate, "skills"):
+        skill = entry.get("skill", "") if isinstance(entry, dict) else str(entry)
+        snippets.append(("experience", skill))
+    for cert in candidate_section(candidate, "certifications"):
+        name = " from ".join(filter(None, [cert.get("name"), cert.get("issued_by")]))
+        snippets.append(("certification", name))
+    for project in candidate_section(candidate, "projects"):
+        description = ": ".join(filter(None, [project.get("name"), project.get("description")]))
+        snippets.append(("project", description))
+        for technology in project.get("technologies") or []:
+            if isinstance(technology, dict):
+                technology = technology.get("technology", "")
+            snippets.append(("project", str(technology)))
+    return [(criterion, text.strip()) for criterion, text in snippets if text.strip()]
+
+
+def similarity_to_score(similarities, floor=None):
+    """Rescale cosine similarities above the floor to 0-10 scores"""
+    floor = EMBEDDING_SIMILARITY_FLOOR if floor is None else floor
+    return np.clip((similarities - floor) / (1.0 - floor), 0.0, 1.0) * 10.0
+
+
+def score_snippets(skills, snippets, similarities, weights):
+    """
+    Turn the similarity of each skill to each of a candidate's snippets into
+    skill results.
+
+    Args:
+        skills: List of skills
+        snippets: The candidate's (criterion, text) pairs
+        similarities: Array of shape (len(skills), len(snippets))
+        weights: Dictionary mapping each criterion to its weight
+    """
+    criteria = np.array([criterion for criterion, _ in snippets])
+    weighted_scores = np.zeros(len(skills), dtype=np.float32)
+    for criterion, weight in weights.items():
+        columns = np.flatnonzero(criteria == criterion)
+        if len(columns):
+            best = similarities[:, columns].max(axis=1)
+            weighted_scores += similarity_to_score(best) * weight
+
+    results = []
+    for row, skill in enumerate(skills):
+        supporting_points = ""
+        if len(snippets) and similarities[row].max() > EMBEDDING_SIMILARITY_FLOOR:
+            closest = int(similarities[row].argmax())
+            supporting_points = (
+                f"Closest evidence ({snippets[closest][0]}): {snippets[closest][1]} "
+                f"(similarity {similarities[row, closest]:.2f})"
+            )
+
+        results.append(
+            {
+                "skill": skill,
+                "similarityScore": round(min(10.0, max(0.0, float(weighted_scores[row]))), 2),
+                "supportingPoints": supporting_points,
+            }
+        )
+    return results
+
+
+async def aembedding_evaluate_candidates(
+    candidates,
+    skills,
+    experience_weight=0.4,
+    certification_weight=0.2,
+    project_weight=0.4,
+    embedder=None,
+):
+    """
+    Score skills by the cosine similarity of their embeddings to each candidate's
+    experience, certification and project snippets, without any LLM call.
+
+    The skills and the snippets of all candidates are embedded together, and their
+    similarities computed as one matrix product. Each criterion is scored from its
+    most similar snippet, and the criterion scores are weighted as in
+    evaluate_candidate.
+
+    Returns:
+        List with, for each candidate, the skill results in the order of `skills`,
+        in the shape returned by evaluate_candidate
+    """
+    weights = {
+        "experience": experience_weight,
+        "certification": certification_weight,
+        "project": project_weight,
+    }
+    candidate_snippet_lists = [candidate_snippets(c) for c in candidates]
+    texts = [text for snippets in candidate_snippet_lists for _, text in snippets]
+    vectors = await aembed_texts([*skills, *texts], embedder)
+    similarities = cosine_similarity(vectors[: len(skills)], vectors[len(skills) :])
+
+    results = []
+    start = 0
+    for snippets in candidate_snippet_lists:
+        end = start + len(snippets)
+        results.append(score_snippets(skills, snippets, similarities[:, start:end], weights))
+        start = end
+    return results
+
+
+async def aembedding_evaluate_candidate(candidate, skills, *weights, embedder=None):
+    """Embedding scores of a single candidate, see aembedding_evaluate_candidates"""
+    results = await aembedding_evaluate_candidates(
+        [candidate], skills, *weights, embedder=embedder
+    )
+    return results[0]
@@ -0,0 +1,354 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+from metrics import timed
+
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com/graphql")
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "10"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+GITHUB_MAX_BACKOFF = float(os.getenv("GITHUB_MAX_BACKOFF", "30"))
+GITHUB_BATCH_SIZE = int(os.getenv("GITHUB_BATCH_SIZE", "10"))
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "10"))
+
+REPOSITORY_FRAGMENT = """
+fragment RepositoryFields on Repository {
+  name
+  stargazerCount
+  forkCount
+  updatedAt
+  defaultBranchRef {
+    target {
+      ... on Commit {
+        history(first: 100) {
+          totalCount
+        }
+      }
+    }
+  }
+  pullRequests(states: MERGED) {
+    totalCount
+  }
+  readme: object(expression: "HEAD:README.md") {
+    ... on Blob {
+      text
+    }
+  }
+}
+"""
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class GitHubRateLimitError(Exception):
+    pass
+
+
+def extract_repo_info(repo_url):
+    try:
+        parts = repo_url.strip("/").split("/")
+        owner = parts[-2]
+        name = parts[-1]
+        return owner, name
+    except Exception:
+        return None, None
+
+
+def build_repositories_query(repos):
+    """
+    Build a single GraphQL query that fetches several repositories through aliases.
+
+    Args:
+        repos: List of (owner, name) tuples
+
+    Returns:
+        Tuple of (query, variables); repository i is returned under the alias "repo{i}"
+    """
+    params = []
+    fields = []
+    variables = {}
+    for i, (owner, name) in enumerate(repos):
+        params.append(f"$owner{i}: String!, $name{i}: String!")
+        fields.append(
+            f"  repo{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...RepositoryFields }}"
+        )
+        variables[f"owner{i}"] = owner
+        variables[f"name{i}"] = name
+
+    query = "query(" + ", ".join(params) + ") {\n" + "\n".join(fields) + "\n}\n"
+    return query + REPOSITORY_FRAGMENT, variables
+
+
+def parse_repository(repo):
+    """Reduce a GraphQL repository node to the stats used for scoring"""
+    if not repo:
+        return {"error": "Repository not found or inaccessible"}
+
+    branch = repo.get("defaultBranchRef") or {}
+    history = (branch.get("target") or {}).get("history") or {}
+    return {
+        "stars": repo["stargazerCount"],
+        "forks": repo["forkCount"],
+        "last_updated": repo["updatedAt"],
+        "commits": history.get("totalCount", 0),
+        "merged_prs": repo["pullRequests"]["totalCount"],
+    }
+
+
+def retry_delay(response, attempt, rate_limited=False):
+    """
+    Seconds to wait before retrying, or None if the response should not be retried.
+
+    Honours Retry-After and x-ratelimit-reset headers on rate-limited responses and
+    otherwise backs off exponentially with jitter.
+    """
+    backoff = min(GITHUB_MAX_BACKOFF, (2**attempt) + random.uniform(0, 1))
+    if response is None:
+        return backoff
+
+    rate_limited = (
+        rate_limited
+        or response.status_code == 429
+        or (
+            response.status_code == 403
+            and response.headers.get("x-ratelimit-remaining") == "0"
+        )
+    )
+    if rate_limited:
+        retry_after = response.headers.get("retry-after")
+        reset = response.headers.get("x-ratelimit-reset")
+        if retry_after and retry_after.isdigit():
+            return min(GITHUB_MAX_BACKOFF, float(retry_after))
+        if reset and reset.isdigit():
+            return min(GITHUB_MAX_BACKOFF, max(0.0, float(reset) - time.time()))
+        return backoff
+
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        return backoff
+    return None
+
+
+def is_rate_limited(resp_json):
+    return any(
+        error.get("type") == "RATE_LIMITED" for error in resp_json.get("errors") or []
+    )
+
+
+class GitHubClient:
+    """
+    GitHub GraphQL client with pooled connections, batching and retries.
+
+    A single client is meant to be shared across requests: the underlying sync and
+    async httpx clients keep connections alive between calls. Repositories are
+    fetched GITHUB_BATCH_SIZE at a time in one aliased GraphQL query.
+    """
+
+    def __init__(
+        self,
+        api_url=None,
+        token=None,
+        timeout=None,
+        max_retries=None,
+        batch_size=None,
+        max_connections=None,
+    ):
+        self.api_url = api_url or GITHUB_API_URL
+        self.token = token if token is not None else os.getenv("GITHUB_TOKEN")
+        self.timeout = httpx.Timeout(timeout or GITHUB_TIMEOUT)
+        self.max_retries = GITHUB_MAX_RETRIES if max_retries is None else max_retries
+        self.batch_size = max(1, batch_size or GITHUB_BATCH_SIZE)
+        self.limits = httpx.Limits(
+            max_connections=max_connections or GITHUB_MAX_CONNECTIONS,
+            max_keepalive_connections=max_connections or GITHUB_MAX_CONNECTIONS,
+        )
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def headers(self):
+        if not self.token:
+            return {}
+        return {"Authorization": f"Bearer {self.token}"}
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    headers=self.headers, timeout=self.timeout, limits=self.limits
+                )
+            return self._client
+
+    async def async_client(self):
+        """
+        The async client of the running event loop. httpx async connections are
+        bound to the loop that opened them, so a client opened on another loop is
+        replaced and closed.
+        """
+        loop = asyncio.get_running_loop()
+        previous = None
+        with self._lock:
+            if self._async_client is None or self._async_loop is not loop:
+                previous, previous_loop = self._async_client, self._async_loop
+                self._async_client = httpx.AsyncClient(
+                    headers=self.headers, timeout=self.timeout, limits=self.limits
+                )
+                self._async_loop = loop
+            client = self._async_client
+        if previous is not None:
+            await close_async_client(previous, previous_loop)
+        return client
+
+    def batches(self, repos):
+        repos = list(dict.fromkeys(repos))
+        return [
+            repos[i : i + self.batch_size]
+            for i in range(0, len(repos), self.batch_size)
+        ]
+
+    @timed("github_fetch")
+    def fetch_repositories(self, repos):
+        """
+        Fetch stats for several repositories.
+
+        Args:
+            repos: Iterable of (owner, name) tuples
+
+        Returns:
+            Dictionary mapping (owner, name) to a stats dictionary, or to a dictionary
+            with an "error" key when the repository could not be fetched
+        """
+        results = {}
+        for batch in self.batches(repos):
+            query, variables = build_repositories_query(batch)
+            results.update(self._parse_batch(batch, self._post(query, variables)))
+        return results
+
+    @timed("github_fetch")
+    async def afetch_repositories(self, repos):
+        """Async variant of fetch_repositories; batches are fetched concurrently"""
+        batches = self.batches(repos)
+
+        async def fetch_batch(batch):
+            query, variables = build_repositories_query(batch)
+            return self._parse_batch(batch, await self._apost(query, variables))
+
+        results = {}
+        for batch_results in await asyncio.gather(*(fetch_batch(b) for b in batches)):
+            results.update(batch_results)
+        return results
+
+    def _post(self, query, variables):
+        for attempt in range(self.max_retries + 1):
+            response = None
+            rate_limited = False
+            try:
+                response = self.client.post(
+                    self.api_url, json={"query": query, "variables": variables}
+                )
+                resp_json = self._check_response(response)
+                if resp_json is not None:
+                    return resp_json
+            except GitHubRateLimitError as e:
+                print(f"GitHub request failed: {str(e)}")
+                rate_limited = True
+            except httpx.TransportError as e:
+                print(f"GitHub request failed: {type(e).__name__}: {str(e)}")
+
+            delay = retry_delay(response, attempt, rate_limited)
+            if delay is None or attempt == self.max_retries:
+                break
+            time.sleep(delay)
+        return None
+
+    async def _apost(self, query, variables):
+        for attempt in range(self.max_retries + 1):
+            response = None
+            rate_limited = False
+            try:
+                client = await self.async_client()
+                response = await client.post(
+                    self.api_url, json={"query": query, "variables": variables}
+                )
+                resp_json = self._check_response(response)
+                if resp_json is not None:
+                    return resp_json
+            except GitHubRateLimitError as e:
+                print(f"GitHub request failed: {str(e)}")
+                rate_limited = True
+            except httpx.TransportError as e:
+                print(f"GitHub request failed: {type(e).__name__}: {str(e)}")
+
+            delay = retry_delay(response, attempt, rate_limited)
+            if delay is None or attempt == self.max_retries:
+                break
+            await asyncio.sleep(delay)
+        return None
+
+    def _check_response(self, response):
+        """Return the JSON body of a usable response, or None; retry_delay decides on retries"""
+        if response.status_code != 200:
+            print(f"GitHub API returned HTTP {response.status_code}")
+            return None
+        try:
+            resp_json = response.json()
+        except ValueError:
+            resp_json = None
+        if not isinstance(resp_json, dict):
+            print("GitHub API returned a response that is not a JSON object")
+            return None
+        if is_rate_limited(resp_json):
+            raise GitHubRateLimitError("GitHub GraphQL rate limit exceeded")
+        return resp_json
+
+    def _parse_batch(self, batch, resp_json):
+        if resp_json is None:
+            return {repo: {"error": "GitHub API request failed"} for repo in batch}
+
+        if resp_json.get("errors"):
+            print("GraphQL Error:", resp_json["errors"])
+
+        data = resp_json.get("data") or {}
+        return {
+            repo: parse_repository(data.get(f"repo{i}"))
+            for i, repo in enumerate(batch)
+        }
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
+
+async def close_async_client(client, loop):
+    """Close an async client, on its own loop when that loop is running in another thread"""
+    if loop.is_running():
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+    else:
+        await client.aclose()
+
+
+_default_client = None
+
+
+def get_github_client():
+    """Return the process-wide GitHubClient"""
+    global _default_client
+    if _default_client is None:
+        _default_client = GitHubClient()
+    return _default_client
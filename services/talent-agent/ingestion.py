@@ -0,0 +1,282 @@
+import asyncio
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+
+from dotenv import load_dotenv
+
+from pdf_utils import IMAGE_EXTENSIONS
+from llm_gateway import batch_priority
+from pipeline import QueueFullError, extract_resume, parse_resume
+
+load_dotenv()
+
+BATCH_JOBS_PATH = os.getenv("BATCH_JOBS_PATH", "cache/batch_jobs.sqlite3")
+BATCH_EXTRACTION_CONCURRENCY = int(os.getenv("BATCH_EXTRACTION_CONCURRENCY", "2"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "1000"))
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "0.5"))
+
+SUPPORTED_EXTENSIONS = (".pdf",) + IMAGE_EXTENSIONS
+
+
+class JobNotFoundError(Exception):
+    pass
+
+
+def expand_upload(filename, data):
+    """
+    Turn one uploaded file into the resumes it contains.
+
+    Zip archives are expanded into their PDF and image entries; any other file is
+    returned as is.
+
+    Returns:
+        List of (filename, bytes) tuples
+    """
+    if not filename.lower().endswith(".zip") and not zipfile.is_zipfile(io.BytesIO(data)):
+        return [(filename, data)]
+
+    files = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if len(files) >= BATCH_MAX_FILES:
+                break
+            files.append((info.filename, archive.read(info)))
+    return files
+
+
+class JobStore:
+    """
+    SQLite store for batch jobs and their items.
+
+    Uploaded bytes are kept with each pending item so unfinished work can be
+    resumed after a restart, and are dropped once the item is processed.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                item_index INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload BLOB,
+                result TEXT,
+                error TEXT,
+                finished_at REAL,
+                completed_seq INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS job_items_job ON job_items (job_id, status);
+            """
+        )
+        self._conn.commit()
+
+    def create_job(self, files):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, created_at) VALUES (?, ?)", (job_id, time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, item_index, filename, status, payload) "
+                "VALUES (?, ?, ?, 'pending', ?)",
+                [(job_id, i, name, data) for i, (name, data) in enumerate(files)],
+            )
+            self._conn.commit()
+        return job_id
+
+    def pending_items(self, job_id=None):
+        """Return (job_id, item_index, filename, payload) for every unprocessed item"""
+        query = "SELECT job_id, item_index, filename, payload FROM job_items WHERE status = 'pending'"
+        params = ()
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params = (job_id,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY seq", params).fetchall()
+
+    def finish_item(self, job_id, item_index, result=None, error=None):
+        with self._lock:
+            completed_seq = self._conn.execute(
+                "SELECT COALESCE(MAX(completed_seq), 0) + 1 FROM job_items WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()[0]
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, payload = NULL, result = ?, error = ?, "
+                "finished_at = ?, completed_seq = ? WHERE job_id = ? AND item_index = ?",
+                (
+                    "failed" if error else "completed",
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    completed_seq,
+                    job_id,
+                    item_index,
+                ),
+            )
+            remaining = self._conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status = 'pending'",
+                (job_id,),
+            ).fetchone()[0]
+            if remaining == 0:
+                self._conn.execute(
+                    "UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time(), job_id)
+                )
+            self._conn.commit()
+
+    def job_status(self, job_id):
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT created_at, finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                raise JobNotFoundError(job_id)
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status",
+                    (job_id,),
+                ).fetchall()
+            )
+        total = sum(counts.values())
+        return {
+            "jobId": job_id,
+            "status": "completed" if job[1] is not None else "running",
+            "total": total,
+            "pending": counts.get("pending", 0),
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+            "createdAt": job[0],
+            "finishedAt": job[1],
+        }
+
+    def finished_items(self, job_id, after=0):
+        """Return processed items in completion order, starting after `after`"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT completed_seq, item_index, filename, status, result, error "
+                "FROM job_items WHERE job_id = ? AND completed_seq > ? ORDER BY completed_seq",
+                (job_id, after),
+            ).fetchall()
+
+        items = []
+        for completed_seq, item_index, filename, status, result, error in rows:
+            item = {
+                "sequence": completed_seq,
+                "index": item_index,
+                "filename": filename,
+                "status": status,
+            }
+            if result is not None:
+                item["structuredObject"] = json.loads(result)
+            if error is not None:
+                item["error"] = error
+            items.append(item)
+        return items
+
+
+class BatchIngestor:
+    """
+    Schedules batch job items across the parse pipeline stages.
+
+    Text extraction and LLM extraction each have their own concurrency limit, so a
+    large batch cannot starve the interactive /resumes/parse endpoint of either.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.extraction_semaphore = asyncio.Semaphore(BATCH_EXTRACTION_CONCURRENCY)
+        self.llm_semaphore = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+        self._tasks = set()
+
+    async def submit(self, files):
+        job_id = await asyncio.to_thread(self.store.create_job, files)
+        self.schedule(await asyncio.to_thread(self.store.pending_items, job_id))
+        return job_id
+
+    async def resume(self):
+        """Re-schedule the items left unprocessed by a previous run"""
+        self.schedule(await asyncio.to_thread(self.store.pending_items))
+
+    def schedule(self, items):
+        for job_id, item_index, filename, payload in items:
+            task = asyncio.create_task(self.process_item(job_id, item_index, payload))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def process_item(self, job_id, item_index, data):
+        try:
+            # Interactive parses go ahead of batch items at the LLM rate limits
+            with batch_priority():
+                structured_object = await parse_resume(
+                    data, extract=self.extract_resume, llm_limit=self.llm_semaphore
+                )
+        except Exception as e:
+            print(f"Error: {type(e).__name__}: {str(e)}")
+            await asyncio.to_thread(self.store.finish_item, job_id, item_index, error=str(e))
+            return
+        await asyncio.to_thread(
+            self.store.finish_item, job_id, item_index, result=structured_object
+        )
+
+    async def extract_resume(self, data):
+        # Batch work waits for room on the shared extraction pool instead of failing
+        async with self.extraction_semaphore:
+            while True:
+                try:
+                    return await extract_resume(data)
+                except QueueFullError:
+                    await asyncio.sleep(BATCH_POLL_INTERVAL)
+
+    async def stream_results(self, job_id, after=0, follow=True):
+        """
+        Yield NDJSON lines for processed items as they finish.
+
+        With `follow`, keeps polling until the job completes; otherwise returns the
+        items finished so far.
+        """
+        while True:
+            status = await asyncio.to_thread(self.store.job_status, job_id)
+            items = await asyncio.to_thread(self.store.finished_items, job_id, after)
+            for item in items:
+                after = item["sequence"]
+                yield json.dumps(item) + "\n"
+            if not follow or (status["status"] == "completed" and not items):
+                break
+            if not items:
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+_ingestor = None
+
+
+def get_batch_ingestor():
+    """Return the process-wide BatchIngestor"""
+    global _ingestor
+    if _ingestor is None:
+        _ingestor = BatchIngestor(JobStore(BATCH_JOBS_PATH))
+    return _ingestor
@@ -0,0 +1,758 @@
+import io
+import os
+import re
+from collections import Counter, namedtuple
+
+import pdfplumber
+from dotenv import load_dotenv
+
+from metrics import layout_parses, timed
+from normalization import classify_link, normalize_url
+from pdf_utils import PDF_SPILL_THRESHOLD, extract_text, is_pdf, pdf_text, read_bytes
+from sections import HEADER_SECTION, match_heading
+
+load_dotenv()
+
+# Parse resumes from known templates without the LLM; documents scoring below
+# LAYOUT_MIN_CONFIDENCE go to the kor chain as before. Off by default: the
+# "headed" template is a generic heuristic that has not been evaluated on real
+# resumes yet
+LAYOUT_PARSER = os.getenv("LAYOUT_PARSER", "false").lower() == "true"
+LAYOUT_MIN_CONFIDENCE = float(os.getenv("LAYOUT_MIN_CONFIDENCE", "0.85"))
+# Templates detected with less than this on the first page are not parsed further
+LAYOUT_MIN_DETECTION = 0.5
+
+# Words whose tops are this many points apart or less are on the same line
+LINE_TOLERANCE = 3
+# Narrowest empty vertical strip that separates a sidebar from the main column
+MIN_GUTTER_WIDTH = 12
+
+# A line of text in one column, with the largest font size of its words
+Line = namedtuple("Line", ["text", "x0", "top", "size", "bold", "page"])
+# Lines of the main column and of the sidebar, if any, over the pages read
+Layout = namedtuple("Layout", ["main", "side", "links", "pages"])
+Template = namedtuple("Template", ["detect", "parse"])
+LayoutResult = namedtuple("LayoutResult", ["template", "confidence", "output"])
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PHONE_PATTERN = re.compile(r"\+?\(?\d[\d\s().-]{6,}\d")
+URL_PATTERN = re.compile(
+    r"(?:https?://|www\.)\S+|\b[a-z0-9-]+\.(?:com|io|dev|me|org|net)(?:/\S*)?",
+    re.IGNORECASE,
+)
+PAGE_FOOTER_PATTERN = re.compile(r"^Page \d+ of \d+$")
+YEAR_PATTERN = re.compile(r"\b(\d{4})\b")
+BULLET_PATTERN = re.compile(r"^\s*[•\-*▪●◦–]\s+")
+LIST_SEPARATOR_PATTERN = re.compile(r"\s*(?:,|;|•|\|)\s*")
+# Labels LinkedIn adds after contact details, e.g. "github.com/jane (Personal)"
+CONTACT_LABEL_PATTERN = re.compile(
+    r"\((?:LinkedIn|Personal|Portfolio|Company|Blog|Other|Mobile|Home|Work)\)"
+)
+PROFESSIONAL_LINK_KEYS = [
+    "linkedin",
+    "github",
+    "portfolio",
+    "gitlab",
+    "bitbucket",
+    "hackerrank",
+    "leetcode",
+    "stackoverflow",
+    "medium",
+    "devto",
+]
+
+
+def is_bold(fontname):
+    return "bold" in (fontname or "").lower()
+
+
+def find_gutter(words, width):
+    """
+    Return the x coordinate of an empty vertical strip with words on both sides,
+    separating a sidebar from the main column, or None for single-column pages.
+    """
+    covered = bytearray(int(width) + 2)
+    for word in words:
+        covered[max(0, int(word["x0"])) : int(word["x1"]) + 1] = b"\x01" * (
+            int(word["x1"]) + 1 - max(0, int(word["x0"]))
+        )
+    best, start = None, None
+    for x in range(int(width * 0.15), int(width * 0.65) + 1):
+        if not covered[x]:
+            start = x if start is None else start
+            continue
+        if start is not None and (best is None or x - start > best[1] - best[0]):
+            best = (start, x)
+        start = None
+    if best is None or best[1] - best[0] < MIN_GUTTER_WIDTH:
+        return None
+
+    gutter = (best[0] + best[1]) / 2
+    left = sum(1 for word in words if word["x1"] < gutter)
+    right = len(words) - left
+    return gutter if min(left, right) >= 5 else None
+
+
+def group_lines(words, page_number):
+    """Group the words of one column into lines, top to bottom"""
+    lines = []
+    current = []
+    for word in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+        if current and abs(word["top"] - current[0]["top"]) > LINE_TOLERANCE:
+            lines.append(current)
+            current = []
+        current.append(word)
+    if current:
+        lines.append(current)
+
+    result = []
+    for line_words in lines:
+        line_words.sort(key=lambda w: w["x0"])
+        result.append(
+            Line(
+                text=" ".join(w["text"] for w in line_words),
+                x0=line_words[0]["x0"],
+                top=line_words[0]["top"],
+                size=round(max(w["size"] for w in line_words), 1),
+                bold=all(is_bold(w.get("fontname")) for w in line_words),
+                page=page_number,
+            )
+        )
+    return result
+
+
+def read_page(page, number):
+    """
+    Returns:
+        Tuple of (main column lines, sidebar lines, link URIs)
+    """
+    words = page.extract_words(extra_attrs=["fontname", "size"])
+    gutter = find_gutter(words, page.width) if words else None
+    if gutter is None:
+        main, side = words, []
+    else:
+        left = [w for w in words if w["x1"] < gutter]
+        right = [w for w in words if w["x1"] >= gutter]
+        # The sidebar is the column with less text, on either side
+        if sum(len(w["text"]) for w in left) < sum(len(w["text"]) for w in right):
+            side, main = left, right
+        else:
+            main, side = left, right
+
+    main_lines = [
+        line
+        for line in group_lines(main, number)
+        if not PAGE_FOOTER_PATTERN.match(line.text)
+    ]
+    links = [annot["uri"] for annot in page.annots or [] if annot.get("uri")]
+    return main_lines, group_lines(side, number), links
+
+
+def read_layout(pdf, pages):
+    main, side, links = [], [], []
+    for number, page in enumerate(pages, start=1):
+        page_main, page_side, page_links = read_page(page, number)
+        main += page_main
+        side += page_side
+        links += page_links
+    return Layout(main, side, links, len(pdf.pages))
+
+
+def body_size(lines):
+    """The most common font size, weighted by characters"""
+    sizes = Counter()
+    for line in lines:
+        sizes[line.size] += len(line.text)
+    return sizes.most_common(1)[0][0] if sizes else 0
+
+
+def is_heading_style(line, size):
+    return line.size > size + 0.5 or (line.bold and len(line.text) <= 40)
+
+
+def split_sections(lines, headings):
+    """
+    Split lines into sections at the heading lines.
+
+    Args:
+        headings: Function returning the section name of a heading line, None for
+            headings of sections that are not extracted, or False for other lines
+
+    Returns:
+        Tuple of (lines before the first heading, {section: [lines]})
+    """
+    preamble, sections = [], {}
+    current = preamble
+    for line in lines:
+        section = headings(line)
+        if section is False:
+            current.append(line)
+            continue
+        current = sections.setdefault(section, []) if section else []
+    return preamble, sections
+
+
+def year(text):
+    years = YEAR_PATTERN.findall(text or "")
+    return years[-1] if years else ""
+
+
+def contact_details(texts, link_uris=()):
+    """
+    Find the email, phone and professional links in contact lines.
+
+    Returns:
+        Tuple of (email, phone, professional_links, remaining texts)
+    """
+    email, phone, links, remaining = "", "", {}, []
+    for text in texts:
+        rest = text
+        match = EMAIL_PATTERN.search(rest)
+        if match and not email:
+            email = match.group(0)
+            rest = rest.replace(email, " ")
+        for url in URL_PATTERN.findall(rest):
+            add_link(links, url)
+            rest = rest.replace(url, " ")
+        match = PHONE_PATTERN.search(rest)
+        if match and not phone and len(re.sub(r"\D", "", match.group(0))) >= 9:
+            phone = match.group(0).strip()
+            rest = rest.replace(match.group(0), " ")
+        rest = CONTACT_LABEL_PATTERN.sub(" ", rest)
+        rest = " ".join(rest.replace("|", " ").split())
+        if rest:
+            remaining.append(rest)
+    for uri in link_uris:
+        if uri.lower().startswith("mailto:"):
+            email = email or uri[len("mailto:") :]
+        elif not uri.lower().startswith("tel:"):
+            add_link(links, uri)
+    return email, phone, links, remaining
+
+
+def add_link(links, url):
+    link = normalize_url(url)
+    key = classify_link(link) if link else None
+    if key is not None and key not in links:
+        links[key] = link
+
+
+def personal_info(full_name, email, phone, location):
+    """personal_info and the address and country parts of a location line"""
+    parts = [part.strip() for part in (location or "").split(",") if part.strip()]
+    country = parts[-1] if len(parts) > 1 else ""
+    address = ", ".join(parts[:-1] if len(parts) > 1 else parts)
+    return [
+        {
+            "full_name": full_name,
+            "email": email,
+            "phone": phone,
+            "address": address,
+            "country": country,
+        }
+    ]
+
+
+def professional_links(links):
+    return [{key: links.get(key, "") for key in PROFESSIONAL_LINK_KEYS}]
+
+
+def split_list(lines):
+    items = []
+    for line in lines:
+        text = BULLET_PATTERN.sub("", line.text)
+        items += [item for item in LIST_SEPARATOR_PATTERN.split(text) if item]
+    return items
+
+
+def completeness(checks):
+    """Share of the checks that passed; checks are booleans or ratios"""
+    checks = [float(check) for check in checks if check is not None]
+    return sum(checks) / len(checks) if checks else 0.0
+
+
+# LinkedIn "Save to PDF" profiles: a sidebar with Contact, Top Skills, Languages
+# and Certifications, and a main column with the name, headline and location
+# followed by Summary, Experience and Education.
+
+LINKEDIN_SIDE_HEADINGS = {
+    "Contact": HEADER_SECTION,
+    "Top Skills": "skills",
+    "Skills": "skills",
+    "Languages": "languages",
+    "Certifications": "certifications",
+    "Honors-Awards": None,
+    "Publications": None,
+    "Patents": None,
+}
+LINKEDIN_MAIN_HEADINGS = {
+    "Summary": None,
+    "Experience": "experiences",
+    "Education": "educations",
+    "Projects": "projects",
+    "Volunteer Experience": None,
+    "Publications": None,
+}
+LINKEDIN_DATE_PATTERN = re.compile(
+    r"^(?P<start>(?:[A-Z][a-z]+ )?\d{4})\s*-\s*(?P<end>(?:[A-Z][a-z]+ )?\d{4}|Present)"
+    r"(?:\s*\((?P<duration>[^)]*)\))?$"
+)
+LINKEDIN_DURATION_PATTERN = re.compile(r"^(?:\d+ (?:years?|months?)\s*)+$")
+LINKEDIN_LANGUAGE_PATTERN = re.compile(
+    r"^(?P<language>[^()]+?)\s*\((?P<proficiency>[^()]+)\)$"
+)
+# "Degree, Field · (2014 - 2018)"; the middle dot may come out as a bullet
+LINKEDIN_EDUCATION_SEPARATOR = re.compile(r"\s*[·•]\s*")
+LINKEDIN_EDUCATION_YEARS = re.compile(r"\((?P<start>[^()-]*)-(?P<end>[^()-]*)\)\s*$")
+
+
+def linkedin_headings(mapping, size):
+    def headings(line):
+        if line.text in mapping and is_heading_style(line, size):
+            return mapping[line.text]
+        return False
+
+    return headings
+
+
+def detect_linkedin(layout):
+    side_heading = linkedin_headings(LINKEDIN_SIDE_HEADINGS, body_size(layout.side))
+    main_heading = linkedin_headings(LINKEDIN_MAIN_HEADINGS, body_size(layout.main))
+    side_headings = {line.text for line in layout.side if side_heading(line) is not False}
+    main_headings = {line.text for line in layout.main if main_heading(line) is not False}
+    linkedin_url = any(
+        "linkedin.com/in/" in text.lower()
+        for text in [line.text for line in layout.side] + layout.links
+    )
+    return completeness(
+        [
+            "Contact" in side_headings,
+            bool(side_headings & {"Top Skills", "Languages", "Certifications"}),
+            bool(main_headings & {"Experience", "Education"}),
+            linkedin_url,
+        ]
+    )
+
+
+def linkedin_contact(lines):
+    """Join contact lines wrapped inside a URL, e.g. a long LinkedIn profile URL"""
+    texts = []
+    for line in lines:
+        previous = texts[-1] if texts else ""
+        if URL_PATTERN.fullmatch(previous) and not CONTACT_LABEL_PATTERN.search(previous):
+            texts[-1] += line.text
+        else:
+            texts.append(line.text)
+    return texts
+
+
+def linkedin_experiences(lines):
+    """
+    Returns:
+        Tuple of (experiences, share of the dated roles with a title and company)
+    """
+    experiences, company = [], ""
+    dates = [i for i, line in enumerate(lines) if LINKEDIN_DATE_PATTERN.match(line.text)]
+    for i in dates:
+        match = LINKEDIN_DATE_PATTERN.match(lines[i].text)
+        title = lines[i - 1] if i >= 1 else None
+        j = i - 2
+        # Several roles at one company share a heading with the total duration
+        while j >= 0 and LINKEDIN_DURATION_PATTERN.match(lines[j].text):
+            j -= 1
+        if title is not None and j >= 0 and lines[j].size > title.size:
+            company = lines[j].text
+
+        location = ""
+        following = lines[i + 1] if i + 1 < len(lines) else None
+        next_is_title = i + 2 in dates
+        if (
+            following is not None
+            and not next_is_title
+            and following.size <= lines[i].size
+            and len(following.text) <= 60
+            and not following.text.endswith(".")
+            and i + 1 not in dates
+        ):
+            location = following.text
+
+        experiences.append(
+            {
+                "job_title": title.text if title is not None else "",
+                "company": company,
+                "location": location,
+                "start_date": year(match.group("start")),
+                "end_date": year(match.group("end")),
+            }
+        )
+    complete = [bool(e["job_title"] and e["company"]) for e in experiences]
+    return experiences, (sum(complete) / len(complete) if complete else None)
+
+
+def linkedin_educations(lines):
+    """
+    Returns:
+        Tuple of (educations, share with an institution and a degree or years)
+    """
+    size = body_size(lines)
+    entries = []
+    for line in lines:
+        if line.size > size or not entries:
+            entries.append([line.text, []])
+        else:
+            entries[-1][1].append(line.text)
+
+    educations = []
+    for institution, details in entries:
+        text = " ".join(details)
+        years = LINKEDIN_EDUCATION_YEARS.search(text)
+        if years:
+            text = text[: years.start()]
+        degree = LINKEDIN_EDUCATION_SEPARATOR.split(text)[0].strip()
+        educations.append(
+            {
+                "degree": degree,
+                "institution": institution,
+                "location": "",
+                "gpa_zscore": "",
+                "start_year": year(years.group("start")) if years else "",
+                "end_year": year(years.group("end")) if years else "",
+            }
+        )
+    complete = [
+        bool(e["institution"] and (e["degree"] or e["end_year"])) for e in educations
+    ]
+    return educations, (sum(complete) / len(complete) if complete else None)
+
+
+def parse_linkedin(layout):
+    side_size = body_size(layout.side)
+    main_size = body_size(layout.main)
+    _, side = split_sections(
+        layout.side, linkedin_headings(LINKEDIN_SIDE_HEADINGS, side_size)
+    )
+    header, main = split_sections(
+        layout.main, linkedin_headings(LINKEDIN_MAIN_HEADINGS, main_size)
+    )
+
+    name = max(header, key=lambda line: line.size).text if header else ""
+    location = header[-1].text if len(header) >= 3 else ""
+    email, phone, links, _ = contact_details(
+        linkedin_contact(side.get(HEADER_SECTION, [])), layout.links
+    )
+    experiences, experience_check = linkedin_experiences(main.get("experiences", []))
+    educations, education_check = linkedin_educations(main.get("educations", []))
+
+    languages = []
+    for line in side.get("languages", []):
+        match = LINKEDIN_LANGUAGE_PATTERN.match(line.text)
+        languages.append(
+            {"language": match.group("language"), "proficiency": match.group("proficiency")}
+            if match
+            else {"language": line.text, "proficiency": ""}
+        )
+
+    candidate = {
+        "personal_info": personal_info(name, email, phone, location),
+        "professional_links": professional_links(links),
+        "educations": educations,
+        "experiences": experiences,
+        "skills": [{"skill": line.text} for line in side.get("skills", [])],
+        "certifications": [
+            {"name": line.text, "issued_by": "", "year": "", "link": ""}
+            for line in side.get("certifications", [])
+        ],
+        "projects": [],
+        "languages": languages,
+        "interests": [],
+    }
+    confidence = completeness(
+        [
+            bool(name),
+            bool(email or links),
+            experience_check,
+            education_check,
+            bool(experiences or educations),
+        ]
+    )
+    return {"candidate": candidate}, confidence
+
+
+# Single-column resumes with a heading per section and one line per entry, as
+# produced by common Word templates:
+#   Software Engineer, Company, Colombo (2019-Present)
+#   B.Sc. Computer Science, University (2015-2019)
+#   Project (Python, React) / description / https://github.com/user/project
+#   AWS Certified Developer - Amazon (2021)
+
+HEADED_EXPERIENCE_PATTERN = re.compile(
+    r"^(?P<title>[^,|]+?)\s*(?:,|\||\bat\b)\s*(?P<company>[^,|(]+?)"
+    r"(?:\s*(?:,|\|)\s*(?P<location>[^|(]+?))?\s*"
+    r"\(?(?P<start>(?:[A-Z][a-z]+\.? )?\d{2,4})?\s*[-–]\s*"
+    r"(?P<end>(?:[A-Z][a-z]+\.? )?\d{2,4}|Present|Current|Now)\)?$"
+)
+HEADED_EDUCATION_PATTERN = re.compile(
+    r"^(?P<degree>.+?)\s*(?:,|\|)\s*(?P<institution>[^,|(]+?)"
+    r"(?:\s*(?:,|\|)\s*(?P<location>[^|(]+?))?\s*"
+    r"\(?(?P<start>\d{2,4})?\s*[-–]\s*(?P<end>\d{2,4}|Present|Current)?\)?$"
+)
+HEADED_GPA_PATTERN = re.compile(
+    r"^(?:GPA|CGPA|Z-?Score)\s*:?\s*(?P<value>.+)$", re.IGNORECASE
+)
+HEADED_PROJECT_PATTERN = re.compile(r"^(?P<name>[^()]+?)\s*\((?P<technologies>[^()]+)\)$")
+HEADED_CERTIFICATION_PATTERN = re.compile(
+    r"^(?P<name>.+?)\s+[-–|]\s+(?P<issued_by>[^()]+?)(?:\s*\((?P<year>\d{4})\))?$"
+)
+HEADED_LANGUAGE_PATTERN = re.compile(
+    r"^(?P<language>[A-Za-z ]+?)(?:\s*(?:\(|:|-|–)\s*(?P<proficiency>[^)]+)\)?)?$"
+)
+
+
+def headed_headings(size):
+    def headings(line):
+        heading = match_heading(line.text)
+        if heading is None or heading[1]:
+            return False
+        if not (is_heading_style(line, size) or line.text.isupper()):
+            return False
+        return heading[0]
+
+    return headings
+
+
+def detect_headed(layout):
+    if layout.side:
+        return 0.0
+    _, sections = split_sections(layout.main, headed_headings(body_size(layout.main)))
+    return min(0.9, 0.3 * len(sections))
+
+
+def parse_entries(lines, parse_line):
+    """
+    Parse the lines of a section with parse_line(text, bullet, entries), which
+    returns whether it used the line.
+
+    Returns:
+        Tuple of (entries, share of the lines used)
+    """
+    entries, used = [], 0
+    for line in lines:
+        bullet = BULLET_PATTERN.match(line.text) is not None
+        text = BULLET_PATTERN.sub("", line.text).strip()
+        used += bool(parse_line(text, bullet, entries))
+    return entries, (used / len(lines) if lines else None)
+
+
+def headed_experience(text, bullet, entries):
+    match = HEADED_EXPERIENCE_PATTERN.match(text)
+    if match is None:
+        # Bullet points describe the previous role, which the schema does not keep
+        return bullet and bool(entries)
+    entries.append(
+        {
+            "job_title": match.group("title").strip(),
+            "company": match.group("company").strip(),
+            "location": (match.group("location") or "").strip(),
+            "start_date": year(match.group("start")),
+            "end_date": year(match.group("end")),
+        }
+    )
+    return True
+
+
+def headed_education(text, bullet, entries):
+    gpa = HEADED_GPA_PATTERN.match(text)
+    if gpa and entries:
+        entries[-1]["gpa_zscore"] = gpa.group("value").strip()
+        return True
+    match = HEADED_EDUCATION_PATTERN.match(text)
+    if match is None:
+        return False
+    entries.append(
+        {
+            "degree": match.group("degree").strip(),
+            "institution": match.group("institution").strip(),
+            "location": (match.group("location") or "").strip(),
+            "gpa_zscore": "",
+            "start_year": match.group("start") or "",
+            "end_year": match.group("end") or "",
+        }
+    )
+    return True
+
+
+def headed_project(text, bullet, entries):
+    match = HEADED_PROJECT_PATTERN.match(text)
+    if match:
+        entries.append(
+            {
+                "name": match.group("name").strip(),
+                "description": "",
+                "technologies": [
+                    {"technology": technology}
+                    for technology in LIST_SEPARATOR_PATTERN.split(match.group("technologies"))
+                    if technology
+                ],
+                "github": "",
+            }
+        )
+        return True
+    if not entries:
+        return False
+    project = entries[-1]
+    urls = URL_PATTERN.findall(text)
+    if urls and len(urls[0]) == len(text):
+        project["github"] = project["github"] or normalize_url(urls[0])
+    else:
+        project["description"] = " ".join(filter(None, [project["description"], text]))
+    return True
+
+
+def headed_certification(text, bullet, entries):
+    match = HEADED_CERTIFICATION_PATTERN.match(text)
+    entries.append(
+        {
+            "name": match.group("name").strip() if match else text,
+            "issued_by": match.group("issued_by").strip() if match else "",
+            "year": (match.group("year") or "") if match else "",
+            "link": "",
+        }
+    )
+    return match is not None
+
+
+def headed_language(text, bullet, entries):
+    match = HEADED_LANGUAGE_PATTERN.match(text)
+    if match is None:
+        return False
+    entries.append(
+        {
+            "language": match.group("language").strip(),
+            "proficiency": (match.group("proficiency") or "").strip(),
+        }
+    )
+    return True
+
+
+HEADED_SECTION_PARSERS = {
+    "experiences": headed_experience,
+    "educations": headed_education,
+    "projects": headed_project,
+    "certifications": headed_certification,
+    "languages": headed_language,
+}
+
+
+def parse_headed(layout):
+    header, sections = split_sections(layout.main, headed_headings(body_size(layout.main)))
+    header += sections.pop(HEADER_SECTION, [])
+
+    name = header[0].text if header else ""
+    email, phone, links, remaining = contact_details(
+        [line.text for line in header[1:]], layout.links
+    )
+    location = remaining[0] if remaining else ""
+
+    candidate = {
+        "personal_info": personal_info(name, email, phone, location),
+        "professional_links": professional_links(links),
+        "skills": [{"skill": s} for s in split_list(sections.get("skills", []))],
+        "interests": [{"interest": i} for i in split_list(sections.get("interests", []))],
+    }
+    checks = [bool(name) and not EMAIL_PATTERN.search(name), bool(email or phone)]
+    for section, parse_line in HEADED_SECTION_PARSERS.items():
+        entries, used = parse_entries(sections.get(section, []), parse_line)
+        candidate[section] = entries
+        checks.append(used)
+    # Contact lines the parser could not place may hold details it has missed
+    checks.append(len(remaining) <= 1)
+    return {"candidate": candidate}, completeness(checks)
+
+
+TEMPLATES = {
+    "linkedin": Template(detect_linkedin, parse_linkedin),
+    "headed": Template(detect_headed, parse_headed),
+}
+
+
+@timed("layout_parse")
+def parse_layout(source):
+    """
+    Extract a resume deterministically from the word positions and fonts of its
+    PDF text layer, when it follows one of the TEMPLATES.
+
+    Templates are detected on the first page; the rest of the document is only
+    read for a detected template. The confidence combines the detection with the
+    share of the fields and section lines the template could parse.
+
+    Args:
+        source: The document as bytes, a binary file-like object or a path
+
+    Returns:
+        LayoutResult with the name of the template, the confidence (0-1) and the
+        output in the shape of the candidate_schema chain output, or with
+        template None when no template was detected
+    """
+    if isinstance(source, (str, os.PathLike)):
+        pdf_source = os.fspath(source)
+    else:
+        data = read_bytes(source)
+        if not is_pdf(data):
+            return LayoutResult(None, 0.0, None)
+        pdf_source = io.BytesIO(data)
+
+    with pdfplumber.open(pdf_source) as pdf:
+        return parse_pdf_layout(pdf)
+
+
+def parse_pdf_layout(pdf):
+    """parse_layout of an open pdfplumber PDF"""
+    if not pdf.pages:
+        return LayoutResult(None, 0.0, None)
+    first_page = read_layout(pdf, pdf.pages[:1])
+    scores = {name: template.detect(first_page) for name, template in TEMPLATES.items()}
+    name = max(scores, key=scores.get)
+    if scores[name] < LAYOUT_MIN_DETECTION:
+        layout_parses.inc(template="none", outcome="undetected")
+        return LayoutResult(None, 0.0, None)
+    layout = read_layout(pdf, pdf.pages) if len(pdf.pages) > 1 else first_page
+
+    output, parsed = TEMPLATES[name].parse(layout)
+    confidence = round(scores[name] * parsed, 3)
+    outcome = "accepted" if confidence >= LAYOUT_MIN_CONFIDENCE else "low_confidence"
+    layout_parses.inc(template=name, outcome=outcome)
+    return LayoutResult(name, confidence, output)
+
+
+def read_resume(source):
+    """
+    Extract a resume without the LLM when the layout parser is confident, and
+    its text for the kor chain otherwise.
+
+    The PDF is opened once for both. Images, and PDFs large enough to be spilled
+    to disk by extract_text, skip the layout parser.
+
+    Returns:
+        Tuple of (candidate_schema output, None) or (None, text)
+    """
+    if not LAYOUT_PARSER:
+        return None, extract_text(source)
+    if isinstance(source, (str, os.PathLike)):
+        pdf_source = os.fspath(source)
+        if not pdf_source.lower().endswith(".pdf"):
+            return None, extract_text(pdf_source)
+    else:
+        data = read_bytes(source)
+        if not is_pdf(data) or len(data) > PDF_SPILL_THRESHOLD:
+            return None, extract_text(data)
+        pdf_source = io.BytesIO(data)
+
+    with pdfplumber.open(pdf_source) as pdf:
+        try:
+            result = parse_pdf_layout(pdf)
+        except Exception as e:
+            print(f"Layout parsing failed: {type(e).__name__}: {str(e)}")
+        else:
+            if result.template is not None and result.confidence >= LAYOUT_MIN_CONFIDENCE:
+                return result.output, None
+        return None, pdf_text(pdf)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+from dotenv import load_dotenv
+from langchain_core.caches import BaseCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+from cache_utils import create_cache
+
+load_dotenv()
+
+# "memory", "sqlite" or "none"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/talent_agent.sqlite3")
+LLM_CACHE_MAX_SIZE = int(os.getenv("LLM_CACHE_MAX_SIZE", "4096"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400")) or None
+# Key prompts on their text with runs of whitespace collapsed, so indentation
+# changes in the prompt templates do not miss the cache
+LLM_CACHE_NORMALIZE = os.getenv("LLM_CACHE_NORMALIZE", "true").lower() == "true"
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+response_store = create_cache(
+    LLM_CACHE_BACKEND,
+    maxsize=LLM_CACHE_MAX_SIZE,
+    ttl=LLM_CACHE_TTL,
+    path=LLM_CACHE_PATH,
+    table="llm_responses",
+)
+
+
+def normalize_prompt(prompt):
+    """
+    Collapse whitespace in every string of a serialized prompt.
+
+    Chat models pass the cache the JSON serialized messages; prompts that are not
+    JSON are normalized as plain text.
+    """
+
+    def normalize(value):
+        if isinstance(value, str):
+            return WHITESPACE_PATTERN.sub(" ", value).strip()
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        return value
+
+    try:
+        return json.dumps(normalize(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        return normalize(prompt)
+
+
+def response_key(prompt, llm_string, normalize=None):
+    normalize = LLM_CACHE_NORMALIZE if normalize is None else normalize
+    if normalize:
+        prompt = normalize_prompt(prompt)
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode()).hexdigest()
+
+
+def serialize_generations(generations):
+    """JSON serializable form of the generations of one LLM call"""
+    serialized = []
+    for generation in generations:
+        entry = {"text": generation.text, "generation_info": generation.generation_info}
+        if isinstance(generation, ChatGeneration):
+            entry["message"] = {
+                "content": generation.message.content,
+                "additional_kwargs": generation.message.additional_kwargs,
+                "response_metadata": generation.message.response_metadata,
+            }
+        serialized.append(entry)
+    return serialized
+
+
+def deserialize_generations(serialized):
+    generations = []
+    for entry in serialized:
+        if "message" in entry:
+            generations.append(
+                ChatGeneration(
+                    message=AIMessage(**entry["message"]),
+                    generation_info=entry["generation_info"],
+                )
+            )
+        else:
+            generations.append(
+                Generation(text=entry["text"], generation_info=entry["generation_info"])
+            )
+    return generations
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain cache that keeps LLM responses in a cache_utils store and counts
+    hits and misses for one named caller, e.g. a chain.
+
+    Several instances can share one store; each keeps its own counters.
+    """
+
+    def __init__(self, store, name, normalize=None):
+        self.store = store
+        self.name = name
+        self.normalize = normalize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt, llm_string):
+        value = self.store.get(response_key(prompt, llm_string, self.normalize))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return deserialize_generations(value)
+
+    def update(self, prompt, llm_string, return_val):
+        self.store.set(
+            response_key(prompt, llm_string, self.normalize),
+            serialize_generations(return_val),
+        )
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_caches = {}
+_lock = threading.Lock()
+
+
+def get_llm_cache(name):
+    """Return the response cache for a named caller, or None when caching is disabled"""
+    if response_store is None:
+        return None
+    with _lock:
+        if name not in _caches:
+            _caches[name] = LLMResponseCache(response_store, name)
+        return _caches[name]
+
+
+def cached_llm(llm, name):
+    """Return a copy of the chat model that caches its responses under `name`"""
+    cache = get_llm_cache(name)
+    if cache is None:
+        return llm
+    return llm.model_copy(update={"cache": cache})
+
+
+def llm_cache_stats():
+    """
+    Returns:
+        Dictionary with the hit and miss counts per caller and the stats of the
+        shared store
+    """
+    with _lock:
+        caches = dict(_caches)
+    return {
+        "store": response_store.stats() if response_store is not None else None,
+        "callers": {name: cache.stats() for name, cache in caches.items()},
+    }
@@ -0,0 +1,380 @@
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+import httpx
+import openai
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+from metrics import llm_rate_limit_wait, llm_retries, registry
+
+load_dotenv()
+
+# OpenAI compatible endpoint, e.g. a local fake server for tests and benchmarks
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+# Account limits shared by every request and model of the process. Both are off
+# (0) unless configured, to match the account's tier
+LLM_RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "0"))
+# Completion tokens reserved per call until the response reports the actual usage
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "300"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_MAX_BACKOFF = float(os.getenv("LLM_MAX_BACKOFF", "30"))
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Priority of the LLM calls made by the current request or task
+llm_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+@contextmanager
+def batch_priority():
+    """Mark the LLM calls made inside the block as batch traffic"""
+    token = llm_priority.set(BATCH)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+class TokenBucketLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets shared by every
+    thread and event loop of the process.
+
+    Callers reserve one request and their estimated tokens before each call and
+    settle the estimate against the reported usage afterwards. Batch callers wait
+    while any interactive caller is waiting, so interactive requests are served
+    first when the limits are reached. A 429 response pauses every caller for the
+    time the API asks for.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = rpm
+        self._tokens = tpm
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = {INTERACTIVE: 0, BATCH: 0}
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _try_acquire(self, tokens, priority):
+        """
+        Returns:
+            0 when the request was admitted, otherwise the seconds to wait before
+            trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if priority == BATCH and self._waiting[INTERACTIVE]:
+                return 0.05
+
+            # A call larger than the whole bucket waits for a full bucket only
+            tokens = min(tokens, self.tpm) if self.tpm else 0
+            waits = []
+            if self.rpm and self._requests < 1:
+                waits.append((1 - self._requests) * 60 / self.rpm)
+            if self.tpm and self._tokens < tokens:
+                waits.append((tokens - self._tokens) * 60 / self.tpm)
+            if waits:
+                return max(waits)
+
+            if self.rpm:
+                self._requests -= 1
+            self._tokens -= tokens
+            return 0
+
+    @contextmanager
+    def _waiter(self, priority):
+        with self._lock:
+            self._waiting[priority] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._waiting[priority] -= 1
+
+    async def acquire(self, tokens, priority=INTERACTIVE):
+        start = time.perf_counter()
+        with self._waiter(priority):
+            while True:
+                wait = self._try_acquire(tokens, priority)
+                if not wait:
+                    break
+                await asyncio.sleep(min(wait, 1.0))
+        llm_rate_limit_wait.observe(time.perf_counter() - start, priority=priority)
+
+    def acquire_sync(self, tokens, priority=INTERACTIVE):
+        start = time.perf_counter()
+        with self._waiter(priority):
+            while True:
+                wait = self._try_acquire(tokens, priority)
+                if not wait:
+                    break
+                time.sleep(min(wait, 1.0))
+        llm_rate_limit_wait.observe(time.perf_counter() - start, priority=priority)
+
+    def settle(self, estimated, actual):
+        """Return the tokens reserved beyond the actual usage, or take the excess"""
+        if not self.tpm or actual is None:
+            return
+        with self._lock:
+            self._tokens = min(self.tpm, self._tokens + estimated - actual)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rpm_limit": self.rpm,
+                "tpm_limit": self.tpm,
+                "requests_available": round(self._requests, 2),
+                "tokens_available": round(self._tokens),
+                "waiting": dict(self._waiting),
+            }
+
+
+rate_limiter = TokenBucketLimiter(LLM_RPM_LIMIT, LLM_TPM_LIMIT)
+
+
+def collect_rate_limiter():
+    stats = rate_limiter.stats()
+    return [
+        (
+            "llm_rate_limit_requests_available",
+            "gauge",
+            "Requests left in the gateway's requests-per-minute bucket",
+            {},
+            stats["requests_available"] if rate_limiter.rpm else None,
+        ),
+        (
+            "llm_rate_limit_tokens_available",
+            "gauge",
+            "Tokens left in the gateway's tokens-per-minute bucket",
+            {},
+            stats["tokens_available"] if rate_limiter.tpm else None,
+        ),
+    ] + [
+        (
+            "llm_rate_limit_waiting",
+            "gauge",
+            "LLM calls waiting for the rate limiter",
+            {"priority": p},
+            n,
+        )
+        for p, n in stats["waiting"].items()
+    ]
+
+
+registry.register_collector(collect_rate_limiter)
+
+
+def retry_delay(error, attempt):
+    """
+    Seconds to wait before retrying a failed call, honouring the Retry-After
+    headers of rate-limited responses and otherwise backing off exponentially
+    with jitter.
+    """
+    response = getattr(error, "response", None)
+    if isinstance(error, openai.RateLimitError) and response is not None:
+        retry_after_ms = response.headers.get("retry-after-ms")
+        retry_after = response.headers.get("retry-after")
+        try:
+            if retry_after_ms:
+                return min(LLM_MAX_BACKOFF, float(retry_after_ms) / 1000)
+            if retry_after:
+                return min(LLM_MAX_BACKOFF, float(retry_after))
+        except ValueError:
+            pass
+    return min(LLM_MAX_BACKOFF, (2**attempt) + random.uniform(0, 1))
+
+
+def retry_reason(error):
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limit"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    return "server_error"
+
+
+def reported_tokens(result):
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    if "total_tokens" not in usage:
+        return None
+    return usage["total_tokens"]
+
+
+class GatewayChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI that goes through the process-wide rate limiter and retries
+    rate-limited, failed and timed out calls with backoff.
+
+    Calls reserve their prompt tokens, counted with `token_counter`, plus
+    LLM_COMPLETION_TOKENS_ESTIMATE before they are sent; the reservation is
+    settled with the usage the response reports. The OpenAI client's own retries
+    are disabled, so a 429 pauses every caller instead of only the one that got it.
+    """
+
+    token_counter: Optional[Callable[[str], int]] = None
+    gateway_retries: int = LLM_MAX_RETRIES
+    limiter: Any = None
+
+    def _limiter(self):
+        return self.limiter or rate_limiter
+
+    def _estimate_tokens(self, messages):
+        text = "\n".join(str(message.content) for message in messages)
+        prompt_tokens = self.token_counter(text) if self.token_counter else len(text) // 4
+        return prompt_tokens + LLM_COMPLETION_TOKENS_ESTIMATE
+
+    def _before_retry(self, limiter, error, attempt):
+        """Record a failed attempt and return the seconds to wait before the next one"""
+        delay = retry_delay(error, attempt)
+        reason = retry_reason(error)
+        print(f"LLM call failed ({reason}), retrying in {delay:.1f}s: {str(error)[:200]}")
+        llm_retries.inc(reason=reason)
+        if reason == "rate_limit":
+            limiter.pause(delay)
+        return delay
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = self._limiter()
+        estimate = self._estimate_tokens(messages)
+        for attempt in range(self.gateway_retries + 1):
+            limiter.acquire_sync(estimate, llm_priority.get())
+            try:
+                result = super()._generate(messages, stop, run_manager, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                limiter.settle(estimate, 0)
+                if attempt == self.gateway_retries:
+                    raise
+                delay = self._before_retry(limiter, e, attempt)
+                time.sleep(delay)
+                continue
+            limiter.settle(estimate, reported_tokens(result))
+            return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = self._limiter()
+        estimate = self._estimate_tokens(messages)
+        for attempt in range(self.gateway_retries + 1):
+            await limiter.acquire(estimate, llm_priority.get())
+            try:
+                result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                limiter.settle(estimate, 0)
+                if attempt == self.gateway_retries:
+                    raise
+                delay = self._before_retry(limiter, e, attempt)
+                await asyncio.sleep(delay)
+                continue
+            limiter.settle(estimate, reported_tokens(result))
+            return result
+
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """
+    One event loop, running in a daemon thread, for the coroutines of synchronous
+    callers. Async connection pools stay bound to the loop that first used them,
+    so a new loop per call (asyncio.run) would find them unusable.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="background-loop", daemon=True
+            )
+            thread.start()
+            _background_loop = loop
+        return _background_loop
+
+
+def run_coroutine(coro):
+    """
+    Run a coroutine to completion on background_loop and return its result, with
+    the caller's context variables, such as llm_priority.
+
+    Raises:
+        RuntimeError: When called from a running event loop, which should await
+            the coroutine instead
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("run_coroutine cannot be called from a running event loop")
+
+    context = contextvars.copy_context()
+
+    async def in_context():
+        for var, value in context.items():
+            var.set(value)
+        return await coro
+
+    return asyncio.run_coroutine_threadsafe(in_context(), background_loop()).result()
+
+
+def create_chat_model(model_name, token_counter=None, **kwargs):
+    """
+    Build the shared chat model: a GatewayChatOpenAI with pooled keep-alive
+    connections, pointed at OPENAI_BASE_URL when it is set.
+
+    The async pool belongs to the event loop that first uses it, the service's
+    loop; synchronous callers run their coroutines with run_coroutine so they
+    share one loop too. Copies made with model_copy share both pools.
+    """
+    limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    )
+    timeout = httpx.Timeout(LLM_TIMEOUT)
+    return GatewayChatOpenAI(
+        model_name=model_name,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=OPENAI_BASE_URL or None,
+        max_retries=0,
+        http_client=httpx.Client(limits=limits, timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+        token_counter=token_counter,
+        **kwargs,
+    )
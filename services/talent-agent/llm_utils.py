@@ -1,10 +1,48 @@
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 
-import os
+import tiktoken
 from dotenv import load_dotenv
 
+from llm_gateway import create_chat_model
+
 load_dotenv()
 
-llm = ChatOpenAI(
-    model_name="gpt-4o", temperature=0, openai_api_key=os.getenv("OPENAI_API_KEY")
+# Shared by every chain: pooled connections, rate limiting and retries are in
+# llm_gateway
+llm = create_chat_model(
+    "gpt-4o", token_counter=lambda text: count_tokens(text), temperature=0
 )
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name):
+    """Return the tiktoken encoding for a model, or None if it cannot be loaded"""
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"Token encoding unavailable, estimating counts: {str(e)}")
+            return None
+
+
+def count_tokens(text, model_name=None):
+    """Count the tokens of text for the model, estimating when tiktoken has no encoding"""
+    encoding = get_encoding(model_name or llm.model_name)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text, max_tokens, model_name=None):
+    """Cut text down to at most max_tokens tokens, marking the cut with an ellipsis"""
+    encoding = get_encoding(model_name or llm.model_name)
+    if encoding is None:
+        if len(text) <= max_tokens * 4:
+            return text
+        return text[: max_tokens * 4].rstrip() + "..."
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]).rstrip() + "..."
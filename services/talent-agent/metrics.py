@@ -0,0 +1,376 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Add a Server-Timing header with the duration of each stage to every response;
+# a request can also ask for it with an X-Server-Timing header
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+METRICS_PREFIX = "talent_agent"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stage durations of the current request, for the Server-Timing header
+request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A metric family with one child per combination of label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, str(labels.get(name, ""))) for name in self.labelnames)
+
+    def samples(self):
+        """Yield (name, labels, value) for every child"""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, key, value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {
+                key: (list(counts), total) for key, (counts, total) in self._values.items()
+            }
+        for key, (counts, total) in sorted(values.items()):
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", key + (("le", format_value(float(bound))),), count
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, counts[-1]
+
+
+class Registry:
+    """
+    Metrics of the process, rendered in the Prometheus text format.
+
+    Collectors are called on every scrape and return the values of state that is
+    kept elsewhere, such as cache counters.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Args:
+            collector: Function returning a list of (name, kind, documentation,
+                labels, value) tuples, with kind "counter" or "gauge" and labels
+                as a dict. Counter names end in _total.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        families = [metric.render() for metric in metrics]
+        collected = {}
+        for collector in collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print(f"Metrics collector failed: {type(e).__name__}: {str(e)}")
+                continue
+            for name, kind, documentation, labels, value in samples:
+                if value is None:
+                    continue
+                family = collected.setdefault(
+                    f"{METRICS_PREFIX}_{name}", (kind, documentation, [])
+                )
+                family[2].append((tuple(sorted(labels.items())), value))
+        for name, (kind, documentation, samples) in collected.items():
+            lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            lines.extend(
+                f"{name}{format_labels(labels)} {format_value(value)}"
+                for labels, value in samples
+            )
+            families.append("\n".join(lines))
+        return "\n".join(families) + "\n"
+
+
+registry = Registry()
+
+stage_duration = registry.register(
+    Histogram("stage_duration_seconds", "Duration of pipeline stages", ["stage"])
+)
+stage_errors = registry.register(
+    Counter("stage_errors_total", "Pipeline stages that raised an error", ["stage"])
+)
+stage_in_flight = registry.register(
+    Gauge("stage_in_flight", "Pipeline stages currently running", ["stage"])
+)
+llm_calls = registry.register(
+    Counter("llm_calls_total", "LLM calls by caller, including cache hits", ["caller"])
+)
+llm_call_duration = registry.register(
+    Histogram("llm_call_duration_seconds", "Duration of LLM calls", ["caller"])
+)
+llm_tokens = registry.register(
+    Counter(
+        "llm_tokens_total",
+        "Tokens reported by the OpenAI responses, excluding cache hits",
+        ["caller", "type"],
+    )
+)
+llm_tier_calls = registry.register(
+    Counter(
+        "llm_tier_calls_total",
+        "LLM task calls by model tier and outcome: accepted, escalated, rejected or failed",
+        ["task", "tier", "outcome"],
+    )
+)
+llm_retries = registry.register(
+    Counter("llm_retries_total", "LLM calls retried by the gateway", ["reason"])
+)
+llm_rate_limit_wait = registry.register(
+    Histogram(
+        "llm_rate_limit_wait_seconds",
+        "Time LLM calls waited for the gateway rate limiter",
+        ["priority"],
+    )
+)
+layout_parses = registry.register(
+    Counter(
+        "layout_parses_total",
+        "Resumes read by the layout parser, by template and outcome: accepted, "
+        "low_confidence or undetected",
+        ["template", "outcome"],
+    )
+)
+skills_scored = registry.register(
+    Counter(
+        "skills_scored_total",
+        "Skill results by how they were obtained: llm, stored, unmatched or failed",
+        ["source"],
+    )
+)
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests", ["method", "path", "status"])
+)
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "Duration of HTTP requests", ["method", "path"])
+)
+http_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests being handled")
+)
+
+
+def record_timing(stage, seconds):
+    """Add a stage duration to the current request's Server-Timing entries"""
+    timings = request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time a block as a pipeline stage, counting it as in flight while it runs"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    stage_in_flight.inc(stage=stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        stage_in_flight.dec(stage=stage)
+        stage_duration.observe(seconds, stage=stage)
+        record_timing(stage, seconds)
+
+
+def timed(stage):
+    """Decorator form of stage_timer, for both regular and async functions"""
+
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Records the calls, durations and token usage of a named LLM caller.
+
+    Token counts come from the usage the OpenAI API reports with each response;
+    responses served from the LLM cache carry no usage and add no tokens.
+    """
+
+    run_inline = True
+
+    def __init__(self, caller):
+        self.caller = caller
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id):
+        start = self._started.pop(run_id, None)
+        llm_calls.inc(caller=self.caller)
+        if start is not None:
+            seconds = time.perf_counter() - start
+            llm_call_duration.observe(seconds, caller=self.caller)
+            record_timing(f"llm_{self.caller}", seconds)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id)
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                llm_tokens.inc(usage[kind], caller=self.caller, type=kind.split("_")[0])
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+        stage_errors.inc(stage=f"llm_{self.caller}")
+
+
+def instrumented_llm(llm, caller):
+    """Return a copy of the chat model that records its metrics under `caller`"""
+    if not METRICS_ENABLED:
+        return llm
+    callbacks = list(llm.callbacks or []) + [LLMMetricsCallback(caller)]
+    return llm.model_copy(update={"callbacks": callbacks})
+
+
+def register_cache(name, cache):
+    """Expose the hit, miss and eviction counters and size of a cache_utils cache"""
+    if cache is None:
+        return
+
+    def collect():
+        stats = cache.stats()
+        labels = {"cache": name}
+        return [
+            ("cache_hits_total", "counter", "Cache hits", labels, stats["hits"]),
+            ("cache_misses_total", "counter", "Cache misses", labels, stats["misses"]),
+            ("cache_evictions_total", "counter", "Cache evictions", labels, stats["evictions"]),
+            ("cache_size", "gauge", "Entries in the cache", labels, stats["size"]),
+        ]
+
+    registry.register_collector(collect)
+
+
+def server_timing_header(timings):
+    """Format stage durations as a Server-Timing header value, in milliseconds"""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+def render_metrics():
+    return registry.render()
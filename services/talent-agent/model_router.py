@@ -0,0 +1,159 @@
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+import llm_utils
+from chain_utils import register_chain
+from llm_cache import cached_llm
+from metrics import instrumented_llm, llm_tier_calls
+
+load_dotenv()
+
+FAST = "fast"
+STANDARD = "standard"
+TIER_MODELS = {
+    FAST: os.getenv("LLM_FAST_MODEL", "gpt-4o-mini"),
+    STANDARD: os.getenv("LLM_STANDARD_MODEL", llm_utils.llm.model_name),
+}
+
+# "fast" and "standard" always use that tier; "escalate" tries the fast tier first
+# and re-runs on the standard tier when its output fails validation. Only phone
+# formatting, whose output is checked against the number format, escalates by
+# default; skill scores have no confidence signal to escalate on and stay on the
+# standard tier
+ROUTES = {FAST: [FAST], STANDARD: [STANDARD], "escalate": [FAST, STANDARD]}
+DEFAULT_TASK_ROUTES = {
+    "phone_format": "escalate",
+    "skill_scoring": STANDARD,
+    "batch_skill_scoring": STANDARD,
+    "extraction": STANDARD,
+}
+# Per task overrides, e.g. "extraction=escalate,section_skills=fast"
+LLM_TASK_ROUTES = os.getenv("LLM_TASK_ROUTES", "")
+LLM_DEFAULT_ROUTE = os.getenv("LLM_DEFAULT_ROUTE", STANDARD)
+
+
+def parse_task_routes(value):
+    routes = dict(DEFAULT_TASK_ROUTES)
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        task, _, route = item.partition("=")
+        routes[task.strip()] = route.strip()
+    for task, route in list(routes.items()) + [("default", LLM_DEFAULT_ROUTE)]:
+        if route not in ROUTES:
+            raise ValueError(f"Unsupported LLM route for {task}: {route}")
+    return routes
+
+
+TASK_ROUTES = parse_task_routes(LLM_TASK_ROUTES)
+
+
+def task_tiers(task):
+    """Tiers a task's calls go through, in order"""
+    return ROUTES[TASK_ROUTES.get(task, LLM_DEFAULT_ROUTE)]
+
+
+def task_models(task):
+    """Models that may answer a task, to fingerprint cached and stored results"""
+    return tuple(TIER_MODELS[tier] for tier in task_tiers(task))
+
+
+def routing_fingerprint():
+    """The tier models and task routes, for results that depend on every task"""
+    return repr((sorted(TIER_MODELS.items()), sorted(TASK_ROUTES.items()), LLM_DEFAULT_ROUTE))
+
+
+@lru_cache(maxsize=None)
+def tier_llm(tier):
+    """The shared chat model, pointed at the tier's model"""
+    if TIER_MODELS[tier] == llm_utils.llm.model_name:
+        return llm_utils.llm
+    return llm_utils.llm.model_copy(update={"model_name": TIER_MODELS[tier]})
+
+
+def tier_name(task, tier):
+    """Chain and metrics name of a task on a tier; the standard tier keeps the task name"""
+    return task if tier == STANDARD else f"{task}_{tier}"
+
+
+def kor_output_valid(response):
+    """A kor chain response that parsed without errors and extracted something"""
+    return bool(response) and not response.get("errors") and bool(response.get("data"))
+
+
+class RoutedRunnable:
+    """
+    Runs a task on the first of its tiers and escalates to the next one when the
+    output is rejected by `accept` or the call fails. The last tier's output is
+    returned as is, and its errors are raised; a rejected last-tier output is
+    counted as rejected.
+
+    Calls are counted per task, tier and outcome in llm_tier_calls_total.
+    """
+
+    def __init__(self, task, runnables, accept=None):
+        self.task = task
+        self.runnables = runnables
+        self.accept = accept or kor_output_valid
+
+    def _final(self, tier, last, output, error, accept):
+        """Record the outcome of a tier's attempt and return whether it is final"""
+        if error is not None:
+            llm_tier_calls.inc(task=self.task, tier=tier, outcome="failed")
+            if last:
+                raise error
+            print(f"{self.task} failed on the {tier} tier, escalating: {type(error).__name__}")
+            return False
+        if (accept or self.accept)(output):
+            llm_tier_calls.inc(task=self.task, tier=tier, outcome="accepted")
+            return True
+        llm_tier_calls.inc(task=self.task, tier=tier, outcome="rejected" if last else "escalated")
+        return last
+
+    def invoke(self, input, accept=None, **kwargs):
+        """
+        Args:
+            accept: Validation for this call, replacing the task's own
+        """
+        tiers = list(self.runnables)
+        for i, tier in enumerate(tiers):
+            output, error = None, None
+            try:
+                output = self.runnables[tier].invoke(input, **kwargs)
+            except Exception as e:
+                error = e
+            if self._final(tier, i == len(tiers) - 1, output, error, accept):
+                return output
+
+    async def ainvoke(self, input, accept=None, **kwargs):
+        tiers = list(self.runnables)
+        for i, tier in enumerate(tiers):
+            output, error = None, None
+            try:
+                output = await self.runnables[tier].ainvoke(input, **kwargs)
+            except Exception as e:
+                error = e
+            if self._final(tier, i == len(tiers) - 1, output, error, accept):
+                return output
+
+
+def register_routed_chain(task, node, accept=None, **kwargs):
+    """register_chain for each of the task's tiers, behind a RoutedRunnable"""
+    chains = {
+        tier: register_chain(tier_name(task, tier), tier_llm(tier), node, **kwargs)
+        for tier in task_tiers(task)
+    }
+    return RoutedRunnable(task, chains, accept)
+
+
+def routed_llm(task, accept):
+    """The chat model for a task's direct calls, with cached and instrumented tiers"""
+    models = {
+        tier: cached_llm(
+            instrumented_llm(tier_llm(tier), tier_name(task, tier)), tier_name(task, tier)
+        )
+        for tier in task_tiers(task)
+    }
+    return RoutedRunnable(task, models, accept)
@@ -0,0 +1,252 @@
+import re
+
+COUNTRY_DIAL_CODES = {
+    "afghanistan": "93",
+    "argentina": "54",
+    "australia": "61",
+    "austria": "43",
+    "bahrain": "973",
+    "bangladesh": "880",
+    "belgium": "32",
+    "bhutan": "975",
+    "brazil": "55",
+    "bulgaria": "359",
+    "cambodia": "855",
+    "canada": "1",
+    "chile": "56",
+    "china": "86",
+    "colombia": "57",
+    "croatia": "385",
+    "czech republic": "420",
+    "czechia": "420",
+    "denmark": "45",
+    "egypt": "20",
+    "estonia": "372",
+    "ethiopia": "251",
+    "finland": "358",
+    "france": "33",
+    "germany": "49",
+    "ghana": "233",
+    "greece": "30",
+    "hong kong": "852",
+    "hungary": "36",
+    "india": "91",
+    "indonesia": "62",
+    "iran": "98",
+    "iraq": "964",
+    "ireland": "353",
+    "israel": "972",
+    "italy": "39",
+    "japan": "81",
+    "jordan": "962",
+    "kenya": "254",
+    "kuwait": "965",
+    "latvia": "371",
+    "lebanon": "961",
+    "lithuania": "370",
+    "luxembourg": "352",
+    "malaysia": "60",
+    "maldives": "960",
+    "mexico": "52",
+    "morocco": "212",
+    "myanmar": "95",
+    "nepal": "977",
+    "netherlands": "31",
+    "the netherlands": "31",
+    "new zealand": "64",
+    "nigeria": "234",
+    "norway": "47",
+    "oman": "968",
+    "pakistan": "92",
+    "peru": "51",
+    "philippines": "63",
+    "poland": "48",
+    "portugal": "351",
+    "qatar": "974",
+    "romania": "40",
+    "russia": "7",
+    "saudi arabia": "966",
+    "serbia": "381",
+    "singapore": "65",
+    "slovakia": "421",
+    "slovenia": "386",
+    "south africa": "27",
+    "south korea": "82",
+    "korea": "82",
+    "spain": "34",
+    "sri lanka": "94",
+    "sweden": "46",
+    "switzerland": "41",
+    "taiwan": "886",
+    "tanzania": "255",
+    "thailand": "66",
+    "turkey": "90",
+    "turkiye": "90",
+    "uganda": "256",
+    "ukraine": "380",
+    "united arab emirates": "971",
+    "uae": "971",
+    "united kingdom": "44",
+    "uk": "44",
+    "great britain": "44",
+    "england": "44",
+    "scotland": "44",
+    "wales": "44",
+    "united states": "1",
+    "united states of america": "1",
+    "usa": "1",
+    "us": "1",
+    "vietnam": "84",
+    "zambia": "260",
+    "zimbabwe": "263",
+}
+
+DIAL_CODES = set(COUNTRY_DIAL_CODES.values())
+# Countries whose national numbers keep their leading 0 after the country code
+LEADING_ZERO_DIAL_CODES = {"39"}
+
+PHONE_NUMBER_PATTERN = re.compile(r"^\+\d{1,3}\s\d{9,10}$")
+# "+44 (0) 20 ..." style numbers repeat the national trunk prefix in brackets
+TRUNK_PREFIX_PATTERN = re.compile(r"\(\s*0\s*\)")
+EXTENSION_PATTERN = re.compile(r"\s*(?:ext\.?|extension|x)\s*\d+\s*$", re.IGNORECASE)
+PHONE_SEPARATOR_PATTERN = re.compile(r"\s*(?:/|,|;|\bor\b)\s*")
+NON_DIGIT_PATTERN = re.compile(r"\D")
+
+PROFESSIONAL_LINK_PATTERNS = {
+    "linkedin": re.compile(r"^https?://(www\.)?linkedin\.com/.*$"),
+    "github": re.compile(r"^https?://(www\.)?github\.com/.*$"),
+    "gitlab": re.compile(r"^https?://(www\.)?gitlab\.com/.*$"),
+    "bitbucket": re.compile(r"^https?://(www\.)?bitbucket\.org/.*$"),
+    "hackerrank": re.compile(r"^https?://(www\.)?hackerrank\.com/.*$"),
+    "leetcode": re.compile(r"^https?://(www\.)?leetcode\.com/.*$"),
+    "devto": re.compile(r"^https?://(www\.)?dev\.to/.*$"),
+    "medium": re.compile(r"^https?://(www\.)?medium\.com/.*$"),
+    "stackoverflow": re.compile(r"^https?://(www\.)?stackoverflow\.com/.*$"),
+}
+PORTFOLIO_PATTERN = re.compile(r"^https?://.*$")
+# All of PROFESSIONAL_LINK_PATTERNS as one alternation, so a link is classified
+# with a single match
+LINK_CLASSIFIER_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{key}>{pattern.pattern})"
+        for key, pattern in PROFESSIONAL_LINK_PATTERNS.items()
+    )
+)
+URL_SCHEME_PATTERN = re.compile(r"^[a-z][a-z0-9+.-]*://", re.IGNORECASE)
+BARE_DOMAIN_PATTERN = re.compile(r"^(www\.)?[a-z0-9-]+(\.[a-z0-9-]+)+(/|$)", re.IGNORECASE)
+
+
+def dial_code_for_country(country):
+    if not country:
+        return None
+    return COUNTRY_DIAL_CODES.get(country.strip().lower().rstrip("."))
+
+
+def split_dial_code(digits):
+    """Split an international number into its (dial code, national number)"""
+    for length in (1, 2, 3):
+        if digits[:length] in DIAL_CODES:
+            return digits[:length], digits[length:]
+    return None, digits
+
+
+def normalize_phone(phone, country=""):
+    """
+    Format a phone number as +<country code><space><national number>.
+
+    Numbers written with a + or 00 prefix keep their own country code; otherwise
+    the code is taken from the candidate's country and the national trunk 0 is
+    dropped. Only the first number is used when several are listed.
+
+    Returns:
+        The formatted number, or None when it cannot be determined reliably
+    """
+    if not phone:
+        return None
+    phone = PHONE_SEPARATOR_PATTERN.split(str(phone).strip())[0]
+    phone = EXTENSION_PATTERN.sub("", TRUNK_PREFIX_PATTERN.sub("", phone)).strip()
+    digits = NON_DIGIT_PATTERN.sub("", phone)
+    if not digits:
+        return None
+
+    if phone.startswith("+") or digits.startswith("00"):
+        dial_code, national = split_dial_code(
+            digits[2:] if not phone.startswith("+") else digits
+        )
+    else:
+        dial_code = dial_code_for_country(country)
+        national = digits[1:] if digits.startswith("0") else digits
+        if dial_code and len(national) > 10 and national.startswith(dial_code):
+            national = national[len(dial_code) :]
+
+    if not dial_code:
+        return None
+    if national.startswith("0") and dial_code not in LEADING_ZERO_DIAL_CODES:
+        national = national[1:]
+
+    formatted = f"+{dial_code} {national}"
+    if not PHONE_NUMBER_PATTERN.match(formatted):
+        return None
+    return formatted
+
+
+def normalize_url(link):
+    """Trim a link and add https:// to bare domains such as github.com/user"""
+    if not isinstance(link, str):
+        return ""
+    link = link.strip().rstrip(".,;)")
+    if link and not URL_SCHEME_PATTERN.match(link) and BARE_DOMAIN_PATTERN.match(link):
+        link = f"https://{link}"
+    return link
+
+
+def classify_link(link):
+    """Return the professional_links key a URL belongs to, or None"""
+    match = LINK_CLASSIFIER_PATTERN.match(link)
+    if match:
+        return match.lastgroup
+    if PORTFOLIO_PATTERN.match(link):
+        return "portfolio"
+    return None
+
+
+def normalize_professional_links(professional_links):
+    """
+    Validate and normalize the professional_links of a candidate in place.
+
+    Links are normalized with normalize_url and classified by their host. A link
+    extracted under the wrong key (e.g. a GitHub URL as portfolio) is moved to its
+    own key when that key has no valid link; links that are not valid URLs for
+    their key are removed. Keys outside professional_links_schema are left as is.
+    """
+    normalized = {}
+    misplaced = []
+    for key, link in professional_links.items():
+        if key not in PROFESSIONAL_LINK_PATTERNS and key != "portfolio":
+            normalized[key] = link
+            continue
+
+        if not link:
+            continue
+        link = normalize_url(link)
+        link_type = classify_link(link) if link else None
+        if link_type == key:
+            normalized[key] = link
+        elif link_type is not None:
+            misplaced.append((key, link_type, link))
+
+    for key, link_type, link in misplaced:
+        if link_type in PROFESSIONAL_LINK_PATTERNS and link_type not in normalized:
+            normalized[link_type] = link
+        elif key == "portfolio" and key not in normalized:
+            normalized[key] = link
+
+    professional_links.clear()
+    professional_links.update(normalized)
+    return professional_links
+
+
+def normalize_github_link(link):
+    """Return the normalized GitHub URL, or an empty string for any other link"""
+    link = normalize_url(link)
+    return link if classify_link(link) == "github" else ""
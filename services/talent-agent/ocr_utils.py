@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import pytesseract
+from dotenv import load_dotenv
+
+from metrics import timed
+
+load_dotenv()
+
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() == "true"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "60"))
+# Pages whose text layer has fewer characters than this are OCRed.
+OCR_PAGE_MIN_CHARS = int(os.getenv("OCR_PAGE_MIN_CHARS", "20"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_ocr_executor():
+    """Return the shared tesseract process pool, or None when OCR runs inline"""
+    global _executor
+    if OCR_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+        return _executor
+
+
+def ocr_image(image, deadline=None):
+    """
+    OCR an image, stopping tesseract once the wall-clock `deadline` has passed.
+
+    pytesseract kills the tesseract process when its timeout expires, so a page
+    that runs over the time limit does not keep a pool worker busy.
+    """
+    timeout = 0
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise RuntimeError("Tesseract process timeout")
+    return pytesseract.image_to_string(image, timeout=timeout)
+
+
+def rasterize_page(page):
+    """Render a pdfplumber page in memory, without writing the PDF to disk"""
+    image = page.to_image(resolution=OCR_DPI).original
+    return image.convert("L" if OCR_GRAYSCALE else "RGB")
+
+
+@timed("ocr")
+def ocr_pages(pdf, page_numbers, max_pages=None, timeout=None):
+    """
+    OCR the given pages of a PDF across the tesseract process pool.
+
+    Pages are rasterized one at a time and handed to the pool as they are rendered,
+    with at most OCR_WORKERS pages waiting, so a long scan is never held in memory
+    all at once. Only the first `max_pages` pages are processed, and pages that are
+    not finished within `timeout` seconds are skipped; their tesseract processes
+    are stopped at the same time.
+
+    Args:
+        pdf: The open pdfplumber PDF
+        page_numbers: 1-based page numbers to OCR
+        max_pages: Maximum number of pages to OCR (default: OCR_MAX_PAGES)
+        timeout: Overall time budget in seconds (default: OCR_TIMEOUT)
+
+    Returns:
+        Dictionary mapping page number to its OCR text
+    """
+    max_pages = OCR_MAX_PAGES if max_pages is None else max_pages
+    timeout = OCR_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    # Pool workers are other processes, so they are given a wall-clock deadline
+    ocr_deadline = time.time() + timeout
+    executor = get_ocr_executor()
+
+    results = {}
+    pending = deque()
+
+    def collect(page_number, future):
+        try:
+            results[page_number] = future.result(
+                timeout=max(0.0, deadline - time.monotonic())
+            )
+        except TimeoutError:
+            future.cancel()
+            print(f"OCR timed out on page {page_number}")
+        except Exception as e:
+            print(f"OCR failed on page {page_number}: {type(e).__name__}: {str(e)}")
+
+    for page_number in list(page_numbers)[:max_pages]:
+        if time.monotonic() >= deadline:
+            print(f"OCR time limit reached, skipping pages from {page_number}")
+            break
+
+        image = rasterize_page(pdf.pages[page_number - 1])
+        if executor is None:
+            try:
+                results[page_number] = ocr_image(image, ocr_deadline)
+            except RuntimeError as e:
+                print(f"OCR failed on page {page_number}: {str(e)}")
+            continue
+
+        pending.append((page_number, executor.submit(ocr_image, image, ocr_deadline)))
+        del image
+        if len(pending) >= OCR_WORKERS:
+            collect(*pending.popleft())
+
+    while pending:
+        collect(*pending.popleft())
+
+    return results
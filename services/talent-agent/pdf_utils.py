@@ -1,34 +1,128 @@
+import io
+import os
+import tempfile
+
 import pdfplumber
-from pdf2image import convert_from_path
 import pytesseract
 from PIL import Image
+from dotenv import load_dotenv
+
+from metrics import timed
+from ocr_utils import OCR_PAGE_MIN_CHARS, ocr_pages
+
+load_dotenv()
+
+# Uploads larger than this many bytes are written to a temporary file instead of
+# being processed in memory.
+PDF_SPILL_THRESHOLD = int(os.getenv("PDF_SPILL_THRESHOLD", str(20 * 1024 * 1024)))
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".gif")
+
+
+@timed("text_extraction")
+def extract_text(source):
+    """
+    Extract the text of a resume, falling back to OCR for scanned documents.
 
+    Args:
+        source: Path to a PDF or image file, or the document itself as bytes,
+            bytearray, memoryview or a binary file-like object. In-memory PDFs
+            are sniffed by their %PDF header; anything else is treated as an image.
 
-def extract_text(file_path):
-    text = ""
+    Returns:
+        The extracted text, with link annotations appended as [Link: ...] markers
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return extract_text_from_path(os.fspath(source))
 
+    data = read_bytes(source)
+    if not is_pdf(data):
+        return pytesseract.image_to_string(Image.open(io.BytesIO(data)))
+
+    if len(data) > PDF_SPILL_THRESHOLD:
+        return extract_text_from_spilled_pdf(data)
+
+    return extract_pdf_text(io.BytesIO(data))
+
+
+def extract_text_from_path(file_path):
     if file_path.lower().endswith(".pdf"):
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                extracted_text = page.extract_text()
-                if extracted_text:
-                    text += extracted_text + "\n"
-
-                for annot in page.annots or []:
-                    if annot.get("uri"):
-                        link = annot["uri"]
-                        text += f" [Link: {link}] "
-
-        if len(text) < 100:
-            images = convert_from_path(file_path)
-            for img in images:
-                text += pytesseract.image_to_string(img)
-
-    elif file_path.lower().endswith((".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".gif")):
+        return extract_pdf_text(file_path)
+
+    elif file_path.lower().endswith(IMAGE_EXTENSIONS):
         img = Image.open(file_path)
-        text = pytesseract.image_to_string(img)
+        return pytesseract.image_to_string(img)
 
     else:
         raise ValueError("Unsupported file format. Please provide a PDF or an image.")
 
+
+def extract_text_from_spilled_pdf(data):
+    """Extract a large PDF through a uniquely named temporary file"""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(data)
+        file_path = f.name
+    try:
+        return extract_text_from_path(file_path)
+    finally:
+        os.remove(file_path)
+
+
+def extract_pdf_text(pdf_source):
+    """
+    Extract text from a PDF opened from a path or a binary stream.
+
+    When the text layer holds less than 100 characters, the pages without a usable
+    text layer are rendered from the open document, OCRed and their text is placed
+    in page order.
+
+    Args:
+        pdf_source: Anything pdfplumber.open accepts
+    """
+    with pdfplumber.open(pdf_source) as pdf:
+        return pdf_text(pdf)
+
+
+def pdf_text(pdf):
+    """The text of an open pdfplumber PDF, see extract_pdf_text"""
+    pages = []
+    for page in pdf.pages:
+        page_text = ""
+        extracted_text = page.extract_text()
+        if extracted_text:
+            page_text += extracted_text + "\n"
+
+        for annot in page.annots or []:
+            if annot.get("uri"):
+                link = annot["uri"]
+                page_text += f" [Link: {link}] "
+
+        pages.append(page_text)
+
+    text = "".join(pages)
+    if len(text) < 100:
+        scanned_pages = [
+            i + 1
+            for i, page_text in enumerate(pages)
+            if len(page_text.strip()) < OCR_PAGE_MIN_CHARS
+        ]
+        ocr_text = ocr_pages(pdf, scanned_pages)
+        text = "".join(
+            page_text + ocr_text.get(i + 1, "") for i, page_text in enumerate(pages)
+        )
+
     return text
+
+
+def read_bytes(source):
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return source.read()
+    raise ValueError("Unsupported source. Please provide a file path, bytes or a file object.")
+
+
+def is_pdf(data):
+    return b"%PDF" in data[:1024]
@@ -0,0 +1,142 @@
+import asyncio
+import contextvars
+import functools
+import os
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from layout_parser import read_resume
+from metrics import stage_timer
+from model_router import register_routed_chain
+from resume_cache import cache_resume, get_cached_resume
+from schemas import candidate_schema
+from sections import EXTRACTION_MODE, extract_sections, section_inputs
+from validation import format_candidate_data
+
+load_dotenv()
+
+# "thread" or "process"; a process pool keeps pdfplumber parsing off the GIL.
+EXTRACTION_EXECUTOR = os.getenv("EXTRACTION_EXECUTOR", "thread")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+# Maximum number of extractions running or waiting before new ones are rejected.
+EXTRACTION_QUEUE_SIZE = int(os.getenv("EXTRACTION_QUEUE_SIZE", "16"))
+PARSE_LLM_CONCURRENCY = int(os.getenv("PARSE_LLM_CONCURRENCY", "8"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """
+    Runs blocking functions on an executor from async code, rejecting new work with
+    QueueFullError once `max_pending` calls are running or waiting.
+    """
+
+    def __init__(self, executor, max_pending):
+        self._executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise QueueFullError(
+                f"{self.pending} tasks already queued (limit {self.max_pending})"
+            )
+        self.pending += 1
+        if isinstance(self._executor, ThreadPoolExecutor):
+            # Carry the request's context, e.g. its stage timings, into the thread
+            func = functools.partial(contextvars.copy_context().run, func)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_extraction_executor():
+    if EXTRACTION_EXECUTOR == "process":
+        executor = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    else:
+        executor = ThreadPoolExecutor(
+            max_workers=EXTRACTION_WORKERS, thread_name_prefix="extraction"
+        )
+    return BoundedExecutor(executor, EXTRACTION_QUEUE_SIZE)
+
+
+extraction_chain = register_routed_chain(
+    "extraction",
+    candidate_schema,
+    encoder_or_encoder_class="json",
+    input_formatter=None,
+)
+extraction_executor = create_extraction_executor()
+llm_semaphore = asyncio.Semaphore(PARSE_LLM_CONCURRENCY)
+
+
+async def extract_resume(data):
+    """
+    Stage 1: layout parsing, text extraction and OCR on the extraction pool.
+
+    Returns:
+        Tuple of (candidate_schema output, None) for resumes the layout parser
+        handled, otherwise (None, text) for the kor extraction
+    """
+    return await extraction_executor.run(read_resume, data)
+
+
+async def extract_candidate(resume_content):
+    """
+    Stage 2: kor extraction on the async LLM client.
+
+    In "sections" mode the resume is split by its headings and each section is
+    extracted concurrently with its own sub-schema; resumes that cannot be
+    segmented fall back to the single candidate_schema call.
+    """
+    with stage_timer("kor_extraction"):
+        if EXTRACTION_MODE == "sections":
+            inputs = section_inputs(resume_content)
+            if inputs is not None:
+                return await extract_sections(inputs, llm_semaphore)
+
+        async with llm_semaphore:
+            return (await extraction_chain.ainvoke(resume_content))["data"]
+
+
+async def format_candidate(output):
+    """Stage 3: validation and normalization, kept off the event loop"""
+    with stage_timer("validation"):
+        return await asyncio.to_thread(format_candidate_data, output)
+
+
+async def parse_resume(data, extract=extract_resume, llm_limit=None):
+    """
+    Parse an uploaded resume into the structuredObject returned by /resumes/parse.
+
+    Args:
+        data: The uploaded bytes
+        extract: Coroutine function running stage 1, e.g. one that waits for room
+            on the extraction pool instead of failing
+        llm_limit: Semaphore limiting the kor extractions of one kind of caller,
+            in addition to PARSE_LLM_CONCURRENCY
+
+    Raises:
+        QueueFullError: If the extraction pool is saturated
+    """
+    structured_object = await asyncio.to_thread(get_cached_resume, data)
+    if structured_object is not None:
+        return structured_object
+
+    output, resume_content = await extract(data)
+    if output is None:
+        async with llm_limit or nullcontext():
+            output = await extract_candidate(resume_content)
+    structured_object = await format_candidate(output)
+
+    await asyncio.to_thread(cache_resume, data, structured_object)
+    return structured_object
@@ -0,0 +1,229 @@
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+from llm_utils import count_tokens, truncate_tokens
+from relevance import candidate_section
+
+load_dotenv()
+
+# Tokens the candidate sections of a scoring prompt may take up; 0 disables the
+# budget. Entries that mention none of the scored skills are shortened and then
+# left out first; entries that mention a skill are shortened but always kept.
+SCORING_PROMPT_TOKEN_BUDGET = int(os.getenv("SCORING_PROMPT_TOKEN_BUDGET", "1500"))
+# Project descriptions longer than this are truncated before projects are cut
+# down to their name and technologies
+PROMPT_DESCRIPTION_MAX_TOKENS = int(os.getenv("PROMPT_DESCRIPTION_MAX_TOKENS", "80"))
+
+SECTION_LABELS = {
+    "experiences": "experiences",
+    "certifications": "certifications",
+    "projects": "projects",
+    "educations": "education entries",
+    "skills": "skills",
+}
+
+
+@lru_cache(maxsize=8192)
+def text_tokens(text):
+    return count_tokens(text)
+
+
+def format_github(info):
+    """Render the GitHub stats of a project in one short line"""
+    if not info:
+        return ""
+    if "error" in info:
+        return " [GitHub: unavailable]"
+    updated = str(info.get("last_updated") or "")[:10]
+    stats = [
+        f"{info.get('stars', 0)} stars",
+        f"{info.get('forks', 0)} forks",
+        f"{info.get('commits', 0)} commits",
+        f"{info.get('merged_prs', 0)} merged PRs",
+    ]
+    if updated:
+        stats.append(f"updated {updated}")
+    return f" [GitHub: {', '.join(stats)}]"
+
+
+def experience_forms(exp, github_info):
+    return [f"{exp.get('job_title', '')} at {exp.get('company', '')}"]
+
+
+def certification_forms(cert, github_info):
+    return [f"{cert.get('name', '')} from {cert.get('issued_by', '')}"]
+
+
+def project_forms(project, github_info):
+    """The project in full, with a truncated description, and as name and technologies"""
+    name = project.get("name", "")
+    description = project.get("description") or ""
+    tech_stack = project.get("technologies") or []
+    tech_text = ", ".join(map(str, tech_stack)) if tech_stack else "Not specified"
+    github = format_github(github_info.get(project.get("github") or ""))
+
+    forms = [f"{name}: {description} (Technologies: {tech_text}){github}"]
+    truncated = truncate_tokens(description, PROMPT_DESCRIPTION_MAX_TOKENS)
+    if truncated != description:
+        forms.append(f"{name}: {truncated} (Technologies: {tech_text}){github}")
+    if description:
+        forms.append(f"{name} (Technologies: {tech_text}){github}")
+    return forms
+
+
+def education_forms(edu, github_info):
+    degree = edu.get("degree", "")
+    institution = edu.get("institution", "")
+    return [
+        f"{degree} from {institution}. GPA(out of 4 or 4.2) or Z_score: "
+        f"{edu.get('gpa_zscore', '')}",
+        f"{degree} from {institution}",
+    ]
+
+
+def listed_skill_forms(entry, github_info):
+    return [entry.get("skill", "") if isinstance(entry, dict) else str(entry)]
+
+
+SECTION_FORMS = {
+    "experiences": experience_forms,
+    "certifications": certification_forms,
+    "projects": project_forms,
+    "educations": education_forms,
+    "skills": listed_skill_forms,
+}
+
+
+def mark_relevant(text, skill, matched):
+    """Prefix text with a relevance marker for the matched skills"""
+    if not matched:
+        return text
+    if isinstance(skill, str):
+        return f"[RELEVANT] {text}"
+    return f"[RELEVANT: {', '.join(matched)}] {text}"
+
+
+class PromptEntry:
+    """
+    One entry of a candidate section, with its renderings from the most to the
+    least detailed. Stepping past the last rendering leaves the entry out.
+    """
+
+    def __init__(self, section, position, matched, forms):
+        self.section = section
+        self.position = position
+        self.matched = matched
+        self.forms = forms
+        self.level = 0
+
+    @property
+    def dropped(self):
+        return self.level >= len(self.forms)
+
+    @property
+    def text(self):
+        return None if self.dropped else self.forms[self.level]
+
+    @property
+    def tokens(self):
+        return 0 if self.dropped else text_tokens(self.forms[self.level])
+
+
+def compact_entries(entries, budget):
+    """
+    Shorten entries until their renderings fit in the token budget.
+
+    Entries that mention none of the skills are shortened to their most compact
+    form and then left out; after them, entries that mention a skill are
+    shortened, those matching the fewest skills first. Within each step, entries
+    later in their section go first. Matched entries are never left out, so the
+    budget is a target rather than a hard limit for candidates with a lot of
+    evidence.
+    """
+    total = sum(entry.tokens for entry in entries)
+    if budget <= 0 or total <= budget:
+        return
+
+    unmatched = [entry for entry in entries if not entry.matched]
+    matched = [entry for entry in entries if entry.matched]
+    steps = [
+        (unmatched, lambda entry: len(entry.forms) - 1),
+        (unmatched, lambda entry: len(entry.forms)),
+        (matched, lambda entry: len(entry.forms) - 1),
+    ]
+    for group, target in steps:
+        for entry in sorted(group, key=lambda e: (len(e.matched), -e.position)):
+            while entry.level < target(entry) and total > budget:
+                before = entry.tokens
+                entry.level += 1
+                total += entry.tokens - before
+            if total <= budget:
+                return
+
+
+def render_section(section, entries, separator="\n"):
+    kept = [entry.text for entry in entries if not entry.dropped]
+    omitted = len(entries) - len(kept)
+    text = separator.join(filter(None, kept))
+    if omitted:
+        note = f"({omitted} less relevant {SECTION_LABELS[section]} omitted)"
+        text = f"{text}{separator}{note}" if text else note
+    return text or "None"
+
+
+def build_candidate_sections(
+    candidate, skill, index, github_info, prefilter=True, budget=None
+):
+    """
+    Format the candidate sections for a prompt about a skill (or a list of skills).
+
+    Entries are tagged with the skills they mention and ordered by the number of
+    skills they mention. With `prefilter`, certifications, projects, education
+    and listed skills that mention none of the skills are left out; experiences
+    are always kept, since only their titles are extracted and they give the LLM
+    the candidate's overall background. The remaining entries are then compacted
+    to the token budget, see compact_entries.
+
+    Args:
+        candidate: Dictionary containing candidate information
+        skill: Skill, or list of skills, the prompt is about
+        index: RelevanceIndex of the candidate
+        github_info: Dictionary mapping GitHub links to their stats
+        prefilter: Whether to leave out entries unrelated to the skills
+        budget: Token budget of the sections (default: SCORING_PROMPT_TOKEN_BUDGET)
+
+    Returns:
+        Tuple of (experience, certifications, projects, education, listed skills) text
+    """
+    budget = SCORING_PROMPT_TOKEN_BUDGET if budget is None else budget
+
+    sections = {}
+    for section, forms in SECTION_FORMS.items():
+        entries = []
+        for position, (entry, matched) in enumerate(
+            zip(candidate_section(candidate, section), index.entry_skills(section, skill))
+        ):
+            if not (matched or section == "experiences" or not prefilter):
+                continue
+            if section == "skills":
+                rendered = forms(entry, github_info)
+            else:
+                rendered = [
+                    mark_relevant(text, skill, matched)
+                    for text in forms(entry, github_info)
+                ]
+            entries.append(PromptEntry(section, position, matched, rendered))
+        entries.sort(key=lambda e: (-len(e.matched), e.position))
+        sections[section] = entries
+
+    compact_entries([entry for entries in sections.values() for entry in entries], budget)
+
+    return (
+        render_section("experiences", sections["experiences"]),
+        render_section("certifications", sections["certifications"]),
+        render_section("projects", sections["projects"]),
+        render_section("educations", sections["educations"]),
+        render_section("skills", sections["skills"], ", "),
+    )
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+
+from dotenv import load_dotenv
+
+from embeddings import aembedding_evaluate_candidates
+from ingestion import JobNotFoundError, get_batch_ingestor
+from llm_gateway import batch_priority
+from relevance import RelevanceIndex
+from score import (
+    SIMILARITY_MODES,
+    aevaluate_candidate,
+    aresolve_github_projects,
+    prefilter_skills,
+    relevant_projects,
+)
+
+load_dotenv()
+
+# "hybrid" scores every candidate by embedding similarity and re-scores the best
+# RANK_TOP_K of them with the LLM
+RANKING_MODES = SIMILARITY_MODES + ("hybrid",)
+# Candidates re-scored with the LLM in hybrid mode, best embedding matches first
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "20"))
+RANK_MAX_CANDIDATES = int(os.getenv("RANK_MAX_CANDIDATES", "1000"))
+# LLM calls in flight across all the candidates of a ranking request
+RANK_LLM_CONCURRENCY = int(os.getenv("RANK_LLM_CONCURRENCY", "8"))
+RANK_PAGE_SIZE = int(os.getenv("RANK_PAGE_SIZE", "50"))
+
+
+class RankingRequestError(Exception):
+    pass
+
+
+def unwrap_candidate(structured_object):
+    """Accept both a /resumes/parse structuredObject and the candidate inside it"""
+    if isinstance(structured_object, dict) and isinstance(
+        structured_object.get("candidate"), dict
+    ):
+        return structured_object["candidate"]
+    return structured_object or {}
+
+
+def load_candidates(entries, job_id=None):
+    """
+    Resolve the candidates of a ranking request.
+
+    Each entry is either {"id": ..., "structuredObject": {...}} or a reference
+    {"jobId": ..., "index": ...} to a parsed resume of a batch job. With `job_id`,
+    every completed resume of that batch job is added as well.
+
+    Returns:
+        List of candidate dicts with "id", "candidate" and, for batch job items,
+        "filename"
+
+    Raises:
+        RankingRequestError: For malformed entries or unknown batch jobs/items
+    """
+    job_items = {}
+
+    def items_of(job):
+        if job not in job_items:
+            try:
+                store = get_batch_ingestor().store
+                store.job_status(job)
+            except JobNotFoundError:
+                raise RankingRequestError(f"Batch job not found: {job}")
+            job_items[job] = {
+                item["index"]: item
+                for item in store.finished_items(job)
+                if item["status"] == "completed"
+            }
+        return job_items[job]
+
+    def from_job_item(job, item):
+        return {
+            "id": f"{job}:{item['index']}",
+            "filename": item["filename"],
+            "candidate": unwrap_candidate(item["structuredObject"]),
+        }
+
+    candidates = []
+    for position, entry in enumerate(entries or []):
+        if not isinstance(entry, dict):
+            raise RankingRequestError(f"Candidate {position} must be an object")
+        if "structuredObject" in entry:
+            candidates.append(
+                {
+                    "id": str(entry.get("id", position)),
+                    "candidate": unwrap_candidate(entry["structuredObject"]),
+                }
+            )
+        elif "jobId" in entry and "index" in entry:
+            item = items_of(entry["jobId"]).get(entry["index"])
+            if item is None:
+                raise RankingRequestError(
+                    f"No parsed resume {entry['index']} in batch job {entry['jobId']}"
+                )
+            candidates.append(from_job_item(entry["jobId"], item))
+        else:
+            raise RankingRequestError(
+                f"Candidate {position} needs a structuredObject or a jobId and index"
+            )
+
+    if job_id is not None:
+        seen = {c["id"] for c in candidates}
+        for index, item in sorted(items_of(job_id).items()):
+            if f"{job_id}:{index}" not in seen:
+                candidates.append(from_job_item(job_id, item))
+
+    ids = [c["id"] for c in candidates]
+    if len(set(ids)) != len(ids):
+        raise RankingRequestError("Candidate ids must be unique")
+    if len(candidates) > RANK_MAX_CANDIDATES:
+        raise RankingRequestError(
+            f"A ranking request can contain at most {RANK_MAX_CANDIDATES} candidates"
+        )
+    return candidates
+
+
+def candidate_score(results):
+    """Overall score of a candidate: the mean of the skill scores that were scored"""
+    scores = [r["similarityScore"] for r in results if r["similarityScore"] is not None]
+    if not scores:
+        return None
+    return round(sum(scores) / len(scores), 2)
+
+
+def ranked_entry(candidate, results, scoring_mode):
+    entry = {
+        "id": candidate["id"],
+        "score": candidate_score(results),
+        "scoringMode": scoring_mode,
+        "skills": results,
+    }
+    if "filename" in candidate:
+        entry["filename"] = candidate["filename"]
+    return entry
+
+
+def leaderboard(entries, offset=0, limit=None):
+    """
+    Sort ranked entries by score, best first, and return one page of them.
+
+    LLM and embedding scores are on different scales, so in hybrid rankings the
+    candidates scored by the LLM are listed ahead of those only pre-ranked by
+    embedding similarity. Candidates that could not be scored are listed last.
+    """
+    limit = RANK_PAGE_SIZE if limit is None else limit
+    ordered = sorted(
+        entries,
+        key=lambda e: (
+            e["score"] is None,
+            e["scoringMode"] != "llm",
+            -(e["score"] or 0.0),
+        ),
+    )
+    page = [
+        {"rank": offset + i + 1, **entry}
+        for i, entry in enumerate(ordered[offset : offset + limit])
+    ]
+    return {"total": len(ordered), "offset": offset, "limit": limit, "results": page}
+
+
+async def prefetch_github(candidates, skills):
+    """
+    Resolve the GitHub info of every candidate's relevant projects in one batched
+    lookup, so the per-candidate evaluations find it in the cache.
+    """
+    projects = []
+    for candidate in candidates:
+        index = RelevanceIndex(candidate["candidate"])
+        scored_skills = prefilter_skills(skills, index)
+        projects.extend(relevant_projects(candidate["candidate"], index, scored_skills))
+    if projects:
+        await aresolve_github_projects(projects)
+
+
+async def arank_candidates(
+    candidates,
+    skills,
+    mode="hybrid",
+    top_k=None,
+    experience_weight=0.4,
+    certification_weight=0.2,
+    project_weight=0.4,
+):
+    """
+    Rank candidates against the required skills of one requisition.
+
+    In "embedding" and "hybrid" mode every candidate is first scored by embedding
+    similarity, which embeds each required skill once for the whole pool. In
+    "hybrid" mode only the `top_k` best of those are then re-scored with the LLM;
+    in "llm" mode every candidate is. LLM evaluations share one concurrency limit
+    and one batched GitHub lookup.
+
+    Yields:
+        ("prerank", entries) once the embedding scores are known, then
+        ("scored", entry) for each candidate as its LLM evaluation finishes and
+        finally ("final", entries) with an entry for every candidate
+    """
+    if mode not in RANKING_MODES:
+        raise RankingRequestError(f"Unknown scoring mode: {mode}")
+    top_k = RANK_TOP_K if top_k is None else top_k
+    weights = (experience_weight, certification_weight, project_weight)
+
+    entries = {}
+    if mode in ("embedding", "hybrid"):
+        prescores = await aembedding_evaluate_candidates(
+            [c["candidate"] for c in candidates], skills, *weights
+        )
+        for candidate, results in zip(candidates, prescores):
+            entries[candidate["id"]] = ranked_entry(candidate, results, "embedding")
+        yield "prerank", list(entries.values())
+
+    if mode == "embedding":
+        llm_candidates = []
+    elif mode == "llm":
+        llm_candidates = candidates
+    else:
+        shortlist = leaderboard(
+            [e for e in entries.values() if e["score"]], limit=max(0, top_k)
+        )["results"]
+        shortlisted = {entry["id"] for entry in shortlist}
+        llm_candidates = [c for c in candidates if c["id"] in shortlisted]
+
+    if llm_candidates:
+        await prefetch_github(llm_candidates, skills)
+        semaphore = asyncio.Semaphore(max(1, RANK_LLM_CONCURRENCY))
+
+        async def evaluate(candidate):
+            # Rankings score many candidates, so they yield to interactive scoring
+            with batch_priority():
+                results = await aevaluate_candidate(
+                    candidate["candidate"], skills, *weights, semaphore=semaphore
+                )
+            return ranked_entry(candidate, results, "llm")
+
+        for evaluation in asyncio.as_completed([evaluate(c) for c in llm_candidates]):
+            entry = await evaluation
+            entries[entry["id"]] = entry
+            yield "scored", entry
+
+    yield "final", list(entries.values())
+
+
+async def rank_candidates(candidates, skills, offset=0, limit=None, **kwargs):
+    """Rank candidates and return one page of the final leaderboard"""
+    async for stage, entries in arank_candidates(candidates, skills, **kwargs):
+        if stage == "final":
+            return leaderboard(entries, offset, limit)
+
+
+async def stream_ranking(candidates, skills, offset=0, limit=None, **kwargs):
+    """
+    Yield NDJSON lines for a ranking: the leaderboard page after the embedding
+    pre-rank, each LLM-scored candidate as it finishes, and the final page.
+
+    A failure that ends the ranking early is reported as an "error" record, since
+    the response status has already been sent.
+    """
+    try:
+        async for stage, entries in arank_candidates(candidates, skills, **kwargs):
+            if stage == "scored":
+                record = {"type": "candidate", **entries}
+            else:
+                record = {
+                    "type": "leaderboard",
+                    "stage": stage,
+                    **leaderboard(entries, offset, limit),
+                }
+            yield json.dumps(record) + "\n"
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
@@ -0,0 +1,242 @@
+import json
+import os
+import re
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Optional JSON file of extra alias groups, e.g. {"kubernetes": ["k8s", "kube"]}
+SKILL_ALIASES_PATH = os.getenv("SKILL_ALIASES_PATH", "")
+
+# Names that refer to the same skill. Every name in a group matches every other,
+# and a name belongs to one group only. Bare words that are common outside a
+# technical context, such as "go", "spring" or "containers", are left out.
+SKILL_ALIASES = {
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "python": ["python3", "py"],
+    "golang": ["go lang"],
+    "c#": ["csharp", "c sharp"],
+    "c++": ["cpp", "cplusplus"],
+    ".net": ["dotnet"],
+    "node.js": ["nodejs"],
+    "react": ["react.js", "reactjs"],
+    "angular": ["angularjs", "angular.js"],
+    "vue": ["vue.js", "vuejs"],
+    "next.js": ["nextjs"],
+    "express": ["express.js", "expressjs"],
+    "spring boot": ["springboot"],
+    "postgresql": ["postgres", "psql"],
+    "mysql": ["mariadb"],
+    "mongodb": ["mongo"],
+    "microsoft sql server": ["mssql", "sql server", "t-sql"],
+    "kubernetes": ["k8s"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "ci/cd": ["cicd", "continuous integration", "continuous delivery"],
+    "machine learning": ["ml"],
+    "scikit-learn": ["sklearn"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "large language models": ["llm", "llms"],
+    "tensorflow": ["tf"],
+    "pytorch": ["torch"],
+    "rest": ["restful", "rest api", "rest apis"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "sass": ["scss"],
+    "microservices": ["microservice architecture"],
+    "objective-c": ["objc"],
+    "ballerina": ["ballerina lang"],
+}
+
+# More specific skills that are evidence of a broader one, but not of each other
+# or the other way round: a SQL requirement is met by MySQL experience, while a
+# PostgreSQL requirement is not.
+SKILL_SPECIALIZATIONS = {
+    "sql": ["mysql", "postgresql", "sqlite", "pl/sql", "microsoft sql server"],
+    "kubernetes": ["eks", "aks", "gke", "openshift"],
+    "aws": ["ec2", "s3", "aws lambda"],
+    "ci/cd": ["jenkins", "github actions"],
+    "machine learning": ["deep learning", "scikit-learn"],
+    "large language models": ["langchain"],
+    "tensorflow": ["keras"],
+    "react": ["react native"],
+    ".net": ["asp.net", ".net core"],
+    "css": ["sass", "tailwind"],
+    "linux": ["ubuntu", "bash"],
+    "git": ["github", "gitlab", "bitbucket"],
+    "graphql": ["apollo"],
+}
+
+# Separators such as ".", "-", "/" and spaces all split tokens, so "Node.js",
+# "node-js" and "Node JS" tokenize alike; "+" and "#" are kept for C++ and C#.
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+# Splits requisition skills such as "Amazon Web Services (AWS)" or "React/Angular"
+# into alternatives, any of which is evidence
+ALTERNATIVES_PATTERN = re.compile(r"[(),/|]|\bor\b", re.IGNORECASE)
+
+# Fields that can mention a skill, per section of the candidate
+EVIDENCE_FIELDS = {
+    "experiences": ("job_title", "company"),
+    "certifications": ("name", "issued_by"),
+    "projects": ("name", "description", "technologies"),
+    "educations": ("degree",),
+    "skills": ("skill",),
+}
+
+
+def normalize_token(token):
+    # Cheap plural folding, applied alike to skills and text: "microservices" and
+    # "microservice" become the same token
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    return tuple(normalize_token(t) for t in TOKEN_PATTERN.findall(str(text).lower()))
+
+
+def load_aliases(aliases, path):
+    """Merge the alias groups in a JSON file into the built-in ones"""
+    aliases = {name: list(names) for name, names in aliases.items()}
+    if not path:
+        return aliases
+    try:
+        with open(path) as f:
+            extra = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring skill aliases from {path}: {type(e).__name__}: {str(e)}")
+        return aliases
+    for name, names in extra.items():
+        aliases.setdefault(name.lower(), []).extend(n.lower() for n in names)
+    return aliases
+
+
+def build_alias_phrases(aliases, specializations=None):
+    """
+    Map the tokens of every known skill name to the token phrases it matches: the
+    names in its alias group, and for a broader skill also its specializations
+    with their aliases. Groups are not chained, so skills that share a broader
+    one do not match each other.
+    """
+    synonyms = {}
+    for name, names in aliases.items():
+        group = {tokenize(n) for n in [name, *names]} - {()}
+        for phrase in group:
+            synonyms.setdefault(phrase, set()).update(group)
+
+    phrases = {phrase: set(group) for phrase, group in synonyms.items()}
+    for name, narrower in (specializations or {}).items():
+        broad = tokenize(name)
+        specific = set()
+        for phrase in filter(None, map(tokenize, narrower)):
+            specific |= synonyms.get(phrase, {phrase})
+        for phrase in synonyms.get(broad, {broad}):
+            phrases.setdefault(phrase, {phrase}).update(specific)
+    return phrases
+
+
+ALIAS_PHRASES = build_alias_phrases(
+    load_aliases(SKILL_ALIASES, SKILL_ALIASES_PATH), SKILL_SPECIALIZATIONS
+)
+
+
+def skill_phrases(skill):
+    """The token phrases whose presence counts as evidence for the skill"""
+    phrase = tokenize(skill)
+    if not phrase:
+        return set()
+    if phrase in ALIAS_PHRASES:
+        return ALIAS_PHRASES[phrase] | {phrase}
+
+    phrases = {phrase}
+    for alternative in ALTERNATIVES_PATTERN.split(str(skill)):
+        alternative = tokenize(alternative)
+        if alternative:
+            phrases |= ALIAS_PHRASES.get(alternative, set()) | {alternative}
+    return phrases
+
+
+def entry_text(entry, fields):
+    if not isinstance(entry, dict):
+        return str(entry)
+    values = []
+    for field in fields:
+        value = entry.get(field)
+        if isinstance(value, list):
+            values.extend(
+                v.get("technology", "") if isinstance(v, dict) else str(v) for v in value
+            )
+        elif value:
+            values.append(str(value))
+    return " ".join(values)
+
+
+class RelevanceIndex:
+    """
+    Token index over the parts of a candidate that can show evidence of a skill:
+    experiences, certifications, projects, educations and listed skills.
+
+    Built once per candidate, so matching many required skills against it does
+    not rescan the candidate. Skills match on whole tokens, including their
+    aliases in SKILL_ALIASES and specializations in SKILL_SPECIALIZATIONS, rather
+    than on substrings, so "Java" does not
+    match "JavaScript" but "K8s" matches "Kubernetes".
+    """
+
+    def __init__(self, candidate):
+        self._entries = {}
+        self._positions = {}
+        self._matches = {}
+        for section, fields in EVIDENCE_FIELDS.items():
+            entries = candidate_section(candidate, section)
+            self._entries[section] = [tokenize(entry_text(e, fields)) for e in entries]
+            for i, tokens in enumerate(self._entries[section]):
+                for position, token in enumerate(tokens):
+                    self._positions.setdefault(token, []).append((section, i, position))
+
+    def matches(self, skill):
+        """
+        Returns:
+            Dictionary mapping each section to the indices of its entries that
+            mention the skill
+        """
+        if skill not in self._matches:
+            found = {}
+            for phrase in skill_phrases(skill):
+                for section, i, position in self._positions.get(phrase[0], ()):
+                    tokens = self._entries[section][i]
+                    if tokens[position : position + len(phrase)] == phrase:
+                        found.setdefault(section, set()).add(i)
+            self._matches[skill] = found
+        return self._matches[skill]
+
+    def has_evidence(self, skill):
+        return bool(self.matches(skill))
+
+    def entry_skills(self, section, skills):
+        """
+        Returns:
+            List with the skills mentioned by each entry of the section, in the
+            order of `skills`
+        """
+        skills = [skills] if isinstance(skills, str) else skills
+        entry_skills = [[] for _ in self._entries.get(section, [])]
+        for skill in skills:
+            for i in self.matches(skill).get(section, ()):
+                entry_skills[i].append(skill)
+        return entry_skills
+
+
+def candidate_section(candidate, section):
+    """Entries of a candidate section, accepting "education" for "educations" """
+    entries = candidate.get(section)
+    if entries is None and section == "educations":
+        entries = candidate.get("education")
+    if not entries:
+        return []
+    return entries if isinstance(entries, list) else [entries]
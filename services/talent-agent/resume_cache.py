@@ -0,0 +1,57 @@
+import hashlib
+import os
+
+from dotenv import load_dotenv
+
+from cache_utils import create_cache
+from layout_parser import LAYOUT_MIN_CONFIDENCE, LAYOUT_PARSER
+from model_router import routing_fingerprint
+from schemas import candidate_schema
+from sections import EXTRACTION_MODE
+
+load_dotenv()
+
+RESUME_CACHE_BACKEND = os.getenv("RESUME_CACHE_BACKEND", "memory")
+RESUME_CACHE_PATH = os.getenv("RESUME_CACHE_PATH", "cache/talent_agent.sqlite3")
+RESUME_CACHE_MAX_SIZE = int(os.getenv("RESUME_CACHE_MAX_SIZE", "1024"))
+RESUME_CACHE_TTL = float(os.getenv("RESUME_CACHE_TTL", "0")) or None
+RESUME_CACHE_VERSION = os.getenv("RESUME_CACHE_VERSION", "1")
+
+resume_cache = create_cache(
+    RESUME_CACHE_BACKEND,
+    maxsize=RESUME_CACHE_MAX_SIZE,
+    ttl=RESUME_CACHE_TTL,
+    path=RESUME_CACHE_PATH,
+    table="parsed_resumes",
+)
+
+
+def parser_fingerprint():
+    """Identify the extraction setup, so cached parses are dropped when it changes"""
+    digest = hashlib.sha256()
+    digest.update(RESUME_CACHE_VERSION.encode())
+    digest.update(routing_fingerprint().encode())
+    digest.update(EXTRACTION_MODE.encode())
+    digest.update(f"{LAYOUT_PARSER}:{LAYOUT_MIN_CONFIDENCE}".encode())
+    digest.update(repr(candidate_schema).encode())
+    return digest.hexdigest()[:16]
+
+
+PARSER_FINGERPRINT = parser_fingerprint()
+
+
+def resume_cache_key(data):
+    """Content address of an uploaded resume for the current parser"""
+    return f"{PARSER_FINGERPRINT}:{hashlib.sha256(data).hexdigest()}"
+
+
+def get_cached_resume(data):
+    """Return the cached structuredObject for the uploaded bytes, or None"""
+    if resume_cache is None:
+        return None
+    return resume_cache.get(resume_cache_key(data))
+
+
+def cache_resume(data, structured_object):
+    if resume_cache is not None:
+        resume_cache.set(resume_cache_key(data), structured_object)
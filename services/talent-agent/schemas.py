@@ -580,3 +580,61 @@ candidate_skill_score_schema = Object(
         ),
     ],
 )
+
+candidate_skills_score_schema = Object(
+    id="candidate_skill_score",
+    description="Evaluates how well a candidate's experience matches each of the listed skills. Return exactly one \
+        entry per skill, using the skill name exactly as given.",
+    attributes=[
+        Text(
+            id="skill",
+            description="The skill being evaluated, copied exactly from the list of skills",
+        ),
+        *candidate_skill_score_schema.attributes,
+    ],
+    examples=[
+        (
+            """
+            Evaluate the candidate's proficiency in each of the following skills: Python, Mobile Development
+            
+            Evaluation criteria (apply to every skill separately):
+            1. Experience: Years and relevance of experience using this skill (0-10)
+            2. Certifications: Relevant certifications and their recognition level (0-10)
+            3. Projects: Complexity and relevance of projects utilizing this skill (0-10)
+            4. Education: Relevant formal education related to this skill (0-10)
+            
+            Candidate information:
+            - Experience: [RELEVANT: Python] Senior Developer at Tech Co (2020-2023): Led Python development team on \
+                cloud infrastructure projects
+            - Certifications: AWS Certified Solutions Architect from Amazon (2021)
+            - Projects: [RELEVANT: Python] Data Pipeline: Built ETL pipeline for financial data (Technologies: \
+                Python, AWS, Airflow)
+            - Education: Computer Science BS from State University (2019). Relevant courses: Data Structures, Machine \
+                Learning
+            
+            Provide one set of scores for each skill.
+            """,
+            [
+                {
+                    "skill": "Python",
+                    "experience_score": 9.0,
+                    "certification_score": 6.0,
+                    "project_score": 9.0,
+                    "education_score": 7.0,
+                    "evaluation_text": "The candidate demonstrates strong Python skills through their experience leading \
+                    a Python development team and building data pipelines using Python. While they lack \
+                        Python-specific certifications, their CS degree provides a solid foundation.",
+                },
+                {
+                    "skill": "Mobile Development",
+                    "experience_score": 2.0,
+                    "certification_score": 0.0,
+                    "project_score": 0.0,
+                    "education_score": 4.0,
+                    "evaluation_text": "The candidate shows minimal evidence of mobile development skills. Their \
+                    experience and projects focus on backend and cloud infrastructure rather than mobile platforms.",
+                },
+            ],
+        ),
+    ],
+)
@@ -1,84 +1,150 @@
-from llm_utils import llm
-from kor.extraction import create_extraction_chain
-from schemas import candidate_skill_score_schema
-import requests
+from model_router import register_routed_chain, task_models
+from schemas import candidate_skill_score_schema, candidate_skills_score_schema
+from cache_utils import TTLStatsCache
+from github_client import extract_repo_info, get_github_client
+from relevance import RelevanceIndex, candidate_section
+from embeddings import aembedding_evaluate_candidate
+from llm_gateway import run_coroutine
+from metrics import skills_scored, stage_timer
+from score_store import digest, get_stored_scores, score_key, store_scores
+from prompt_builder import (
+    PROMPT_DESCRIPTION_MAX_TOKENS,
+    SCORING_PROMPT_TOKEN_BUDGET,
+    build_candidate_sections,
+)
+import asyncio
+import json
+import math
+import time
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-chain = create_extraction_chain(llm, candidate_skill_score_schema)
-
-def extract_repo_info(repo_url):
+SKILL_BATCH_SIZE = int(os.getenv("SKILL_BATCH_SIZE", "8"))
+SKILL_SCORING_CONCURRENCY = int(os.getenv("SKILL_SCORING_CONCURRENCY", "4"))
+SKILL_SCORING_TIMEOUT = float(os.getenv("SKILL_SCORING_TIMEOUT", "60"))
+GITHUB_CACHE_TTL = float(os.getenv("GITHUB_CACHE_TTL", "3600"))
+GITHUB_CACHE_MAX_SIZE = int(os.getenv("GITHUB_CACHE_MAX_SIZE", "1024"))
+# Score skills with no evidence anywhere in the candidate as 0 without an LLM call,
+# and leave entries that mention none of the scored skills out of the prompts
+SKILL_PREFILTER = os.getenv("SKILL_PREFILTER", "true").lower() == "true"
+# "llm" judges every skill with the LLM, "embedding" scores by embedding similarity
+# only. The two are on different scales, so a candidate's skills are all scored
+# the same way; ranking.py mixes them across candidates instead.
+SIMILARITY_MODES = ("llm", "embedding")
+SIMILARITY_MODE = os.getenv("SIMILARITY_MODE", "llm")
+# Bump to invalidate stored skill scores after a change to the scoring prompts
+SCORE_PROMPT_VERSION = os.getenv("SCORE_PROMPT_VERSION", "1")
+
+github_cache = TTLStatsCache(maxsize=GITHUB_CACHE_MAX_SIZE, ttl=GITHUB_CACHE_TTL)
+
+
+def valid_skill_evaluation(evaluation):
+    """Whether every criterion score of an evaluation is empty or on the 0-10 scale"""
     try:
-        parts = repo_url.strip("/").split("/")
-        owner = parts[-2]
-        name = parts[-1]
-        return owner, name
-    except Exception:
-        return None, None
+        return all(
+            0 <= float(evaluation.get(name) or 0) <= 10
+            for name in ("experience_score", "certification_score", "project_score")
+        )
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+def valid_skill_response(response):
+    entries = (response.get("data") or {}).get("candidate_skill_score") or []
+    return bool(entries) and valid_skill_evaluation(entries[0])
+
+
+def valid_batch_response(skills):
+    """Accept a batched response only if it scores every skill of the batch validly"""
+
+    def accept(response):
+        matched = match_skill_evaluations(skills, response.get("data"))
+        return len(matched) == len(skills) and all(
+            valid_skill_evaluation(evaluation) for evaluation in matched.values()
+        )
+
+    return accept
+
+
+# Skills are scored on the standard model tier. With the "escalate" route (see
+# model_router) the fast tier scores first and the standard tier re-scores when
+# the response is missing skills or scores
+chain = register_routed_chain(
+    "skill_scoring", candidate_skill_score_schema, accept=valid_skill_response
+)
+batch_chain = register_routed_chain("batch_skill_scoring", candidate_skills_score_schema)
+
 
 def analyze_github_project(repo_url):
     owner, name = extract_repo_info(repo_url)
     if not owner or not name:
         return {"error": "Invalid GitHub URL"}
 
-    headers = {"Authorization": f"Bearer {os.getenv("GITHUB_TOKEN")}"}
-    query = """
-    query($owner: String!, $name: String!) {
-      repository(owner: $owner, name: $name) {
-        name
-        stargazerCount
-        forkCount
-        updatedAt
-        defaultBranchRef {
-          target {
-            ... on Commit {
-              history(first: 100) {
-                totalCount
-              }
-            }
-          }
-        }
-        pullRequests(states: MERGED) {
-          totalCount
-        }
-        readme: object(expression: "HEAD:README.md") {
-          ... on Blob {
-            text
-          }
-        }
-      }
-    }
+    return get_github_client().fetch_repositories([(owner, name)])[(owner, name)]
+
+
+def github_cache_key(owner, name):
+    return f"{owner}/{name}".lower()
+
+
+def lookup_github_projects(projects):
+    """
+    Split the distinct repositories linked from the projects into cached and missing.
+
+    Returns:
+        Tuple of (github_info, missing) where github_info maps each link already
+        resolved (from the cache, or invalid) to its info and missing maps the
+        remaining links to their (owner, name)
     """
+    github_info = {}
+    missing = {}
+    for project in projects or []:
+        github_link = project.get("github", "")
+        if not github_link or github_link in github_info or github_link in missing:
+            continue
 
-    variables = {"owner": owner, "name": name}
+        owner, name = extract_repo_info(github_link)
+        if not owner or not name:
+            github_info[github_link] = {"error": "Invalid GitHub URL"}
+            continue
 
-    response = requests.post(
-        os.getenv("GITHUB_API_URL"),
-        json={"query": query, "variables": variables},
-        headers=headers,
-    )
+        info = github_cache.get(github_cache_key(owner, name))
+        if info is None:
+            missing[github_link] = (owner, name)
+        else:
+            github_info[github_link] = info
+    return github_info, missing
 
-    resp_json = response.json()
 
-    if "errors" in resp_json:
-        print("GraphQL Error:", resp_json["errors"])
-        return {""}
+def store_github_projects(github_info, missing, fetched):
+    for github_link, repo in missing.items():
+        info = fetched[repo]
+        if "error" not in info:
+            github_cache.set(github_cache_key(*repo), info)
+        github_info[github_link] = info
+    return github_info
 
-    if "data" not in resp_json or not resp_json["data"].get("repository"):
-        print("Repository not found or inaccessible.")
-        return {""}
 
-    repo = resp_json["data"]["repository"]
+def resolve_github_projects(projects):
+    """Fetch GitHub info once for every distinct repository linked from the projects"""
+    github_info, missing = lookup_github_projects(projects)
+    if not missing:
+        return github_info
+    fetched = get_github_client().fetch_repositories(missing.values())
+    return store_github_projects(github_info, missing, fetched)
+
+
+async def aresolve_github_projects(projects):
+    """Async variant of resolve_github_projects"""
+    github_info, missing = lookup_github_projects(projects)
+    if not missing:
+        return github_info
+    fetched = await get_github_client().afetch_repositories(missing.values())
+    return store_github_projects(github_info, missing, fetched)
 
-    return {
-        "stars": repo["stargazerCount"],
-        "forks": repo["forkCount"],
-        "last_updated": repo["updatedAt"],
-        "commits": repo["defaultBranchRef"]["target"]["history"]["totalCount"],
-        "merged_prs": repo["pullRequests"]["totalCount"],
-    }
 
 def evaluate_candidate(
     candidate,
@@ -86,164 +152,482 @@ def evaluate_candidate(
     experience_weight=0.4,
     certification_weight=0.2,
     project_weight=0.4,
+    batch_size=None,
 ):
     """
     Evaluates a candidate based on a set of skills using a weighted scoring system.
 
+    Runs aevaluate_candidate to completion on the gateway's background event
+    loop, for callers outside the service; code already running on an event
+    loop should await aevaluate_candidate instead.
+
     Args:
         candidate: Dictionary containing candidate information
         skills: List of skills to evaluate
         experience_weight: Weight for experience score (default: 0.4)
         certification_weight: Weight for certification score (default: 0.2)
         project_weight: Weight for project score (default: 0.4)
+        batch_size: Maximum number of skills per LLM call (default: SKILL_BATCH_SIZE,
+            1 scores every skill separately)
 
     Returns:
-        List of float scores for each skill (0.0-10.0 scale)
+        List of skill results in the order of `skills`
     """
-    results = []
+    return run_coroutine(
+        aevaluate_candidate(
+            candidate,
+            skills,
+            experience_weight,
+            certification_weight,
+            project_weight,
+            batch_size=batch_size,
+        )
+    )
 
-    experience = candidate.get("experiences", [])
-    certifications = candidate.get("certifications", [])
-    projects = candidate.get("projects", [])
-    education = candidate.get("education", [])
 
-    for skill in skills:
-        exp_text = format_experience(experience, skill)
-        cert_text = format_certifications(certifications, skill)
-        project_text = format_projects(projects, skill)
-        edu_text = format_education(education, skill)
+async def aevaluate_candidate(
+    candidate,
+    skills,
+    experience_weight=0.4,
+    certification_weight=0.2,
+    project_weight=0.4,
+    batch_size=None,
+    max_concurrency=None,
+    timeout=None,
+    semaphore=None,
+):
+    """
+    Evaluates a candidate based on a set of skills, scoring skill chunks concurrently.
+
+    Skills are scored in batches: a single LLM call returns the scores for up to
+    `batch_size` skills. Longer skill lists are split into evenly sized chunks, and
+    any skill missing from a batched response is re-scored on its own. At most `max_concurrency` LLM calls are in flight at once. Each chunk of skills
+    (a single skill when batch_size is 1) gets `timeout` seconds; skills whose chunk
+    times out or fails are returned with a null score and an "error" message instead
+    of failing the whole evaluation. With SKILL_PREFILTER, skills that nothing in
+    the candidate mentions are scored 0 without an LLM call. Skills already scored
+    against the same evidence, weights and scoring version are taken from the
+    score store.
 
-        input_text = f"""
-        Evaluate the candidate's proficiency in: {skill}
-        
-        Evaluation criteria:
-        1. Experience: Years and relevance of experience using this skill (0-10)
-        2. Certifications: Relevant certifications and their recognition level (0-10)
-        3. Projects: Complexity and relevance of projects utilizing this skill (0-10)
-        4. Education: Relevant formal education related to this skill (0-10)
-        
-        Candidate information:
-        - Experience: {exp_text}
-        - Certifications: {cert_text}
-        - Projects: {project_text}
-        - Education: {edu_text}
-        
-        Please provide detailed scores for each criterion and a final weighted score.
-        """
+    Args:
+        candidate: Dictionary containing candidate information
+        skills: List of skills to evaluate
+        experience_weight: Weight for experience score (default: 0.4)
+        certification_weight: Weight for certification score (default: 0.2)
+        project_weight: Weight for project score (default: 0.4)
+        batch_size: Maximum number of skills per LLM call (default: SKILL_BATCH_SIZE)
+        max_concurrency: Maximum concurrent LLM calls (default: SKILL_SCORING_CONCURRENCY)
+        timeout: Seconds allowed per chunk of skills (default: SKILL_SCORING_TIMEOUT)
+        semaphore: Semaphore limiting the LLM calls, to share one limit across
+            several evaluations (default: a new one of max_concurrency)
 
-        evaluation = chain.invoke(input_text)["data"]["candidate_skill_score"][0]
+    Returns:
+        List of skill results in the order of `skills`
+    """
+    results = {}
+    async for result in astream_evaluate_candidate(
+        candidate,
+        skills,
+        experience_weight,
+        certification_weight,
+        project_weight,
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+        semaphore=semaphore,
+    ):
+        results[result["skill"]] = result
+    return [results[skill] for skill in skills]
+
+
+async def astream_evaluate_candidate(
+    candidate,
+    skills,
+    experience_weight=0.4,
+    certification_weight=0.2,
+    project_weight=0.4,
+    batch_size=None,
+    max_concurrency=None,
+    timeout=None,
+    semaphore=None,
+):
+    """
+    Yield the result of each distinct skill as soon as it is known, see
+    aevaluate_candidate for the arguments.
 
-        experience_score = float(evaluation.get("experience_score", 0.0))
-        certification_score = float(evaluation.get("certification_score", 0.0))
-        project_score = float(evaluation.get("project_score", 0.0))
-        education_score = float(evaluation.get("education_score", 0.0))
+    Stored scores and skills without evidence come first, then the skills of each
+    chunk as its LLM call finishes.
+    """
+    if batch_size is None:
+        batch_size = SKILL_BATCH_SIZE
+    if max_concurrency is None:
+        max_concurrency = SKILL_SCORING_CONCURRENCY
+    if timeout is None:
+        timeout = SKILL_SCORING_TIMEOUT
+    weights = (experience_weight, certification_weight, project_weight)
+
+    index = RelevanceIndex(candidate)
+    keys = score_keys(candidate, index, prefilter_skills(skills, index), weights)
+    # The score store may be a SQLite database, so it is read and written off the loop
+    stored = await asyncio.to_thread(get_stored_scores, keys)
+    for skill in dict.fromkeys(skills):
+        if skill in stored:
+            skills_scored.inc(source="stored")
+            yield stored[skill]
+        elif skill not in keys:
+            skills_scored.inc(source="unmatched")
+            yield build_unmatched_result(skill)
+
+    scored_skills = [skill for skill in keys if skill not in stored]
+    if not scored_skills:
+        return
+    github_info = await aresolve_github_projects(
+        relevant_projects(candidate, index, scored_skills)
+    )
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    if batch_size > 1:
+        chunks = chunk_skills(scored_skills, batch_size)
+    else:
+        chunks = [[s] for s in scored_skills]
+
+    async def score_chunk(chunk):
+        try:
+            with stage_timer("skill_scoring"):
+                evaluations = await asyncio.wait_for(
+                    ascore_skills(candidate, chunk, github_info, semaphore, index),
+                    timeout,
+                )
+        except asyncio.TimeoutError:
+            return [build_failed_result(skill, "Scoring timed out") for skill in chunk]
+        except Exception as e:
+            print(f"Error scoring {chunk}: {type(e).__name__}: {str(e)}")
+            return [build_failed_result(skill, str(e)) for skill in chunk]
+        return [build_skill_result(skill, evaluations[skill], *weights) for skill in chunk]
+
+    tasks = [asyncio.ensure_future(score_chunk(chunk)) for chunk in chunks]
+    try:
+        for scored in asyncio.as_completed(tasks):
+            chunk_results = await scored
+            await asyncio.to_thread(store_scores, keys, chunk_results)
+            for result in chunk_results:
+                skills_scored.inc(source="failed" if "error" in result else "llm")
+                yield result
+    finally:
+        # A client that stops reading a stream closes the generator early
+        for task in tasks:
+            task.cancel()
+
+
+async def ascore_candidate(
+    candidate,
+    skills,
+    mode=None,
+    experience_weight=0.4,
+    certification_weight=0.2,
+    project_weight=0.4,
+):
+    """
+    Score a candidate's skills with the scoring engine selected by `mode`.
 
-        weighted_score = (
-            experience_score * experience_weight
-            + certification_score * certification_weight
-            + project_score * project_weight
-        )
+    Args:
+        candidate: Dictionary containing candidate information
+        skills: List of skills to evaluate
+        mode: One of SIMILARITY_MODES (default: SIMILARITY_MODE)
 
-        normalized_score = min(10.0, max(0.0, weighted_score))
+    Returns:
+        List of skill results in the order of `skills`
+    """
+    results = {}
+    async for result in astream_score_candidate(
+        candidate,
+        skills,
+        mode,
+        experience_weight,
+        certification_weight,
+        project_weight,
+    ):
+        results[result["skill"]] = result
+    return [results[skill] for skill in skills]
+
+
+async def astream_score_candidate(
+    candidate,
+    skills,
+    mode=None,
+    experience_weight=0.4,
+    certification_weight=0.2,
+    project_weight=0.4,
+):
+    """
+    Yield the result of each distinct skill as soon as it is known, see
+    ascore_candidate for the arguments.
+    """
+    if mode is None:
+        mode = SIMILARITY_MODE
+    if mode not in SIMILARITY_MODES:
+        raise ValueError(f"Unknown scoring mode: {mode}")
+    weights = (experience_weight, certification_weight, project_weight)
 
-        skill_result = {
-            "skill": skill,
-            "similarityScore": round(normalized_score, 2),
-            "supportingPoints": evaluation.get("evaluation_text", ""),
-        }
+    if mode == "llm":
+        async for result in astream_evaluate_candidate(candidate, skills, *weights):
+            yield result
+        return
 
-        results.append(skill_result)
+    for result in await aembedding_evaluate_candidate(candidate, skills, *weights):
+        yield result
 
-    return results
 
+STREAM_FORMATS = ("ndjson", "sse")
 
-def format_experience(experience, skill):
-    """Format experience entries, highlighting those relevant to the skill"""
-    if not experience:
-        return "None"
 
-    relevant_exp = []
-    for exp in experience:
-        role = exp.get("job_title", "")
-        company = exp.get("company", "")
+def stream_record(record_type, record, format="ndjson"):
+    """Encode one record of a score stream as an NDJSON line or a server-sent event"""
+    if format == "sse":
+        return f"event: {record_type}\ndata: {json.dumps(record)}\n\n"
+    return json.dumps({"type": record_type, **record}) + "\n"
 
-        exp_text = f"{role} at {company}"
 
-        relevant_exp.append(exp_text)
+async def stream_scores(candidate, skills, format="ndjson", **kwargs):
+    """
+    Yield a "score" record for each skill as soon as it is scored, then a
+    "summary" record with every result in the order of `skills`.
 
-    return "\n".join(relevant_exp)
+    A failure that ends the scoring early is reported as an "error" record, since
+    the response status has already been sent.
+    """
+    started = time.perf_counter()
+    results = {}
+    try:
+        async for result in astream_score_candidate(candidate, skills, **kwargs):
+            results[result["skill"]] = result
+            yield stream_record("score", result, format)
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        yield stream_record("error", {"detail": str(e)}, format)
+        return
+
+    ordered = [results[skill] for skill in skills]
+    scores = [r["similarityScore"] for r in ordered if r["similarityScore"] is not None]
+    summary = {
+        "results": ordered,
+        "scored": len(scores),
+        "failed": len(ordered) - len(scores),
+        "averageScore": round(sum(scores) / len(scores), 2) if scores else None,
+        "elapsedMs": round((time.perf_counter() - started) * 1000),
+    }
+    yield stream_record("summary", summary, format)
+
+
+async def ascore_skills(candidate, skills, github_info, semaphore, index=None):
+    """Return the raw evaluation for each skill, batching when there are several"""
+    evaluations = {}
+    if len(skills) > 1:
+        prompt = build_batch_prompt(candidate, skills, github_info, index)
+        async with semaphore:
+            response = await batch_chain.ainvoke(prompt, accept=valid_batch_response(skills))
+        evaluations.update(match_skill_evaluations(skills, response["data"]))
+
+    async def score_skill(skill):
+        prompt = build_skill_prompt(candidate, skill, github_info, index)
+        async with semaphore:
+            response = await chain.ainvoke(prompt)
+        entries = (response.get("data") or {}).get("candidate_skill_score") or []
+        if not entries:
+            raise ValueError(f"No score was returned for {skill}")
+        evaluations[skill] = entries[0]
+
+    await asyncio.gather(*(score_skill(s) for s in skills if s not in evaluations))
+    return evaluations
+
+
+def prefilter_skills(skills, index):
+    """Return the distinct skills that need an LLM score, in order"""
+    scored_skills = []
+    for skill in skills:
+        if skill in scored_skills:
+            continue
+        if not SKILL_PREFILTER or index.has_evidence(skill):
+            scored_skills.append(skill)
+    return scored_skills
 
 
-def format_certifications(certifications, skill):
-    """Format certifications, highlighting those relevant to the skill"""
-    if not certifications:
-        return "None"
+def relevant_projects(candidate, index, skills):
+    """Projects worth including in the prompts, whose GitHub info is needed"""
+    projects = candidate_section(candidate, "projects")
+    if not SKILL_PREFILTER:
+        return projects
+    entry_skills = index.entry_skills("projects", skills)
+    return [project for project, matched in zip(projects, entry_skills) if matched]
 
-    cert_list = []
-    for cert in certifications:
-        name = cert.get("name", "")
-        issuer = cert.get("issued_by", "")
 
-        skill_mentioned = skill.lower() in name.lower()
+def score_keys(candidate, index, skills, weights):
+    """Map each skill to the key of its score in the score store"""
+    return {
+        skill: score_key(candidate, index, skill, weights, scoring_version(), SKILL_PREFILTER)
+        for skill in skills
+    }
 
-        cert_text = f"{name} from {issuer}"
-        if skill_mentioned:
-            cert_text = f"[RELEVANT] {cert_text}"
 
-        cert_list.append(cert_text)
+def chunk_skills(skills, batch_size):
+    """Split skills into the fewest evenly sized chunks of at most batch_size"""
+    if not skills:
+        return []
+    chunk_count = math.ceil(len(skills) / max(1, batch_size))
+    chunk_size = math.ceil(len(skills) / chunk_count)
+    return [skills[i : i + chunk_size] for i in range(0, len(skills), chunk_size)]
 
-    return "\n".join(cert_list)
 
+def match_skill_evaluations(skills, data):
+    """Map each requested skill to its entry in a batched scoring response"""
+    entries = data.get("candidate_skill_score", []) if data else []
+    by_name = {}
+    for entry in entries:
+        name = str(entry.get("skill", "")).strip().lower()
+        if name and name not in by_name:
+            by_name[name] = entry
 
-def format_projects(projects, skill):
-    """Format projects, highlighting those relevant to the skill"""
-    if not projects:
-        return "None"
+    matched = {}
+    for skill in skills:
+        entry = by_name.get(skill.strip().lower())
+        if entry is not None:
+            matched[skill] = entry
+    return matched
 
-    project_list = []
-    for project in projects:
-        name = project.get("name", "")
-        description = project.get("description", "")
-        tech_stack = project.get("technologies", [])
-        github_link = project.get("github", "")
 
-        skill_mentioned = (
-            skill.lower() in description.lower()
-            or skill.lower() in " ".join(tech_stack).lower()
-        )
+def build_skill_result(
+    skill, evaluation, experience_weight, certification_weight, project_weight
+):
+    """Combine the criterion scores of an evaluation into a weighted skill score"""
+    experience_score = float(evaluation.get("experience_score") or 0.0)
+    certification_score = float(evaluation.get("certification_score") or 0.0)
+    project_score = float(evaluation.get("project_score") or 0.0)
+
+    weighted_score = (
+        experience_score * experience_weight
+        + certification_score * certification_weight
+        + project_score * project_weight
+    )
+
+    normalized_score = min(10.0, max(0.0, weighted_score))
+
+    return {
+        "skill": skill,
+        "similarityScore": round(normalized_score, 2),
+        "supportingPoints": evaluation.get("evaluation_text", ""),
+    }
+
+
+def build_unmatched_result(skill):
+    """Deterministic result for a skill that nothing in the candidate mentions"""
+    return {
+        "skill": skill,
+        "similarityScore": 0.0,
+        "supportingPoints": f"No mention of {skill} was found in the candidate's \
+experience, certifications, projects, education or skills.",
+    }
+
+
+def build_failed_result(skill, error):
+    """Placeholder result for a skill that could not be scored"""
+    return {
+        "skill": skill,
+        "similarityScore": None,
+        "supportingPoints": "",
+        "error": error,
+    }
+
+
+@lru_cache(maxsize=1024)
+def skill_prompt_preamble(skill):
+    """Instructions of the single-skill prompt, shared by every candidate"""
+    return f"""
+        Evaluate the candidate's proficiency in: {skill}
+        
+        Evaluation criteria:
+        1. Experience: Years and relevance of experience using this skill (0-10)
+        2. Certifications: Relevant certifications and their recognition level (0-10)
+        3. Projects: Complexity and relevance of projects utilizing this skill (0-10)
+        4. Education: Relevant formal education related to this skill (0-10)
+        """
 
-        tech_text = ", ".join(tech_stack) if tech_stack else "Not specified"
-        project_text = f"{name}: {description} (Technologies: {tech_text})"
-        if skill_mentioned:
-            project_text = f"[RELEVANT] {project_text}"
 
-        if github_link:
-            project_text += f" [GitHub Info About the project: {analyze_github_project(github_link)}]"
+@lru_cache(maxsize=1024)
+def batch_prompt_preamble(skills):
+    """Instructions of the batched prompt for a tuple of skills, shared by every candidate"""
+    return f"""
+        Evaluate the candidate's proficiency in each of the following skills: {", ".join(skills)}
+        
+        Evaluation criteria (apply to every skill separately):
+        1. Experience: Years and relevance of experience using this skill (0-10)
+        2. Certifications: Relevant certifications and their recognition level (0-10)
+        3. Projects: Complexity and relevance of projects utilizing this skill (0-10)
+        4. Education: Relevant formal education related to this skill (0-10)
+        """
 
-        project_list.append(project_text)
 
-    return "\n".join(project_list)
+@lru_cache(maxsize=None)
+def scoring_version():
+    """Identify the scoring model and prompts, so stored scores are dropped when they change"""
+    return digest(
+        SCORE_PROMPT_VERSION,
+        task_models("skill_scoring"),
+        task_models("batch_skill_scoring"),
+        skill_prompt_preamble("{skill}"),
+        batch_prompt_preamble(("{skills}",)),
+        SKILL_PREFILTER,
+        SCORING_PROMPT_TOKEN_BUDGET,
+        PROMPT_DESCRIPTION_MAX_TOKENS,
+    )
 
 
-def format_education(education, skill):
-    """Format education entries, highlighting those relevant to the skill"""
-    if not education:
-        return "None"
+def build_skill_prompt(candidate, skill, github_info=None, index=None):
+    """Build the scoring prompt for a single skill"""
+    exp_text, cert_text, project_text, edu_text, skills_text = format_candidate(
+        candidate, skill, github_info, index
+    )
 
-    edu_list = []
-    for edu in education:
-        degree = edu.get("degree", "")
-        institution = edu.get("institution", "")
-        gpa = edu.get("gpa_zscore", "")
+    return skill_prompt_preamble(skill) + f"""
+        Candidate information:
+        - Experience: {exp_text}
+        - Certifications: {cert_text}
+        - Projects: {project_text}
+        - Education: {edu_text}
+        - Listed skills: {skills_text}
+        
+        Please provide detailed scores for each criterion and a final weighted score.
+        """
 
-        skill_mentioned = skill.lower() in degree.lower()
 
-        edu_text = (
-            f"{degree} from {institution}. GPA(out of 4 or 4.2) or Z_score: {gpa}"
-        )
-        if skill_mentioned:
-            edu_text = f"[RELEVANT] {edu_text}"
+def build_batch_prompt(candidate, skills, github_info=None, index=None):
+    """Build a scoring prompt that covers several skills in one call"""
+    exp_text, cert_text, project_text, edu_text, skills_text = format_candidate(
+        candidate, skills, github_info, index
+    )
 
-        edu_list.append(edu_text)
+    return batch_prompt_preamble(tuple(skills)) + f"""
+        Candidate information:
+        - Experience: {exp_text}
+        - Certifications: {cert_text}
+        - Projects: {project_text}
+        - Education: {edu_text}
+        - Listed skills: {skills_text}
+        
+        Provide one set of scores for each skill.
+        """
+
+
+def format_candidate(candidate, skill, github_info=None, index=None):
+    """
+    Format the candidate sections for a prompt about a skill (or a list of skills),
+    compacted to SCORING_PROMPT_TOKEN_BUDGET; see build_candidate_sections.
+
+    Returns:
+        Tuple of (experience, certifications, projects, education, listed skills) text
+    """
+    if index is None:
+        index = RelevanceIndex(candidate)
+    if github_info is None:
+        github_info = resolve_github_projects(relevant_projects(candidate, index, skill))
 
-    return "\n".join(edu_list)
+    return build_candidate_sections(candidate, skill, index, github_info, SKILL_PREFILTER)
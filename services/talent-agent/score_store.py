@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+
+from dotenv import load_dotenv
+
+from cache_utils import create_cache
+from relevance import EVIDENCE_FIELDS, candidate_section
+
+load_dotenv()
+
+SCORE_STORE_BACKEND = os.getenv("SCORE_STORE_BACKEND", "sqlite")
+SCORE_STORE_PATH = os.getenv("SCORE_STORE_PATH", "cache/talent_agent.sqlite3")
+SCORE_STORE_MAX_SIZE = int(os.getenv("SCORE_STORE_MAX_SIZE", "100000"))
+# Scores are re-evaluated after this many seconds, so GitHub activity and model
+# updates eventually show up; 0 keeps them until evicted
+SCORE_STORE_TTL = float(os.getenv("SCORE_STORE_TTL", str(30 * 24 * 3600))) or None
+
+score_store = create_cache(
+    SCORE_STORE_BACKEND,
+    maxsize=SCORE_STORE_MAX_SIZE,
+    ttl=SCORE_STORE_TTL,
+    path=SCORE_STORE_PATH,
+    table="skill_scores",
+)
+
+
+def digest(*parts):
+    """Stable hash of JSON serializable parts"""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def skill_evidence(candidate, index, skill, prefilter=True):
+    """
+    The parts of a candidate that a score for the skill depends on.
+
+    Experiences always go into the scoring prompts; with the prefilter, other
+    sections only contribute the entries that mention the skill, so adding an
+    unrelated project does not invalidate the skill's stored score.
+    """
+    evidence = {"experiences": candidate_section(candidate, "experiences")}
+    matches = index.matches(skill)
+    for section in EVIDENCE_FIELDS:
+        if section == "experiences":
+            continue
+        entries = candidate_section(candidate, section)
+        if prefilter:
+            entries = [entries[i] for i in sorted(matches.get(section, ()))]
+        evidence[section] = entries
+    return evidence
+
+
+def score_key(candidate, index, skill, weights, version, prefilter=True):
+    """
+    Key of a stored skill score: the skill, the candidate evidence for it, the
+    weights and the scoring version (model and prompts).
+    """
+    return digest(
+        version,
+        skill.strip().lower(),
+        list(weights),
+        skill_evidence(candidate, index, skill, prefilter),
+    )
+
+
+def get_stored_scores(keys):
+    """
+    Returns:
+        Dictionary mapping each skill in `keys` (skill -> key) to its stored
+        result, for the skills that have one
+    """
+    if score_store is None:
+        return {}
+    stored = {}
+    for skill, key in keys.items():
+        result = score_store.get(key)
+        if result is not None:
+            stored[skill] = {**result, "skill": skill}
+    return stored
+
+
+def store_scores(keys, results):
+    """Persist the successfully scored results of the skills in `keys`"""
+    if score_store is None:
+        return
+    for result in results:
+        key = keys.get(result["skill"])
+        if key is not None and result.get("similarityScore") is not None:
+            score_store.set(key, result)
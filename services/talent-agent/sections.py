@@ -0,0 +1,196 @@
+import asyncio
+import os
+import re
+
+from dotenv import load_dotenv
+
+from model_router import register_routed_chain
+from schemas import (
+    certification_schema,
+    education_schema,
+    experience_schema,
+    interests_schema,
+    language_schema,
+    personal_info_schema,
+    professional_links_schema,
+    project_schema,
+    skills_schema,
+)
+
+load_dotenv()
+
+# "single" extracts the whole candidate_schema in one call, "sections" segments the
+# resume and extracts each section with its own sub-schema concurrently.
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "single")
+# Resumes with fewer recognised sections than this use the single call instead.
+SECTION_MIN_COUNT = int(os.getenv("SECTION_MIN_COUNT", "2"))
+
+HEADER_SECTION = "header"
+
+SECTION_HEADINGS = {
+    HEADER_SECTION: [r"contact(?: information| details)?", r"personal (?:information|details)"],
+    "educations": [
+        r"education(?:al)?(?: background| qualifications)?",
+        r"academic (?:background|qualifications|profile)",
+        r"qualifications",
+    ],
+    "experiences": [
+        r"(?:work|professional|industry|relevant)? ?experience",
+        r"employment(?: history)?",
+        r"work history",
+        r"internships?",
+    ],
+    "skills": [
+        r"(?:technical|key|core|professional)? ?skills(?: (?:&|and) (?:tools|technologies))?",
+        r"technologies",
+        r"tools(?: (?:&|and) technologies)?",
+        r"(?:core )?competencies",
+    ],
+    "certifications": [
+        r"certifications?(?: (?:&|and) (?:courses|licenses))?",
+        r"licenses(?: (?:&|and) certifications)?",
+        r"courses(?: (?:&|and) certifications)?",
+    ],
+    "projects": [r"(?:personal|academic|key|selected)? ?projects"],
+    "languages": [r"languages"],
+    "interests": [r"interests", r"hobbies(?: (?:&|and) interests)?"],
+}
+
+# Headings of sections that are not extracted, so their text does not leak into
+# the preceding section.
+IGNORED_HEADINGS = [
+    r"(?:professional )?summary",
+    r"(?:career )?objective",
+    r"profile",
+    r"about me",
+    r"references?",
+    r"awards?(?: (?:&|and) achievements)?",
+    r"achievements",
+    r"publications",
+    r"volunteer(?:ing)?(?: experience)?",
+    r"extra[- ]?curricular activities",
+]
+
+HEADING_PATTERNS = [
+    (
+        section,
+        re.compile(
+            r"^\s*(?:" + "|".join(headings) + r")\s*(?::\s*(?P<rest>.*))?$",
+            re.IGNORECASE,
+        ),
+    )
+    for section, headings in list(SECTION_HEADINGS.items()) + [(None, IGNORED_HEADINGS)]
+]
+
+LINK_MARKER_PATTERN = re.compile(r"\[Link: [^\]]+\]")
+
+# Maximum length of a line that is only a heading.
+MAX_HEADING_LENGTH = 60
+
+SECTION_SCHEMAS = {
+    HEADER_SECTION: [personal_info_schema, professional_links_schema],
+    "educations": [education_schema],
+    "experiences": [experience_schema],
+    "skills": [skills_schema],
+    "certifications": [certification_schema],
+    "projects": [project_schema],
+    "languages": [language_schema],
+    "interests": [interests_schema],
+}
+
+section_chains = {
+    schema.id: register_routed_chain(
+        f"section_{schema.id}",
+        schema,
+        encoder_or_encoder_class="json",
+        input_formatter=None,
+    )
+    for schemas in SECTION_SCHEMAS.values()
+    for schema in schemas
+}
+
+
+def match_heading(line):
+    """
+    Return (section, rest) if the line starts a section, otherwise None.
+
+    section is None for recognised headings of sections that are not extracted;
+    rest is the text following a "Heading:" prefix on the same line.
+    """
+    for section, pattern in HEADING_PATTERNS:
+        match = pattern.match(line)
+        if not match:
+            continue
+        rest = (match.group("rest") or "").strip()
+        if not rest and len(line.strip()) > MAX_HEADING_LENGTH:
+            continue
+        return section, rest
+    return None
+
+
+def segment_resume(text):
+    """
+    Split resume text into sections by their headings.
+
+    Text before the first heading goes to the header section, which is used for
+    personal information and professional links.
+
+    Returns:
+        Dictionary mapping section names to their text
+    """
+    sections = {}
+    current = HEADER_SECTION
+    for line in text.splitlines():
+        heading = match_heading(line)
+        if heading is not None:
+            current, line = heading
+            if not line:
+                continue
+        if current is not None:
+            sections.setdefault(current, []).append(line)
+
+    return {
+        section: "\n".join(lines).strip()
+        for section, lines in sections.items()
+        if "".join(lines).strip()
+    }
+
+
+def section_inputs(text):
+    """
+    Return the text to extract for each sub-schema, or None when the resume does
+    not have enough recognisable sections.
+    """
+    sections = segment_resume(text)
+    found = [section for section in sections if section != HEADER_SECTION]
+    if len(found) < SECTION_MIN_COUNT:
+        return None
+
+    # Links are often listed away from the header, e.g. in a sidebar
+    links = " ".join(LINK_MARKER_PATTERN.findall(text))
+    header = "\n".join(filter(None, [sections.get(HEADER_SECTION, ""), links]))
+    if header:
+        sections[HEADER_SECTION] = header
+
+    inputs = {}
+    for section, section_text in sections.items():
+        for schema in SECTION_SCHEMAS[section]:
+            inputs[schema.id] = section_text
+    return inputs
+
+
+async def extract_sections(inputs, semaphore):
+    """
+    Run the sub-schema chains concurrently and merge their output into the shape
+    produced by the candidate_schema chain.
+    """
+
+    async def extract(schema_id, section_text):
+        async with semaphore:
+            data = (await section_chains[schema_id].ainvoke(section_text))["data"]
+        return schema_id, data.get(schema_id) if data else None
+
+    results = await asyncio.gather(
+        *(extract(schema_id, section_text) for schema_id, section_text in inputs.items())
+    )
+    return {"candidate": {schema_id: value for schema_id, value in results if value}}
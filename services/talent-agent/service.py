@@ -1,40 +1,256 @@
-from score import evaluate_candidate
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request
-from kor.extraction import create_extraction_chain
-from pdf_utils import extract_text
-from llm_utils import llm
-from schemas import candidate_schema
-from validation import format_candidate_data
-import shutil
+from contextlib import asynccontextmanager
+from typing import List
+import asyncio
 import os
+import time
+
+from dotenv import load_dotenv
+
+from score import (
+    SIMILARITY_MODES,
+    STREAM_FORMATS,
+    ascore_candidate,
+    github_cache,
+    stream_scores,
+)
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from chain_utils import chain_stats, warm_up_chains
+from embeddings import embedding_cache
+from llm_cache import llm_cache_stats, response_store
+from metrics import (
+    SERVER_TIMING,
+    http_in_flight,
+    http_request_duration,
+    http_requests,
+    register_cache,
+    render_metrics,
+    request_timings,
+    server_timing_header,
+)
+from ingestion import (
+    BATCH_MAX_FILES,
+    JobNotFoundError,
+    expand_upload,
+    get_batch_ingestor,
+)
+from pipeline import QueueFullError, extraction_executor, parse_resume
+from ranking import (
+    RANKING_MODES,
+    RankingRequestError,
+    load_candidates,
+    rank_candidates,
+    stream_ranking,
+)
+from resume_cache import resume_cache
+from score_store import score_store
+
+load_dotenv()
+
+WARM_UP_CHAINS = os.getenv("WARM_UP_CHAINS", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARM_UP_CHAINS:
+        warm_up_chains()
+    ingestor = get_batch_ingestor()
+    await ingestor.resume()
+    yield
+    await ingestor.shutdown()
+    extraction_executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+register_cache("github", github_cache)
+register_cache("embeddings", embedding_cache)
+register_cache("llm_responses", response_store)
+register_cache("resumes", resume_cache)
+register_cache("skill_scores", score_store)
+
+
+def non_negative_int(data, name, default=None):
+    """Read an optional integer field of a JSON body, rejecting other values with 400"""
+    value = data.get(name, default)
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    raise HTTPException(status_code=400, detail=f"{name} must be a non-negative integer")
 
-app = FastAPI()
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = {}
+    token = request_timings.set(timings)
+    http_in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        seconds = time.perf_counter() - start
+        http_in_flight.dec()
+        request_timings.reset(token)
+        # Label by route template, so path parameters do not create new series
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        http_requests.inc(method=request.method, path=path, status=status)
+        http_request_duration.observe(seconds, method=request.method, path=path)
+
+    # Streaming responses only include the stages finished before their first byte
+    if SERVER_TIMING or "x-server-timing" in request.headers:
+        timings["total"] = seconds
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
 
 @app.post("/resumes/parse")
 async def extract_resume(request: Request):
     data: bytes = await request.body()
 
-    os.makedirs("temp", exist_ok=True)
-    file_location = "temp/temp_resume.pdf"
+    try:
+        structured_object = await parse_resume(data)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Resume extraction queue is full. Please retry later.",
+            headers={"Retry-After": "5"},
+        )
+
+    return {"structuredObject": structured_object}
+
+@app.post("/resumes/batch", status_code=202)
+async def create_batch(files: List[UploadFile] = File(...)):
+    resumes = []
+    for upload in files:
+        resumes.extend(
+            await asyncio.to_thread(expand_upload, upload.filename or "", await upload.read())
+        )
+
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No resumes found in the upload")
+    if len(resumes) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch can contain at most {BATCH_MAX_FILES} resumes",
+        )
 
+    job_id = await get_batch_ingestor().submit(resumes)
+    return {"jobId": job_id, "total": len(resumes)}
+
+@app.get("/resumes/batch/{job_id}")
+async def get_batch_status(job_id: str):
+    try:
+        return await asyncio.to_thread(get_batch_ingestor().store.job_status, job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+@app.get("/resumes/batch/{job_id}/results")
+async def get_batch_results(job_id: str, after: int = 0, follow: bool = True):
+    ingestor = get_batch_ingestor()
+    try:
+        await asyncio.to_thread(ingestor.store.job_status, job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+    return StreamingResponse(
+        ingestor.stream_results(job_id, after=after, follow=follow),
+        media_type="application/x-ndjson",
+    )
+
+@app.post("/resumes/rank")
+async def rank_resumes(request: Request):
     try:
-        with open(file_location, "wb") as f:
-            f.write(data)
+        data = await request.json()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"JSON parsing error: {str(e)}")
 
-        resume_content = extract_text(file_location)
-        chain = create_extraction_chain(
-            llm,
-            candidate_schema,
-            encoder_or_encoder_class="json",
-            input_formatter=None
+    required_skills = data.get("requiredSkills")
+    if not required_skills:
+        raise HTTPException(status_code=400, detail="requiredSkills is required")
+    mode = data.get("mode", "hybrid")
+    if mode not in RANKING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be one of: {', '.join(RANKING_MODES)}",
         )
-        output = chain.invoke(resume_content)["data"]
-        structured_object = format_candidate_data(output)
-    finally:
-        if os.path.exists(file_location):
-            os.remove(file_location)
 
-    return {"structuredObject": structured_object}
+    try:
+        # Candidates from batch jobs are read from the job store
+        candidates = await asyncio.to_thread(
+            load_candidates, data.get("candidates"), job_id=data.get("jobId")
+        )
+    except RankingRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not candidates:
+        raise HTTPException(status_code=400, detail="No candidates to rank")
+
+    options = {
+        "offset": non_negative_int(data, "offset", 0),
+        "limit": non_negative_int(data, "limit"),
+        "mode": mode,
+        "top_k": non_negative_int(data, "topK"),
+    }
+    if data.get("stream"):
+        return StreamingResponse(
+            stream_ranking(candidates, required_skills, **options),
+            media_type="application/x-ndjson",
+        )
+    return await rank_candidates(candidates, required_skills, **options)
+
+@app.post("/resumes/similarity/stream")
+async def stream_similarity(request: Request):
+    try:
+        data = await request.json()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"JSON parsing error: {str(e)}")
+
+    structured_object = data.get("structuredObject")
+    required_skills = data.get("requiredSkills")
+    if not structured_object or not required_skills:
+        raise HTTPException(
+            status_code=400, detail="structuredObject and requiredSkills are required"
+        )
+    mode = data.get("mode")
+    if mode is not None and mode not in SIMILARITY_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be one of: {', '.join(SIMILARITY_MODES)}",
+        )
+    stream_format = data.get("format")
+    if stream_format is None:
+        accept = request.headers.get("accept", "")
+        stream_format = "sse" if "text/event-stream" in accept else "ndjson"
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(STREAM_FORMATS)}",
+        )
+
+    return StreamingResponse(
+        stream_scores(
+            structured_object,
+            required_skills,
+            stream_format,
+            mode=mode,
+        ),
+        media_type="text/event-stream" if stream_format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/chains")
+async def get_chain_metrics():
+    return chain_stats()
+
+@app.get("/metrics/llm-cache")
+async def get_llm_cache_metrics():
+    return llm_cache_stats()
 
 @app.post("/resumes/similarity")
 async def get_scores(request: Request):
@@ -51,8 +267,16 @@ async def get_scores(request: Request):
             
         structured_object = data["structuredObject"]
         required_skills = data["requiredSkills"]
-        results = evaluate_candidate(structured_object, required_skills)
+        mode = data.get("mode")
+        if mode is not None and mode not in SIMILARITY_MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"mode must be one of: {', '.join(SIMILARITY_MODES)}",
+            )
+        results = await ascore_candidate(structured_object, required_skills, mode=mode)
         return results
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,12 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The service modules are imported as top-level modules, as in service.py, and
+# the local API stubs are shared with the benchmarks
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Modules that build the shared chat model need a key, but tests never reach OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+import github_client
+from github_client import GitHubClient, build_repositories_query
+from stub_github import StubGitHubServer, repository_node
+
+REPOS = [("wso2", "product-is"), ("wso2", "carbon"), ("octo", "hello"), ("a", "b"), ("c", "d")]
+
+
+@pytest.fixture
+def stub():
+    server = StubGitHubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(github_client, "GITHUB_MAX_BACKOFF", 0)
+
+
+def client_for(stub, **kwargs):
+    return GitHubClient(api_url=stub.url, token="test", **kwargs)
+
+
+def expected_stats(owner, name):
+    return github_client.parse_repository(repository_node(owner, name))
+
+
+def test_build_repositories_query_aliases_each_repository():
+    query, variables = build_repositories_query([("wso2", "carbon"), ("octo", "hello")])
+
+    assert "repo0: repository(owner: $owner0, name: $name0)" in query
+    assert "repo1: repository(owner: $owner1, name: $name1)" in query
+    assert "fragment RepositoryFields on Repository" in query
+    assert variables == {"owner0": "wso2", "name0": "carbon", "owner1": "octo", "name1": "hello"}
+
+
+def test_fetch_repositories_batches_distinct_repositories(stub):
+    client = client_for(stub, batch_size=2)
+
+    results = client.fetch_repositories(REPOS + REPOS[:2])
+
+    assert results == {repo: expected_stats(*repo) for repo in REPOS}
+    assert stub.counts() == {"requests": 3, "repositories": 5}
+
+
+def test_afetch_repositories_batches_distinct_repositories(stub):
+    client = client_for(stub, batch_size=2)
+
+    results = asyncio.run(client.afetch_repositories(REPOS))
+
+    assert results == {repo: expected_stats(*repo) for repo in REPOS}
+    assert stub.counts() == {"requests": 3, "repositories": 5}
+
+
+@pytest.mark.parametrize(
+    "status, payload, headers",
+    [
+        (429, {"message": "slow down"}, {"retry-after": "0"}),
+        (403, {"message": "rate limited"}, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "0"}),
+        (200, {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}, {}),
+        (502, {"message": "bad gateway"}, {}),
+    ],
+    ids=["http-429", "http-403-exhausted", "graphql-rate-limited", "http-502"],
+)
+def test_retries_rate_limited_and_failed_requests(stub, status, payload, headers):
+    stub.queue_response(status, payload, headers=headers)
+    client = client_for(stub, max_retries=2)
+
+    results = client.fetch_repositories(REPOS[:2])
+
+    assert results == {repo: expected_stats(*repo) for repo in REPOS[:2]}
+    assert stub.counts()["requests"] == 2
+
+
+def test_async_retries_rate_limited_requests(stub):
+    stub.queue_response(429, {"message": "slow down"}, headers={"retry-after": "0"})
+    client = client_for(stub, max_retries=2)
+
+    results = asyncio.run(client.afetch_repositories(REPOS[:1]))
+
+    assert results == {REPOS[0]: expected_stats(*REPOS[0])}
+    assert stub.counts()["requests"] == 2
+
+
+def test_gives_up_after_max_retries(stub):
+    for _ in range(3):
+        stub.queue_response(503, {"message": "unavailable"})
+    client = client_for(stub, max_retries=2)
+
+    results = client.fetch_repositories(REPOS[:2])
+
+    assert results == {repo: {"error": "GitHub API request failed"} for repo in REPOS[:2]}
+    assert stub.counts()["requests"] == 3
+
+
+@pytest.mark.parametrize(
+    "status, body",
+    [(404, b'{"message": "Not Found"}'), (200, b"<html>maintenance</html>"), (200, b"[]")],
+    ids=["http-404", "not-json", "not-an-object"],
+)
+def test_unusable_responses_fail_the_batch_without_retrying(stub, status, body):
+    stub.queue_response(status, body=body)
+    client = client_for(stub, max_retries=2)
+
+    results = client.fetch_repositories(REPOS[:2])
+
+    assert results == {repo: {"error": "GitHub API request failed"} for repo in REPOS[:2]}
+    assert stub.counts()["requests"] == 1
+
+
+def test_missing_repositories_are_reported_per_repository(stub):
+    stub.queue_response(
+        200,
+        {
+            "data": {"repo0": repository_node(*REPOS[0]), "repo1": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["repo1"]}],
+        },
+    )
+    client = client_for(stub)
+
+    results = client.fetch_repositories(REPOS[:2])
+
+    assert results[REPOS[0]] == expected_stats(*REPOS[0])
+    assert results[REPOS[1]] == {"error": "Repository not found or inaccessible"}
+
+
+def test_async_client_opened_on_another_loop_is_closed(stub):
+    client = client_for(stub)
+
+    async def fetch():
+        await client.afetch_repositories(REPOS[:1])
+        return await client.async_client()
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+
+    assert first is not second
+    assert first.is_closed
+    assert not second.is_closed
+    asyncio.run(client.aclose())
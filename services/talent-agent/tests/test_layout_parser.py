@@ -0,0 +1,210 @@
+import random
+
+import pytest
+
+import corpus
+import layout_parser
+from layout_parser import (
+    LAYOUT_MIN_CONFIDENCE,
+    contact_details,
+    find_gutter,
+    group_lines,
+    parse_layout,
+    read_resume,
+    year,
+)
+
+
+# A single-column document without any recognised section headings
+PLAIN_LINES = ["Jane Doe", "I like building things."] * 10
+
+
+def word(text, x0, top, size=10.5, fontname="Helvetica", width=None):
+    x1 = x0 + (width if width is not None else 6 * len(text))
+    return {"text": text, "x0": x0, "x1": x1, "top": top, "size": size, "fontname": fontname}
+
+
+def column(x0, count, width=40):
+    return [word(f"w{i}", x0, 20 * i, width=width) for i in range(count)]
+
+
+@pytest.fixture
+def candidate():
+    return corpus.make_candidate(random.Random(3))
+
+
+@pytest.fixture
+def headed_pdf(candidate):
+    return corpus.render_text_pdf(*corpus.resume_lines(candidate))
+
+
+@pytest.mark.parametrize(
+    "words, expected",
+    [
+        ([], None),
+        (column(40, 10, width=500), None),
+        (column(36, 10, width=150) + column(225, 10, width=300), (187 + 225) / 2),
+        (column(36, 10, width=150) + column(194, 10, width=300), None),
+        (column(36, 3, width=150) + column(225, 10, width=300), None),
+    ],
+    ids=["empty", "single-column", "sidebar", "gap-too-narrow", "too-few-words-on-a-side"],
+)
+def test_find_gutter(words, expected):
+    assert find_gutter(words, 612) == expected
+
+
+@pytest.mark.parametrize(
+    "words, expected",
+    [
+        (
+            [word("Doe", 60, 100.5), word("Jane", 20, 100)],
+            [("Jane Doe", 20, 100, 10.5, False)],
+        ),
+        (
+            [word("Second", 20, 120), word("First", 20, 100)],
+            [("First", 20, 100, 10.5, False), ("Second", 20, 120, 10.5, False)],
+        ),
+        (
+            [word("Experience", 20, 100, 15.75, "Helvetica-Bold"), word("2020", 120, 102)],
+            [("Experience 2020", 20, 100, 15.8, False)],
+        ),
+        (
+            [
+                word("Jane", 20, 100, fontname="Helvetica-Bold"),
+                word("Doe", 60, 100, fontname="Arial,Bold"),
+            ],
+            [("Jane Doe", 20, 100, 10.5, True)],
+        ),
+    ],
+    ids=["same-line-by-x", "lines-by-top", "largest-size-mixed-weight", "all-bold"],
+)
+def test_group_lines(words, expected):
+    lines = group_lines(words, page_number=1)
+
+    assert [(l.text, l.x0, l.top, l.size, l.bold) for l in lines] == expected
+    assert all(l.page == 1 for l in lines)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("January 2019 - Present (5 years)", "2019"),
+        ("2015 - 2019", "2019"),
+        ("Present", ""),
+        ("", ""),
+        (None, ""),
+        ("Room 12345", ""),
+    ],
+)
+def test_year(text, expected):
+    assert year(text) == expected
+
+
+@pytest.mark.parametrize(
+    "texts, uris, expected",
+    [
+        (
+            ["jane@example.com | +94 77 123 4567 | Colombo"],
+            (),
+            ("jane@example.com", "+94 77 123 4567", {}, ["Colombo"]),
+        ),
+        (
+            ["+94 77 123 4567 (Mobile)", "github.com/jane (Personal)"],
+            (),
+            ("", "+94 77 123 4567", {"github": "https://github.com/jane"}, []),
+        ),
+        (
+            ["Colombo, Sri Lanka"],
+            ("mailto:jane@example.com", "tel:+94771234567", "https://www.linkedin.com/in/jane"),
+            (
+                "jane@example.com",
+                "",
+                {"linkedin": "https://www.linkedin.com/in/jane"},
+                ["Colombo, Sri Lanka"],
+            ),
+        ),
+        (["Call 1234 567"], (), ("", "", {}, ["Call 1234 567"])),
+    ],
+    ids=["one-line", "linkedin-labels", "link-annotations", "short-number-is-not-a-phone"],
+)
+def test_contact_details(texts, uris, expected):
+    assert contact_details(texts, uris) == expected
+
+
+@pytest.mark.parametrize(
+    "render, template",
+    [
+        (corpus.render_linkedin_pdf, "linkedin"),
+        (lambda c: corpus.render_text_pdf(*corpus.resume_lines(c)), "headed"),
+    ],
+    ids=["linkedin", "headed"],
+)
+def test_parse_layout_detects_templates(candidate, render, template):
+    result = parse_layout(render(candidate))
+    expected = candidate["candidate"]
+
+    assert result.template == template
+    assert result.confidence >= LAYOUT_MIN_CONFIDENCE
+    output = result.output["candidate"]
+    assert output["personal_info"][0]["full_name"] == expected["personal_info"][0]["full_name"]
+    assert output["personal_info"][0]["phone"] == expected["personal_info"][0]["phone"]
+    assert [e["company"] for e in output["experiences"]] == [
+        e["company"] for e in expected["experiences"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        corpus.render_text_pdf(PLAIN_LINES),
+        corpus.render_positioned_pdf([]),
+        b"not a pdf",
+    ],
+    ids=["no-headings", "no-pages", "not-a-pdf"],
+)
+def test_parse_layout_leaves_other_documents_undetected(source):
+    assert parse_layout(source) == layout_parser.LayoutResult(None, 0.0, None)
+
+
+@pytest.fixture
+def pdf_opens(monkeypatch):
+    """Count the documents opened with pdfplumber, by the layout parser and pdf_utils"""
+    opened = []
+    open_pdf = layout_parser.pdfplumber.open
+
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return open_pdf(*args, **kwargs)
+
+    monkeypatch.setattr(layout_parser.pdfplumber, "open", counting_open)
+    return opened
+
+
+def test_read_resume_without_the_layout_parser(monkeypatch, headed_pdf, pdf_opens):
+    monkeypatch.setattr(layout_parser, "LAYOUT_PARSER", False)
+
+    output, text = read_resume(headed_pdf)
+
+    assert output is None
+    assert "EXPERIENCE" in text
+    assert len(pdf_opens) == 1
+
+
+def test_read_resume_parses_detected_templates(monkeypatch, headed_pdf, pdf_opens):
+    monkeypatch.setattr(layout_parser, "LAYOUT_PARSER", True)
+
+    output, text = read_resume(headed_pdf)
+
+    assert output == parse_layout(headed_pdf).output
+    assert text is None
+    assert len(pdf_opens) == 2
+
+
+def test_read_resume_reuses_the_open_pdf_for_the_text(monkeypatch, pdf_opens):
+    monkeypatch.setattr(layout_parser, "LAYOUT_PARSER", True)
+
+    output, text = read_resume(corpus.render_text_pdf(PLAIN_LINES))
+
+    assert output is None
+    assert "I like building things." in text
+    assert len(pdf_opens) == 1
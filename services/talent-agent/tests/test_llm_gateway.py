@@ -0,0 +1,241 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+from langchain_core.messages import HumanMessage
+
+import llm_gateway
+from llm_gateway import (
+    BATCH,
+    INTERACTIVE,
+    GatewayChatOpenAI,
+    TokenBucketLimiter,
+    batch_priority,
+    llm_priority,
+    retry_delay,
+    run_coroutine,
+)
+from stub_openai import StubOpenAIServer
+
+MESSAGES = [HumanMessage(content="Say OK")]
+
+
+@pytest.fixture
+def stub():
+    server = StubOpenAIServer(retry_after=0.01).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fixed monotonic clock for the limiter, moved by setting clock.now"""
+
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr(llm_gateway.time, "monotonic", lambda: Clock.now)
+    return Clock
+
+
+def gateway_for(stub, limiter=None, **kwargs):
+    return GatewayChatOpenAI(
+        model_name="gpt-4o",
+        openai_api_key="test",
+        base_url=stub.url,
+        max_retries=0,
+        limiter=limiter or TokenBucketLimiter(0, 0),
+        **kwargs,
+    )
+
+
+def rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def test_calls_go_through_the_gateway(stub):
+    result = gateway_for(stub).invoke(MESSAGES)
+
+    assert result.content == "OK"
+    assert stub.counts()["requests"] == 1
+
+
+def test_rate_limited_calls_are_retried_and_pause_the_limiter(stub):
+    stub.rate_limit_every = 2
+    limiter = TokenBucketLimiter(0, 0)
+    model = gateway_for(stub, limiter)
+
+    results = [model.invoke(MESSAGES).content for _ in range(2)]
+
+    assert results == ["OK", "OK"]
+    assert stub.counts()["requests"] == 3
+    assert stub.counts()["rate_limited"] == 1
+    assert limiter._paused_until > 0
+
+
+def test_async_rate_limited_calls_are_retried(stub):
+    stub.rate_limit_every = 2
+    model = gateway_for(stub)
+
+    async def run():
+        return [(await model.ainvoke(MESSAGES)).content for _ in range(2)]
+
+    assert asyncio.run(run()) == ["OK", "OK"]
+    assert stub.counts()["requests"] == 3
+
+
+def test_gives_up_after_gateway_retries(stub):
+    stub.rate_limit_every = 1
+    model = gateway_for(stub, gateway_retries=2)
+
+    with pytest.raises(openai.RateLimitError):
+        model.invoke(MESSAGES)
+    assert stub.counts()["requests"] == 3
+
+
+def test_reservation_is_settled_with_the_reported_usage(stub, clock):
+    limiter = TokenBucketLimiter(0, 10000)
+    model = gateway_for(stub, limiter)
+
+    model.invoke(MESSAGES)
+
+    assert limiter.stats()["tokens_available"] == 10000 - stub.counts()["tokens"]
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "250"}, 0.25),
+        ({"retry-after": "2"}, 2.0),
+        ({"retry-after-ms": "250", "retry-after": "2"}, 0.25),
+        ({"retry-after": "3600"}, llm_gateway.LLM_MAX_BACKOFF),
+    ],
+    ids=["retry-after-ms", "retry-after", "ms-preferred", "capped"],
+)
+def test_retry_delay_honours_retry_after(headers, expected):
+    assert retry_delay(rate_limit_error(headers), attempt=0) == expected
+
+
+@pytest.mark.parametrize(
+    "error, attempt",
+    [
+        (rate_limit_error({}), 0),
+        (rate_limit_error({"retry-after": "soon"}), 1),
+        (openai.APIConnectionError(request=httpx.Request("POST", "https://x")), 2),
+    ],
+    ids=["no-header", "unparseable-header", "connection-error"],
+)
+def test_retry_delay_backs_off_exponentially(error, attempt):
+    delay = retry_delay(error, attempt)
+
+    assert 2**attempt <= delay <= min(llm_gateway.LLM_MAX_BACKOFF, 2**attempt + 1)
+
+
+@pytest.mark.parametrize(
+    "rpm, tpm, requests, tokens, call_tokens, expected_wait",
+    [
+        (0, 0, 0, 0, 10**6, 0),
+        (60, 0, 1, 0, 100, 0),
+        (60, 0, 0.5, 0, 100, 0.5),
+        (0, 6000, 0, 5000, 1000, 0),
+        (0, 6000, 0, 400, 1000, 6.0),
+        (0, 6000, 0, 0, 10**6, 60.0),
+        (60, 6000, 0, 0, 1000, 10.0),
+    ],
+    ids=[
+        "disabled",
+        "request-available",
+        "request-bucket-empty",
+        "tokens-available",
+        "token-bucket-short",
+        "larger-than-bucket",
+        "longest-wait-wins",
+    ],
+)
+def test_try_acquire_waits_for_the_buckets(
+    clock, rpm, tpm, requests, tokens, call_tokens, expected_wait
+):
+    limiter = TokenBucketLimiter(rpm, tpm)
+    limiter._requests, limiter._tokens = requests, tokens
+
+    assert limiter._try_acquire(call_tokens, INTERACTIVE) == pytest.approx(expected_wait)
+
+
+def test_acquire_reserves_and_settle_returns_unused_tokens(clock):
+    limiter = TokenBucketLimiter(60, 6000)
+
+    assert limiter._try_acquire(1000, INTERACTIVE) == 0
+    assert limiter.stats()["requests_available"] == 59
+    assert limiter.stats()["tokens_available"] == 5000
+
+    limiter.settle(1000, 200)
+    assert limiter.stats()["tokens_available"] == 5800
+
+    limiter.settle(1000, None)
+    assert limiter.stats()["tokens_available"] == 5800
+
+
+def test_buckets_refill_over_time(clock):
+    limiter = TokenBucketLimiter(60, 6000)
+    limiter._requests, limiter._tokens = 0, 0
+
+    clock.now += 30
+
+    assert limiter.stats()["requests_available"] == 30
+    assert limiter.stats()["tokens_available"] == 3000
+
+
+def test_pause_holds_every_caller(clock):
+    limiter = TokenBucketLimiter(0, 0)
+    limiter.pause(5)
+
+    assert limiter._try_acquire(0, INTERACTIVE) == 5
+    clock.now += 5
+    assert limiter._try_acquire(0, INTERACTIVE) == 0
+
+
+def test_interactive_calls_are_served_before_batch_calls():
+    limiter = TokenBucketLimiter(600, 0)
+    limiter._requests = 0
+    admitted = []
+
+    async def acquire(priority, delay):
+        await asyncio.sleep(delay)
+        await limiter.acquire(0, priority)
+        admitted.append(priority)
+
+    async def run():
+        await asyncio.gather(acquire(BATCH, 0), acquire(INTERACTIVE, 0.01))
+
+    asyncio.run(run())
+
+    assert admitted == [INTERACTIVE, BATCH]
+
+
+def test_sync_callers_share_one_loop_for_the_async_pool(stub):
+    model = gateway_for(stub, gateway_retries=0)
+
+    results = [run_coroutine(model.ainvoke(MESSAGES)).content for _ in range(3)]
+
+    assert results == ["OK", "OK", "OK"]
+    assert stub.counts()["requests"] == 3
+
+
+def test_run_coroutine_keeps_the_callers_context():
+    async def priority():
+        return llm_priority.get()
+
+    with batch_priority():
+        assert run_coroutine(priority()) == BATCH
+    assert run_coroutine(priority()) == INTERACTIVE
+
+
+def test_run_coroutine_refuses_a_running_loop():
+    async def nested():
+        with pytest.raises(RuntimeError):
+            run_coroutine(asyncio.sleep(0))
+
+    asyncio.run(nested())
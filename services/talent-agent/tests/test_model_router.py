@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from metrics import llm_tier_calls
+from model_router import FAST, STANDARD, RoutedRunnable
+
+TASK = "test_task"
+
+
+class Tier:
+    """A runnable that returns or raises a fixed result"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def invoke(self, input, **kwargs):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    async def ainvoke(self, input, **kwargs):
+        return self.invoke(input, **kwargs)
+
+
+def tier_calls():
+    return {
+        (dict(key)["tier"], dict(key)["outcome"]): value
+        for key, value in llm_tier_calls._values.items()
+        if dict(key)["task"] == TASK
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_tier_calls():
+    with llm_tier_calls._lock:
+        for key in [k for k in llm_tier_calls._values if dict(k)["task"] == TASK]:
+            del llm_tier_calls._values[key]
+
+
+@pytest.mark.parametrize(
+    "fast, standard, expected, outcomes",
+    [
+        ("good", "good", "good", {(FAST, "accepted"): 1}),
+        ("bad", "good", "good", {(FAST, "escalated"): 1, (STANDARD, "accepted"): 1}),
+        (
+            ValueError("boom"),
+            "good",
+            "good",
+            {(FAST, "failed"): 1, (STANDARD, "accepted"): 1},
+        ),
+        ("bad", "bad", "bad", {(FAST, "escalated"): 1, (STANDARD, "rejected"): 1}),
+    ],
+    ids=["fast-accepted", "escalated", "fast-failed", "last-tier-rejected"],
+)
+@pytest.mark.parametrize("run_async", [False, True], ids=["sync", "async"])
+def test_routed_runnable_outcomes(fast, standard, expected, outcomes, run_async):
+    routed = RoutedRunnable(
+        TASK, {FAST: Tier(fast), STANDARD: Tier(standard)}, accept=lambda out: out == "good"
+    )
+
+    if run_async:
+        output = asyncio.run(routed.ainvoke("input"))
+    else:
+        output = routed.invoke("input")
+
+    assert output == expected
+    assert tier_calls() == outcomes
+
+
+def test_last_tier_errors_are_raised():
+    routed = RoutedRunnable(
+        TASK, {FAST: Tier("bad"), STANDARD: Tier(ValueError("boom"))}, accept=lambda out: False
+    )
+
+    with pytest.raises(ValueError):
+        routed.invoke("input")
+    assert tier_calls() == {(FAST, "escalated"): 1, (STANDARD, "failed"): 1}
+
+
+def test_call_validation_replaces_the_task_validation():
+    fast = Tier("good")
+    routed = RoutedRunnable(TASK, {FAST: fast, STANDARD: Tier("other")}, accept=bool)
+
+    assert routed.invoke("input", accept=lambda out: out == "other") == "other"
+    assert fast.calls == 1
@@ -0,0 +1,131 @@
+import pytest
+
+from normalization import (
+    classify_link,
+    normalize_github_link,
+    normalize_phone,
+    normalize_professional_links,
+    normalize_url,
+)
+
+
+@pytest.mark.parametrize(
+    "phone, country, expected",
+    [
+        # Numbers with their own country code
+        ("+94 77 123 4567", "", "+94 771234567"),
+        ("+91-98765-43210", "India", "+91 9876543210"),
+        ("0094 77 123 4567", "", "+94 771234567"),
+        ("+1 (555) 123-4567", "Sri Lanka", "+1 5551234567"),
+        # National numbers take the code of the candidate's country
+        ("077 123 4567", "Sri Lanka", "+94 771234567"),
+        ("(555) 123-4567", "United States.", "+1 5551234567"),
+        ("94771234567", "sri lanka", "+94 771234567"),
+        # Trunk prefixes, extensions and lists of numbers
+        ("+44 (0) 20 7946 0958", "", "+44 2079460958"),
+        ("+44 020 7946 0958", "", "+44 2079460958"),
+        ("+39 06 1234 5678", "", "+39 0612345678"),
+        ("(555) 123-4567 ext. 89", "USA", "+1 5551234567"),
+        ("+1 555 123 4567 x12", "", "+1 5551234567"),
+        ("+94 77 123 4567 / +94 11 234 5678", "", "+94 771234567"),
+        ("077 123 4567 or 011 234 5678", "Sri Lanka", "+94 771234567"),
+        # Numbers that cannot be formatted reliably
+        ("077 123 4567", "", None),
+        ("077 123 4567", "Atlantis", None),
+        ("12345", "Sri Lanka", None),
+        ("+999 123 456 789", "", None),
+        ("not available", "Sri Lanka", None),
+        ("", "Sri Lanka", None),
+        (None, "Sri Lanka", None),
+    ],
+)
+def test_normalize_phone(phone, country, expected):
+    assert normalize_phone(phone, country) == expected
+
+
+@pytest.mark.parametrize(
+    "link, expected",
+    [
+        ("https://www.linkedin.com/in/jane", "linkedin"),
+        ("http://linkedin.com/in/jane", "linkedin"),
+        ("https://github.com/jane", "github"),
+        ("https://www.gitlab.com/jane", "gitlab"),
+        ("https://bitbucket.org/jane", "bitbucket"),
+        ("https://www.hackerrank.com/jane", "hackerrank"),
+        ("https://leetcode.com/jane", "leetcode"),
+        ("https://dev.to/jane", "devto"),
+        ("https://medium.com/@jane", "medium"),
+        ("https://stackoverflow.com/users/1/jane", "stackoverflow"),
+        ("https://jane.dev", "portfolio"),
+        ("https://gist.github.com/jane", "portfolio"),
+        ("github.com/jane", None),
+        ("mailto:jane@example.com", None),
+        ("", None),
+    ],
+)
+def test_classify_link(link, expected):
+    assert classify_link(link) == expected
+
+
+@pytest.mark.parametrize(
+    "link, expected",
+    [
+        ("github.com/jane", "https://github.com/jane"),
+        ("www.linkedin.com/in/jane.", "https://www.linkedin.com/in/jane"),
+        ("  https://jane.dev/), ", "https://jane.dev/"),
+        ("ftp://files.example.com", "ftp://files.example.com"),
+        ("Jane Doe", "Jane Doe"),
+        (None, ""),
+    ],
+)
+def test_normalize_url(link, expected):
+    assert normalize_url(link) == expected
+
+
+@pytest.mark.parametrize(
+    "links, expected",
+    [
+        (
+            {"linkedin": "linkedin.com/in/jane", "github": "https://github.com/jane"},
+            {"linkedin": "https://linkedin.com/in/jane", "github": "https://github.com/jane"},
+        ),
+        # A link under the wrong key moves to its own key when that key is free
+        (
+            {"portfolio": "github.com/jane", "github": ""},
+            {"github": "https://github.com/jane"},
+        ),
+        (
+            {"github": "https://www.linkedin.com/in/jane"},
+            {"linkedin": "https://www.linkedin.com/in/jane"},
+        ),
+        # ... and stays a portfolio link when its own key is taken
+        (
+            {"github": "https://github.com/jane", "portfolio": "https://github.com/jane/site"},
+            {"github": "https://github.com/jane", "portfolio": "https://github.com/jane/site"},
+        ),
+        (
+            {"github": "https://github.com/jane", "linkedin": "https://github.com/other"},
+            {"github": "https://github.com/jane"},
+        ),
+        # Links that are not valid for their key are dropped
+        ({"linkedin": "Jane Doe", "portfolio": ""}, {}),
+        ({"github": "https://jane.dev"}, {}),
+        # Keys outside professional_links_schema are left as is
+        ({"twitter": "@jane", "github": None}, {"twitter": "@jane"}),
+    ],
+)
+def test_normalize_professional_links(links, expected):
+    assert normalize_professional_links(links) is links
+    assert links == expected
+
+
+@pytest.mark.parametrize(
+    "link, expected",
+    [
+        ("github.com/jane/repo", "https://github.com/jane/repo"),
+        ("https://gitlab.com/jane/repo", ""),
+        ("", ""),
+    ],
+)
+def test_normalize_github_link(link, expected):
+    assert normalize_github_link(link) == expected
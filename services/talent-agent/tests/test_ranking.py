@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+import ranking
+
+
+def collect(stream):
+    async def run():
+        return [json.loads(line) async for line in stream]
+
+    return asyncio.run(run())
+
+
+def entry(id, score, mode="embedding"):
+    return {"id": id, "score": score, "scoringMode": mode}
+
+
+def test_stream_ranking_reports_failures_as_an_error_record(monkeypatch):
+    async def failing_ranking(candidates, skills, **kwargs):
+        yield "prerank", [entry("a", 0.5)]
+        raise RuntimeError("scoring backend unavailable")
+
+    monkeypatch.setattr(ranking, "arank_candidates", failing_ranking)
+
+    records = collect(ranking.stream_ranking([], ["Python"]))
+
+    assert [r["type"] for r in records] == ["leaderboard", "error"]
+    assert records[-1] == {"type": "error", "detail": "scoring backend unavailable"}
+
+
+def test_stream_ranking_ends_with_the_final_leaderboard(monkeypatch):
+    async def ranking_stages(candidates, skills, **kwargs):
+        yield "prerank", [entry("a", 0.5), entry("b", 0.7)]
+        yield "scored", entry("a", 0.9, "llm")
+        yield "final", [entry("a", 0.9, "llm"), entry("b", 0.7)]
+
+    monkeypatch.setattr(ranking, "arank_candidates", ranking_stages)
+
+    records = collect(ranking.stream_ranking([], ["Python"]))
+
+    assert [(r["type"], r.get("stage")) for r in records] == [
+        ("leaderboard", "prerank"),
+        ("candidate", None),
+        ("leaderboard", "final"),
+    ]
@@ -0,0 +1,67 @@
+import pytest
+
+from relevance import (
+    SKILL_ALIASES,
+    SKILL_SPECIALIZATIONS,
+    RelevanceIndex,
+    build_alias_phrases,
+    tokenize,
+)
+
+
+def candidate_with(*skills, experience=None):
+    candidate = {"skills": [{"skill": s} for s in skills]}
+    if experience:
+        candidate["experiences"] = [{"job_title": experience, "company": "Acme"}]
+    return candidate
+
+
+@pytest.mark.parametrize(
+    "required, candidate, expected",
+    [
+        ("PostgreSQL", candidate_with("Postgres"), True),
+        ("PostgreSQL", candidate_with("MySQL"), False),
+        ("MySQL", candidate_with("PostgreSQL"), False),
+        ("SQL", candidate_with("MySQL"), True),
+        ("SQL", candidate_with("Postgres"), True),
+        ("MySQL", candidate_with("SQL"), False),
+        ("Kubernetes", candidate_with("K8s"), True),
+        ("K8s", candidate_with("EKS"), True),
+        ("EKS", candidate_with("OpenShift"), False),
+        ("Golang", candidate_with(experience="Head of go-to-market"), False),
+        ("Golang", candidate_with("Go Lang"), True),
+        ("Spring Boot", candidate_with(experience="Spring hiring drive lead"), False),
+        ("Docker", candidate_with(experience="Shipping containers logistics"), False),
+        ("React", candidate_with("React Native"), True),
+        ("React Native", candidate_with("React"), False),
+        ("Java", candidate_with("JavaScript"), False),
+        ("Node.js", candidate_with("Node JS"), True),
+    ],
+)
+def test_skill_evidence(required, candidate, expected):
+    assert RelevanceIndex(candidate).has_evidence(required) is expected
+
+
+def test_built_in_alias_groups_do_not_overlap():
+    seen = {}
+    for name, names in SKILL_ALIASES.items():
+        for phrase in {tokenize(n) for n in [name, *names]}:
+            assert phrase not in seen, f"{phrase} is in {seen.get(phrase)} and {name}"
+            seen[phrase] = name
+
+
+def test_specializations_are_not_chained():
+    phrases = build_alias_phrases(
+        {"postgresql": ["postgres"]}, {"sql": ["mysql", "postgresql"]}
+    )
+
+    assert phrases[tokenize("sql")] == set(
+        map(tokenize, ["sql", "mysql", "postgresql", "postgres"])
+    )
+    assert phrases[tokenize("postgresql")] == set(map(tokenize, ["postgresql", "postgres"]))
+    assert tokenize("mysql") not in phrases
+
+
+def test_every_specialization_is_a_distinct_skill():
+    for name, narrower in SKILL_SPECIALIZATIONS.items():
+        assert tokenize(name) not in {tokenize(n) for n in narrower}
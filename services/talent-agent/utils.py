@@ -1,5 +1,3 @@
-import re
-
 def validate_year(year):
     try:
         year = int(year)
@@ -7,6 +5,7 @@ def validate_year(year):
             raise ValueError
     except ValueError:
         return None
-    if not re.match(r"^\d{4}$", str(year)):
+    # Equivalent to matching ^\d{4}$ on the positive integer
+    if not 1000 <= year <= 9999:
         return None
     return year
@@ -1,193 +1,187 @@
-import json
+import os
 import re
-
-from llm_utils import llm
+from collections import namedtuple
+
+from dotenv import load_dotenv
+
+from metrics import timed
+from model_router import routed_llm
+from normalization import (
+    PHONE_NUMBER_PATTERN,
+    normalize_github_link,
+    normalize_phone,
+    normalize_professional_links,
+)
 from utils import validate_year
 
-def validate_candidate_data_format(data):
-    if not data:
-        return json.dumps({}, indent=4)
-    if not data.get("candidate"):
-        return json.dumps({}, indent=4)
-    candidate = data["candidate"]
-    if not candidate.get("personal_info") or candidate.get("personal_info") == []:
-        data["candidate"]["personal_info"] = {}
-    if isinstance(candidate.get("personal_info"), list):
-        data["candidate"]["personal_info"] = candidate["personal_info"][0]
-
-    if not candidate.get("educations"):
-        data["candidate"]["educations"] = []
-    if not isinstance(candidate.get("educations"), list):
-        data["candidate"]["educations"] = [candidate["educations"]]
-
-    if not candidate.get("skills"):
-        data["candidate"]["skills"] = []
-    if not isinstance(candidate.get("skills"), list):
-        data["candidate"]["skills"] = [candidate["skills"]]
-    data["candidate"]["skills"] = [s["skill"] for s in data["candidate"]["skills"]]
-
-    if not candidate.get("certifications"):
-        data["candidate"]["certifications"] = []
-    if not isinstance(candidate.get("certifications"), list):
-        data["candidate"]["certifications"] = [candidate["certifications"]]
-
-    if not candidate.get("projects"):
-        data["candidate"]["projects"] = []
-    if not isinstance(candidate.get("projects"), list):
-        data["candidate"]["projects"] = [candidate["projects"]]
-    for project in data["candidate"]["projects"]:
-        project["technologies"] = [t["technology"] for t in project["technologies"]]
-
-    if (
-        not candidate.get("professional_links")
-        or candidate.get("professional_links") == []
-    ):
-        data["candidate"]["professional_links"] = {}
-    if isinstance(candidate.get("professional_links"), list):
-        data["candidate"]["professional_links"] = candidate["professional_links"][0]
-
-    if not candidate.get("experiences"):
-        data["candidate"]["experiences"] = []
-    if not isinstance(candidate.get("experiences"), list):
-        data["candidate"]["experiences"] = [candidate["experiences"]]
-
-    if not candidate.get("languages"):
-        data["candidate"]["languages"] = []
-    if not isinstance(candidate.get("languages"), list):
-        data["candidate"]["languages"] = [candidate["languages"]]
-
-    if not candidate.get("interests"):
-        data["candidate"]["interests"] = []
-    if not isinstance(candidate.get("interests"), list):
-        data["candidate"]["interests"] = [candidate["interests"]]
-    data["candidate"]["interests"] = [
-        s["interest"] for s in data["candidate"]["interests"]
-    ]
-    return data
+load_dotenv()
+
+# Ask the LLM to format phone numbers that the local parser cannot handle
+PHONE_LLM_FALLBACK = os.getenv("PHONE_LLM_FALLBACK", "false").lower() == "true"
+
+
+def phone_response_valid(response):
+    return PHONE_NUMBER_PATTERN.search(response.content if response else "") is not None
+
+
+phone_llm = routed_llm("phone_format", accept=phone_response_valid)
+
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+
+
+@timed("phone_llm")
+def format_phone_with_llm(phone, country):
+    prompt = f"Format this phone number into +country_code<space>XXXXXXXXX format: {phone}. Give the \
+      formatted phone number only. For an example give +94 701684781. If country code is not available, \
+         use {country}'s code as the country code."
+    response = phone_llm.invoke(prompt)
+    phone_number_match = PHONE_NUMBER_PATTERN.search(response.content if response else "")
+    return phone_number_match.group(0) if phone_number_match else None
+
+
+def validate_email(email):
+    return email if isinstance(email, str) and EMAIL_PATTERN.match(email) else ""
+
+
+def validate_phone(personal_info):
+    # The phone depends on the candidate's country, so it is validated with the
+    # whole personal_info object rather than as a field
+    phone = personal_info.get("phone")
+    if phone is None or phone == "":
+        return
+    country = personal_info.get("country", "")
+    formatted_phone = normalize_phone(phone, country)
+    if formatted_phone is None and PHONE_LLM_FALLBACK and country != "":
+        formatted_phone = format_phone_with_llm(phone, country)
+    personal_info["phone"] = formatted_phone or ""
+
+
+def validate_gpa(gpa_zscore):
+    try:
+        float(gpa_zscore)
+    except (TypeError, ValueError):
+        return None
+    return gpa_zscore
+
+
+def project_values(entries, key):
+    """[{key: value}, ...] -> [value, ...], keeping plain values and dropping entries without key"""
+    try:
+        return [entry[key] for entry in entries]
+    except (KeyError, TypeError):
+        return [
+            entry[key] if isinstance(entry, dict) else entry
+            for entry in entries
+            if not isinstance(entry, dict) or key in entry
+        ]
+
+
+def flatten_technologies(project):
+    technologies = project.get("technologies") or []
+    if not isinstance(technologies, list):
+        technologies = [technologies]
+    project["technologies"] = project_values(technologies, "technology")
+    return project
+
+
+# How each section of a candidate is shaped and validated:
+#   many:   list section (True) or single object (False)
+#   value:  key to project each list entry onto, e.g. {"skill": "Python"} -> "Python"
+#   entry:  shape fix applied in place to every entry
+#   fields: (field, rule) pairs; a rule gets the value and returns the validated value.
+#           Rules only run on fields that are present and not empty.
+#   object: rule applied in place to the whole object of a single-object section
+SectionRule = namedtuple(
+    "SectionRule", ["many", "value", "entry", "fields", "object"], defaults=(None,) * 4
+)
+
+CANDIDATE_SECTIONS = {
+    "personal_info": SectionRule(
+        many=False,
+        fields=(("email", validate_email),),
+        object=validate_phone,
+    ),
+    "educations": SectionRule(
+        many=True,
+        fields=(
+            ("gpa_zscore", validate_gpa),
+            ("start_year", validate_year),
+            ("end_year", validate_year),
+        ),
+    ),
+    "skills": SectionRule(many=True, value="skill"),
+    "certifications": SectionRule(many=True, fields=(("year", validate_year),)),
+    "projects": SectionRule(
+        many=True, entry=flatten_technologies, fields=(("github", normalize_github_link),)
+    ),
+    "professional_links": SectionRule(many=False, object=normalize_professional_links),
+    "experiences": SectionRule(
+        many=True,
+        fields=(("start_year", validate_year), ("end_year", validate_year)),
+    ),
+    "languages": SectionRule(many=True),
+    "interests": SectionRule(many=True, value="interest"),
+}
+
+
+def compile_section(rule):
+    """
+    Build a function that shapes a section and validates its entries in a single
+    pass, specialised for the parts of the rule that are set.
+    """
+    fields = tuple(rule.fields or ())
+    key, transform, apply = rule.value, rule.entry, rule.object
+
+    if not rule.many:
+
+        def format_object(value):
+            if not value:
+                return {}
+            section = value[0] if isinstance(value, list) else value
+            if section:
+                for field, validate in fields:
+                    value = section.get(field)
+                    if value is not None and value != "":
+                        section[field] = validate(value)
+                if apply is not None:
+                    apply(section)
+            return section
+
+        return format_object
+
+    def format_entries(value):
+        if not value:
+            return []
+        entries = value if isinstance(value, list) else [value]
+        if key is not None:
+            return project_values(entries, key)
+        if not fields and transform is None:
+            return entries
+        for entry in entries:
+            if isinstance(entry, dict):
+                if transform is not None:
+                    transform(entry)
+                for field, validate in fields:
+                    value = entry.get(field)
+                    if value is not None and value != "":
+                        entry[field] = validate(value)
+        return entries
+
+    return format_entries
+
+
+SECTION_FORMATTERS = {
+    section: compile_section(rule) for section, rule in CANDIDATE_SECTIONS.items()
+}
 
 
 def format_candidate_data(data):
-    data = validate_candidate_data_format(data)
-
-    candidate = data.get("candidate")
-
-    if candidate.get("personal_info") != {}:
-        personal_info = candidate["personal_info"]
-        if personal_info.get("email") != None and personal_info.get("email") != "":
-            email = personal_info["email"]
-            email_regex = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-            if not re.match(email_regex, email):
-                personal_info["email"] = ""
-
-        if personal_info.get("phone") != None and personal_info.get("phone") != "":
-            phone = personal_info["phone"]
-            country = personal_info.get("country", "")
-            response = None
-            if country != "":
-                prompt = f"Format this phone number into +country_code<space>XXXXXXXXX format: {phone}. Give the \
-                  formatted phone number only. For an example give +94 701684781. If country code is not available, \
-                     use {country}'s code as the country code."
-                response = llm.invoke(prompt)
-                personal_info["phone"] = response.content if response else ""
-            phone_regex = r"^\+\d{1,3}\s\d{9,10}$"
-            phone_number_match = re.search(
-                phone_regex, response.content if response else ""
-            )
-            if phone_number_match:
-                personal_info["phone"] = phone_number_match.group(0)
-            else:
-                personal_info["phone"] = ""
-
-    if candidate.get("professional_links") != {}:
-        professional_links = candidate["professional_links"]
-        for key, link in list(professional_links.items()):
-            # if link:
-            if key == "linkedin" and not re.match(
-                r"^https?://(www\.)?linkedin\.com/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "github" and not re.match(
-                r"^https?://(www\.)?github\.com/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "gitlab" and not re.match(
-                r"^https?://(www\.)?gitlab\.com/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "bitbucket" and not re.match(
-                r"^https?://(www\.)?bitbucket\.org/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "hackerrank" and not re.match(
-                r"^https?://(www\.)?hackerrank\.com/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "leetcode" and not re.match(
-                r"^https?://(www\.)?leetcode\.com/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "devto" and not re.match(
-                r"^https?://(www\.)?dev\.to/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "medium" and not re.match(
-                r"^https?://(www\.)?medium\.com/.*$", link
-            ):
-                del professional_links[key]
-            elif key == "portfolio" and not re.match(r"^https?://.*$", link):
-
-                del professional_links[key]
-            elif key == "stackoverflow" and not re.match(
-                r"^https?://(www\.)?stackoverflow\.com/.*$", link
-            ):
-                del professional_links[key]
-
-    if candidate.get("educations") != []:
-        educations = candidate["educations"]
-        for education in educations:
-            if (
-                education.get("gpa_zscore") != None
-                and education.get("gpa_zscore") != ""
-            ):
-                gpa_zscore = education["gpa_zscore"]
-                try:
-                    gpa_zscore = float(gpa_zscore)
-                except ValueError:
-                    education["gpa_zscore"] = None
-
-            if (
-                education.get("start_year") != None
-                and education.get("start_year") != ""
-            ):
-                education["start_year"] = validate_year(education.get("start_year"))
-
-            if education.get("end_year") != None and education.get("end_year") != "":
-                education["end_year"] = validate_year(education.get("end_year"))
-
-    if candidate.get("experiences") != []:
-        experiences = candidate["experiences"]
-        for experience in experiences:
-            if (
-                experience.get("start_year") != None
-                and experience.get("start_year") != ""
-            ):
-                experience["start_year"] = validate_year(experience.get("start_year"))
-
-            if experience.get("end_year") != None and experience.get("end_year") != "":
-                experience["end_year"] = validate_year(experience.get("end_year"))
-
-    if candidate.get("certifications") != []:
-        certifications = candidate["certifications"]
-        for certification in certifications:
-            if certification.get("year") != None and certification.get("year") != "":
-                certification["year"] = validate_year(certification.get("year"))
-
-    if candidate.get("projects") != []:
-        projects = candidate["projects"]
-        for project in projects:
-            if project.get("github") != None and project.get("github") != "":
-                github = project["github"]
-                if not re.match(r"^https?://(www\.)?github\.com/.*$", github):
-                    project["github"] = ""
+    if not data or not data.get("candidate"):
+        return {}
+
+    candidate = data["candidate"]
+    for section, format_section in SECTION_FORMATTERS.items():
+        candidate[section] = format_section(candidate.get(section))
 
     return data
+